@@ -0,0 +1,197 @@
+"""
+Admission Control and Load Shedding
+Per-client token-bucket rate limiting plus per-endpoint concurrency limits
+with small bounded queues
+
+A request is either admitted straight away, admitted after a short wait
+in its endpoint's queue (and then served in degraded mode), or rejected
+at once with 429 (client over its rate) or 503 (endpoint saturated), so
+slow /analyze-url fetches cannot starve cheap /predict traffic.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, jsonify, request
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost=1):
+        """
+        Spend cost tokens if available
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until enough tokens refill
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token bucket per client, keeping at most max_clients buckets (least recently seen dropped)"""
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client_id, cost=1):
+        """Seconds the client must wait before retrying (0 if the request may proceed)"""
+        with self._lock:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = self._buckets[client_id] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_id)
+            return bucket.take(cost)
+
+
+class ConcurrencyLimiter:
+    """At most max_active requests in flight, at most max_queue waiting up to queue_timeout seconds"""
+
+    ADMITTED = 'admitted'
+    QUEUED = 'queued'       # admitted after waiting
+    REJECTED = 'rejected'   # queue full
+    TIMED_OUT = 'timed_out'
+
+    def __init__(self, max_active, max_queue, queue_timeout):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            if self.active < self.max_active and not self.waiting:
+                self.active += 1
+                return self.ADMITTED
+            if self.waiting >= self.max_queue:
+                return self.REJECTED
+
+            self.waiting += 1
+            try:
+                admitted = self._condition.wait_for(lambda: self.active < self.max_active,
+                                                    timeout=self.queue_timeout)
+            finally:
+                self.waiting -= 1
+            if not admitted:
+                return self.TIMED_OUT
+            self.active += 1
+            return self.QUEUED
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+class AdmissionController:
+    """Rate limits and concurrency limits for Flask endpoints, with metrics"""
+
+    def __init__(self, rate, burst, limits, queue_timeout=2.0):
+        """
+        Args:
+            rate: Requests per second each client may sustain
+            burst: Requests a client may send at once
+            limits: {endpoint: (max_active, max_queue, cost)}; cost is the
+                number of rate-limit tokens one request to the endpoint uses
+            queue_timeout: Longest a request waits for a slot
+        """
+        self.rate_limiter = RateLimiter(rate, burst) if rate > 0 else None
+        self.limiters = {name: ConcurrencyLimiter(max_active, max_queue, queue_timeout)
+                         for name, (max_active, max_queue, _) in limits.items()}
+        self.costs = {name: cost for name, (_, _, cost) in limits.items()}
+        self._lock = threading.Lock()
+        # queued requests are also counted as admitted; each was served degraded
+        self._metrics = {name: {'admitted': 0, 'queued': 0, 'rate_limited': 0, 'rejected': 0, 'timed_out': 0}
+                         for name in limits}
+
+    def _count(self, endpoint, key):
+        with self._lock:
+            self._metrics[endpoint][key] += 1
+
+    def check_rate(self, endpoint, client_id):
+        """Seconds the client must wait before calling endpoint (0 if allowed), counted in metrics"""
+        if self.rate_limiter is None:
+            return 0
+        retry_after = self.rate_limiter.check(client_id, self.costs[endpoint])
+        if retry_after:
+            self._count(endpoint, 'rate_limited')
+        return retry_after
+
+    def admit(self, endpoint):
+        """
+        Take one of the endpoint's concurrency slots, counting the outcome
+        After ADMITTED or QUEUED the caller must release self.limiters[endpoint].
+        """
+        limiter = self.limiters[endpoint]
+        outcome = limiter.acquire()
+        if outcome in (limiter.REJECTED, limiter.TIMED_OUT):
+            self._count(endpoint, outcome)
+            return outcome
+        self._count(endpoint, 'admitted')
+        if outcome == limiter.QUEUED:
+            self._count(endpoint, 'queued')
+        return outcome
+
+    def limit(self, endpoint):
+        """
+        Decorator applying the endpoint's limits to a Flask view
+        Sets g.degraded when the request had to queue for a slot.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                retry_after = self.check_rate(endpoint, request.remote_addr)
+                if retry_after:
+                    return self._reject(429, 'Rate limit exceeded, slow down', retry_after)
+
+                limiter = self.limiters[endpoint]
+                outcome = self.admit(endpoint)
+                if outcome in (limiter.REJECTED, limiter.TIMED_OUT):
+                    return self._reject(503, 'Server is busy, try again shortly', limiter.queue_timeout)
+
+                g.degraded = outcome == limiter.QUEUED
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    limiter.release()
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _reject(status, message, retry_after):
+        response = jsonify({'error': message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, round(retry_after)))
+        return response
+
+    def metrics(self):
+        """Per-endpoint admission counts plus current in-flight and queued requests"""
+        with self._lock:
+            metrics = {name: dict(counts) for name, counts in self._metrics.items()}
+        for name, limiter in self.limiters.items():
+            metrics[name].update({'active': limiter.active, 'waiting': limiter.waiting,
+                                  'max_active': limiter.max_active, 'max_queue': limiter.max_queue})
+        return metrics
@@ -4,17 +4,32 @@ Final Year Project | AI & Machine Learning
 Enhanced with Trust Meter, Emotion Detection, and Fact-Checking
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g, url_for
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import re
 import random
 import math
+import time
+import hmac
+import hashlib
+import os
 import urllib.parse
+from functools import lru_cache
+
+from admission import AdmissionController
+from micro_batcher import MicroBatcher
+from near_duplicate import NearDuplicateIndex
+from single_flight import SingleFlight
+from url_utils import RedirectCache, canonicalize_url, platform_for_url
+from lexicon import LexiconStore
+from response_serializer import init_app as init_response_serializer
 
 # Import URL content extraction libraries
 try:
     import requests
     from bs4 import BeautifulSoup
+    from fetch_scheduler import FetchScheduler, RobotsDisallowed
     URL_EXTRACTION_AVAILABLE = True
 except ImportError:
     URL_EXTRACTION_AVAILABLE = False
@@ -22,7 +37,10 @@ except ImportError:
 
 # Import ML Model
 try:
-    from ml_model import ml_model, initialize_model
+    from ml_model import ml_model, LONG_DOCUMENT_CHUNK_CHARS
+    from model_registry import ModelRegistry, LanguageModelRouter
+    from shadow_scoring import ShadowScorer
+    from online_learning import OnlineLearner
     ML_AVAILABLE = True
 except ImportError:
     ML_AVAILABLE = False
@@ -37,54 +55,191 @@ except ImportError:
     LANGDETECT_AVAILABLE = False
     print("langdetect not available. Language detection disabled.")
 
+# Request size limits - bound worst-case latency and memory per request
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 1024 * 1024))
+MAX_TEXT_CHARS = int(os.environ.get('MAX_TEXT_CHARS', 100000))
+MAX_URL_CONTENT_BYTES = int(os.environ.get('MAX_URL_CONTENT_BYTES', 5 * 1024 * 1024))
+
+# Admission control - per-client rate limit (tokens per second, burst) and per-endpoint
+# (max concurrent, max queued, tokens per request); queued requests are served degraded
+admission = AdmissionController(
+    rate=float(os.environ.get('RATE_LIMIT_PER_SECOND', 5)),
+    burst=float(os.environ.get('RATE_LIMIT_BURST', 20)),
+    limits={
+        'predict': (int(os.environ.get('PREDICT_MAX_CONCURRENT', 8)),
+                    int(os.environ.get('PREDICT_MAX_QUEUE', 16)), 1),
+        'analyze_url': (int(os.environ.get('ANALYZE_URL_MAX_CONCURRENT', 4)),
+                        int(os.environ.get('ANALYZE_URL_MAX_QUEUE', 8)), 2),
+        'realtime': (int(os.environ.get('REALTIME_MAX_CONCURRENT', 16)),
+                     int(os.environ.get('REALTIME_MAX_QUEUE', 32)), 0.25)
+    },
+    queue_timeout=float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 2))
+)
+
+# Identical concurrent requests share one computation (/predict by text hash and options,
+# /analyze-url by canonical URL and options)
+predict_flight = SingleFlight()
+url_analysis_flight = SingleFlight()
+
+# Concurrent single-text ML predictions within MICRO_BATCH_WINDOW_MS are scored as one batch
+micro_batcher = MicroBatcher(
+    window_ms=float(os.environ.get('MICRO_BATCH_WINDOW_MS', 2)),
+    max_batch_size=int(os.environ.get('MICRO_BATCH_MAX_SIZE', 32))
+)
+
+# Page fetching for /analyze-url - per-host queues and spacing, robots.txt, retries.
+# A request waits up to FETCH_WAIT_SECONDS for its page when its host is idle; otherwise
+# it gets 202 with a job to poll
+FETCH_WAIT_SECONDS = float(os.environ.get('FETCH_WAIT_SECONDS', 15))
+FETCH_HEADERS = {
+    # Browser-like headers
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# Canonical URLs after shortener hops and redirects seen by earlier fetches
+redirect_cache = RedirectCache(
+    headers=FETCH_HEADERS,
+    max_entries=int(os.environ.get('REDIRECT_CACHE_SIZE', 100000)),
+    ttl=float(os.environ.get('REDIRECT_CACHE_TTL', 86400))
+)
+
+if URL_EXTRACTION_AVAILABLE:
+    fetch_scheduler = FetchScheduler(
+        headers=FETCH_HEADERS,
+        timeout=10,
+        max_bytes=MAX_URL_CONTENT_BYTES,
+        min_interval=float(os.environ.get('FETCH_HOST_INTERVAL', 1)),
+        max_workers=int(os.environ.get('FETCH_WORKERS', 8)),
+        max_retries=int(os.environ.get('FETCH_MAX_RETRIES', 2)),
+        max_queue_per_host=int(os.environ.get('FETCH_MAX_QUEUE_PER_HOST', 50)),
+        max_jobs=int(os.environ.get('FETCH_MAX_JOBS', 10000)),
+        max_redirects=int(os.environ.get('FETCH_MAX_REDIRECTS', 10)),
+        respect_robots=os.environ.get('FETCH_RESPECT_ROBOTS', '1') != '0',
+        robots_ttl=float(os.environ.get('ROBOTS_CACHE_TTL', 3600))
+    )
+    fetch_scheduler.start()
+else:
+    fetch_scheduler = None
+
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
 CORS(app)  # Enable CORS for mobile access
+init_response_serializer(app)  # Pluggable JSON encoder + gzip/brotli for large responses
+
+# Near-duplicate index over preprocessed tokens - near-copies of a recently
+# analyzed article reuse its verdict (needs the ML module's preprocessing)
+NEAR_DUPLICATE_ENABLED = ML_AVAILABLE and os.environ.get('NEAR_DUPLICATE_ENABLED', '1') != '0'
+near_duplicate_index = NearDuplicateIndex(
+    threshold=float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.8)),
+    capacity=int(os.environ.get('NEAR_DUPLICATE_CAPACITY', 100000))
+)
+
+# Lexicons (lexicons/*.json) hot-reload on /admin/reload-lexicon or when the files change
+lexicon_store = LexiconStore()
+lexicon_store.start_watcher(float(os.environ.get('LEXICON_WATCH_INTERVAL', 10)))
 
-# Initialize ML Model on startup
+# Initialize ML Model on startup from the versioned model registry
+# The registry hot-swaps models on /admin/reload-model or when CURRENT changes
 if ML_AVAILABLE:
-    ML_MODEL_LOADED = initialize_model()
+    model_registry = ModelRegistry()
+    model_registry.on_swap(lambda version: near_duplicate_index.clear())
+    model_registry.initialize()
+    model_registry.start_watcher(float(os.environ.get('MODEL_WATCH_INTERVAL', 10)))
+    
+    # Per-language models (models/registry/lang/<code>), loaded on first use
+    language_router = LanguageModelRouter(
+        model_registry,
+        max_loaded=int(os.environ.get('LANGUAGE_MODELS_MAX_LOADED', 4)),
+        memory_limit_mb=float(os.environ.get('LANGUAGE_MODELS_MEMORY_LIMIT_MB', 0)) or None
+    )
+    # Verdicts of near-copies must come from the model now serving their language
+    language_router.on_swap(lambda code: near_duplicate_index.clear())
+    language_router.start_watcher(float(os.environ.get('MODEL_WATCH_INTERVAL', 10)))
+    
+    # Shadow scoring - a candidate model scores sampled traffic in the background
+    shadow_scorer = ShadowScorer(
+        sample_rate=float(os.environ.get('SHADOW_SAMPLE_RATE', 0.1)),
+        max_pending=int(os.environ.get('SHADOW_MAX_PENDING', 100))
+    )
+    if os.environ.get('SHADOW_MODEL_VERSION'):
+        try:
+            shadow_scorer.set_candidate(model_registry.load(os.environ['SHADOW_MODEL_VERSION']),
+                                        os.environ['SHADOW_MODEL_VERSION'])
+        except Exception as e:
+            print(f"Failed to load shadow model: {e}")
+    
+    # Online learning - /feedback labels update hashing+sgd models in the background
+    online_learner = OnlineLearner(
+        model_registry,
+        batch_size=int(os.environ.get('ONLINE_BATCH_SIZE', 32)),
+        max_pending=int(os.environ.get('ONLINE_MAX_PENDING', 1000)),
+        flush_interval=float(os.environ.get('ONLINE_FLUSH_INTERVAL', 5)),
+        snapshot_interval=float(os.environ.get('ONLINE_SNAPSHOT_INTERVAL', 300))
+    )
+    # One writer per registry: in other worker processes the learner stays stopped
+    if not online_learner.start():
+        print("Online learning runs in another process; /feedback is handled there")
 else:
-    ML_MODEL_LOADED = False
-
-# Word lists for analysis
-SENSATIONAL_WORDS = [
-    'breaking', 'shocking', 'you won\'t believe', 'doctors hate',
-    'secret', 'exclusive', 'urgent', 'act now', 'limited time',
-    'amazing', 'incredible', 'unbelievable', 'must see', 'click here',
-    'guaranteed', 'miracle', 'instant', 'revolutionary', 'exposed',
-    'cure', 'completely', 'all diseases', '100%', 'never before'
-]
-
-MISLEADING_PHRASES = [
-    'sources say', 'experts claim', 'studies show', 'research proves',
-    'doctors recommend', 'scientists reveal', 'government confirms',
-    'breaking: unverified', 'rumor has it', 'allegedly', 'anonymous source'
-]
-
-FEAR_WORDS = ['danger', 'threat', 'warning', 'alert', 'crisis', 'panic', 'fear', 'terrifying', 'horrifying']
-ANGER_WORDS = ['outrage', 'furious', 'angry', 'rage', 'attack', 'destroy', 'hate', 'evil']
-URGENCY_WORDS = ['now', 'immediately', 'urgent', 'hurry', 'limited time', 'act now', 'before it\'s too late']
-SENSATIONAL_WORDS_EMOTION = ['shocking', 'explosive', 'scandal', 'exposed', 'revealed', 'uncovered']
-
-TRUSTED_WORDS = ['according to', 'verified', 'confirmed', 'official', 'reliable source', 'peer-reviewed', 'evidence-based']
-
-# Tamil Language Word Lists
-TAMIL_SENSATIONAL_WORDS = [
-    'அதிர்ச்சி', 'ஆச்சரியம்', 'ரகசியம்', 'விரைவில்', 'இப்போதே',
-    'நம்பமுடியாத', 'செய்தி', 'வெளிப்படுத்தப்பட்டது', 'வெளியிடப்பட்டது',
-    'மருத்துவர்கள்', 'வெறுப்பு', 'நிச்சயம்', '100%', 'வேகமாக'
-]
-
-TAMIL_MISLEADING_PHRASES = [
-    'ஆதாரங்கள் கூறுகின்றன', 'நிபுணர்கள் கூறுகின்றனர்', 'ஆய்வுகள் காட்டுகின்றன',
-    'ஆராய்ச்சி நிரூபிக்கிறது', 'அறியப்படாத ஆதாரம்', 'வதந்தி',
-    'கூறப்படுகிறது', 'உறுதிப்படுத்தப்படாத'
-]
-
-TAMIL_FEAR_WORDS = ['அபாயம்', 'அச்சுறுத்தல்', 'எச்சரிக்கை', 'நெருக்கடி', 'பயம்', 'பீதி']
-TAMIL_ANGER_WORDS = ['கோபம்', 'சினம்', 'வெறுப்பு', 'தாக்குதல்', 'அழிக்க']
-TAMIL_URGENCY_WORDS = ['இப்போதே', 'விரைவில்', 'அவசரம்', 'வேகமாக', 'காலம் குறைவு']
-TAMIL_TRUSTED_WORDS = ['சான்றளிக்கப்பட்டது', 'உறுதிப்படுத்தப்பட்டது', 'அதிகாரப்பூர்வ', 'நம்பகமான', 'ஆதாரம்']
+    model_registry = None
+    language_router = None
+    shadow_scorer = None
+    online_learner = None
+
+# Admin endpoints are disabled unless ADMIN_TOKEN is set
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Analysis profiles - which response fields each profile computes and returns
+ANALYSIS_FIELDS = (
+    'prediction', 'confidence', 'indicators', 'summary', 'emotions', 'patterns',
+    'claims', 'trust_level', 'highlighted_words', 'language', 'ai_reasoning',
+    'duplicate', 'model_version'
+)
+
+ANALYSIS_PROFILES = {
+    'minimal': ('prediction', 'confidence', 'language', 'duplicate', 'model_version'),
+    'standard': ('prediction', 'confidence', 'indicators', 'summary', 'emotions',
+                 'patterns', 'claims', 'trust_level', 'language', 'duplicate',
+                 'model_version'),
+    'full': ANALYSIS_FIELDS
+}
+
+DEFAULT_ANALYSIS_PROFILE = 'full'
+
+HIGHLIGHT_COLORS = {
+    'suspicious': '#ef4444',
+    'trusted': '#22c55e',
+    'neutral': '#6b7280'
+}
+
+# Highlight encodings: 'spans' returns [start, end, type] character offsets of
+# non-neutral words only; 'words' is the legacy one-dict-per-word format and
+# stays the default so existing API clients keep their response shape
+HIGHLIGHT_FORMATS = ('spans', 'words')
+DEFAULT_HIGHLIGHT_FORMAT = os.environ.get('HIGHLIGHT_FORMAT', 'words')
+
+# Marks responses computed in degraded mode (minimal profile, rule-based only)
+DEGRADED_HEADERS = {'X-Degraded': '1'}
+
+
+def serving_version_headers():
+    """
+    Versions of the models and lexicon serving /predict, sent with /predict and
+    /lexicon-bundle so the service worker can key cached predictions by them
+    """
+    models = 'none'
+    if ML_AVAILABLE:
+        models = model_registry.active_version or 'none'
+        models += ''.join(f' {code}={version}' for code, version in language_router.status().items() if version)
+    return {'X-Model-Version': models, 'X-Lexicon-Version': lexicon_store.version}
+
+# Stages that need the output of other stages
+FIELD_DEPENDENCIES = {
+    'ai_reasoning': ('indicators', 'emotions', 'patterns', 'claims')
+}
 
 
 def detect_language(text):
@@ -116,6 +271,29 @@ def detect_language(text):
         return 'en', 'English'
 
 
+def resolve_analysis_fields(profile=None, fields=None):
+    """
+    Resolve the set of response fields for a request
+    An explicit field mask takes precedence over the profile name
+    Raises ValueError for unknown profiles or fields
+    """
+    if fields is not None:
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(',') if f.strip()]
+        if not isinstance(fields, (list, tuple)) or not fields:
+            raise ValueError('fields must be a non-empty list of field names')
+        unknown = [f for f in fields if f not in ANALYSIS_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(map(str, unknown))}")
+        return frozenset(fields)
+    
+    if profile is None:
+        profile = DEFAULT_ANALYSIS_PROFILE
+    if not isinstance(profile, str) or profile not in ANALYSIS_PROFILES:
+        raise ValueError(f"Unknown profile '{profile}'. Choose from: {', '.join(ANALYSIS_PROFILES)}")
+    return frozenset(ANALYSIS_PROFILES[profile])
+
+
 def rule_based_prediction(fake_score, text_length):
     """Rule-based prediction fallback when ML model is not available"""
     if fake_score > 3 or text_length < 20:
@@ -133,44 +311,65 @@ def rule_based_prediction(fake_score, text_length):
     return prediction, confidence
 
 
+# Sentence bodies between runs of . ! ? with surrounding whitespace trimmed (as str.strip)
+SENTENCE_PATTERN = re.compile(r'[^.!?\s](?:[^.!?]*[^.!?\s])?')
+
+# Sentences this short are left out of summaries
+SUMMARY_MIN_SENTENCE_CHARS = 20
+
+
+def sentence_spans(text, min_length=0):
+    """
+    Yield (start, end) character offsets of the sentences of text
+    Sentences are split on runs of '.', '!' and '?' and trimmed of surrounding whitespace;
+    only sentences longer than min_length are yielded.
+    """
+    for match in SENTENCE_PATTERN.finditer(text):
+        start, end = match.span()
+        if end - start > min_length:
+            yield start, end
+
+
 def generate_summary(text, max_length=200):
-    """Generate a summary of the text (simple sentence extraction)"""
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
+    """Generate a summary of the text (first, middle and last sentence)"""
+    spans = []
+    for span in sentence_spans(text, SUMMARY_MIN_SENTENCE_CHARS):
+        spans.append(span)
+        if len(spans) == 4 and spans[0][1] - spans[0][0] + 2 >= max_length:
+            # The first sentence fills the summary; the rest only had to show there are more than 3
+            break
     
-    if len(sentences) <= 3:
+    if len(spans) <= 3:
         return text[:max_length] + ('...' if len(text) > max_length else '')
     
-    # Take first, middle, and last sentences
-    summary_sentences = [
-        sentences[0],
-        sentences[len(sentences)//2] if len(sentences) > 2 else '',
-        sentences[-1]
-    ]
-    summary = '. '.join([s for s in summary_sentences if s])
-    return summary[:max_length] + ('...' if len(summary) > max_length else '')
+    # Join first, middle and last sentences with '. ', copying at most max_length characters
+    picks = (spans[0], spans[len(spans) // 2], spans[-1])
+    parts = []
+    remaining = max_length
+    for i, (start, end) in enumerate(picks):
+        if i:
+            parts.append('. '[:remaining])
+            remaining -= len(parts[-1])
+        parts.append(text[start:start + min(end - start, remaining)])
+        remaining -= len(parts[-1])
+        if remaining <= 0:
+            break
+    summary_length = sum(end - start for start, end in picks) + 4
+    return ''.join(parts) + ('...' if summary_length > max_length else '')
 
 
-def detect_emotions(text, lang_code='en'):
+def detect_emotions(text, lang_code='en', lexicon=None):
     """Detect emotional content in text (supports English and Tamil)"""
-    text_lower = text.lower()
+    terms = (lexicon or lexicon_store.current()).terms(lang_code)
+    fear_words = terms['fear']
+    anger_words = terms['anger']
+    urgency_words = terms['urgency']
+    sensational_words = terms['sensational_emotion']
     
-    # Select word lists based on language
-    if lang_code == 'ta':
-        fear_words = TAMIL_FEAR_WORDS
-        anger_words = TAMIL_ANGER_WORDS
-        urgency_words = TAMIL_URGENCY_WORDS
-        sensational_words = TAMIL_SENSATIONAL_WORDS
-    else:
-        fear_words = FEAR_WORDS
-        anger_words = ANGER_WORDS
-        urgency_words = URGENCY_WORDS
-        sensational_words = SENSATIONAL_WORDS_EMOTION
-    
-    fear_score = sum(1 for word in fear_words if word in text) / max(len(fear_words), 1) * 100
-    anger_score = sum(1 for word in anger_words if word in text) / max(len(anger_words), 1) * 100
-    urgency_score = sum(1 for word in urgency_words if word in text) / max(len(urgency_words), 1) * 100
-    sensational_score = sum(1 for word in sensational_words if word in text) / max(len(sensational_words), 1) * 100
+    fear_score = fear_words.count(text) / max(len(fear_words), 1) * 100
+    anger_score = anger_words.count(text) / max(len(anger_words), 1) * 100
+    urgency_score = urgency_words.count(text) / max(len(urgency_words), 1) * 100
+    sensational_score = sensational_words.count(text) / max(len(sensational_words), 1) * 100
     
     # Normalize scores
     fear_score = min(fear_score * 10, 100)
@@ -186,90 +385,41 @@ def detect_emotions(text, lang_code='en'):
     }
 
 
-def detect_patterns(text, lang_code='en'):
+def detect_patterns(text, lang_code='en', lexicon=None):
     """Detect fake news patterns (supports English and Tamil)"""
+    terms = (lexicon or lexicon_store.current()).terms(lang_code)
+    # English is matched lowercased; Tamil has no letter case
     text_lower = text.lower() if lang_code == 'en' else text
-    patterns = {
-        'clickbait_language': False,
-        'anonymous_source': False,
-        'exaggerated_claim': False,
-        'no_evidence': False,
-        'emotional_manipulation': False,
-        'urgency_pressure': False
-    }
     
-    if lang_code == 'ta':
-        # Tamil patterns
-        clickbait_phrases = ['நம்பமுடியாத', 'அதிர்ச்சி', 'ஆச்சரியம்', 'ரகசியம்']
-        patterns['clickbait_language'] = any(phrase in text for phrase in clickbait_phrases)
-        
-        patterns['anonymous_source'] = any(phrase in text for phrase in ['அறியப்படாத ஆதாரம்', 'ஆதாரங்கள் கூறுகின்றன'])
-        
-        exaggerated = ['100%', 'நிச்சயம்', 'வேகமாக']
-        patterns['exaggerated_claim'] = any(word in text for word in exaggerated)
-        
-        evidence_phrases = ['சான்றளிக்கப்பட்டது', 'உறுதிப்படுத்தப்பட்டது', 'ஆராய்ச்சி']
-        patterns['no_evidence'] = not any(phrase in text for phrase in evidence_phrases) and len(text.split()) > 50
-        
-        patterns['emotional_manipulation'] = any(word in text for word in TAMIL_FEAR_WORDS + TAMIL_ANGER_WORDS)
-        patterns['urgency_pressure'] = any(word in text for word in TAMIL_URGENCY_WORDS)
-    else:
-        # English patterns
-        clickbait_phrases = ['you won\'t believe', 'shocking', 'amazing', 'incredible', 'must see']
-        patterns['clickbait_language'] = any(phrase in text_lower for phrase in clickbait_phrases)
-        
-        patterns['anonymous_source'] = any(phrase in text_lower for phrase in ['anonymous source', 'sources say', 'insiders claim'])
-        
-        exaggerated = ['cure all', '100%', 'guaranteed', 'miracle', 'instant', 'completely cure']
-        patterns['exaggerated_claim'] = any(word in text_lower for word in exaggerated)
-        
-        evidence_phrases = ['according to', 'study shows', 'research', 'verified', 'confirmed']
-        patterns['no_evidence'] = not any(phrase in text_lower for phrase in evidence_phrases) and len(text.split()) > 50
-        
-        patterns['emotional_manipulation'] = any(word in text_lower for word in FEAR_WORDS + ANGER_WORDS)
-        patterns['urgency_pressure'] = any(word in text_lower for word in URGENCY_WORDS)
-    
-    return patterns
+    return {
+        'clickbait_language': terms['clickbait'].any_in(text_lower),
+        'anonymous_source': terms['anonymous_source'].any_in(text_lower),
+        'exaggerated_claim': terms['exaggerated'].any_in(text_lower),
+        'no_evidence': not terms['evidence'].any_in(text_lower) and len(text.split()) > 50,
+        'emotional_manipulation': terms['fear'].any_in(text_lower) or terms['anger'].any_in(text_lower),
+        'urgency_pressure': terms['urgency'].any_in(text_lower)
+    }
 
 
-def fact_check_claims(text):
+def fact_check_claims(text, lexicon=None):
     """Detect and analyze claims in the text"""
+    lexicon = lexicon or lexicon_store.current()
     text_lower = text.lower()
     claims = []
     
-    # Medical claims
-    medical_patterns = [
-        (r'cure.*(?:diabetes|cancer|disease)', 'Medically unrealistic'),
-        (r'(?:lose|burn).*\d+.*(?:pounds|kg).*\d+.*(?:days|weeks)', 'Unrealistic weight loss claim'),
-        (r'100%.*(?:effective|guaranteed)', 'Absolute claim without evidence')
-    ]
-    
-    for pattern, status in medical_patterns:
-        if re.search(pattern, text_lower):
-            claims.append({
-                'claim': re.search(pattern, text_lower).group(0)[:50],
-                'status': status,
-                'type': 'suspicious'
-            })
-    
-    # Financial claims
-    financial_patterns = [
-        (r'(?:make|earn).*\d+.*(?:dollars|money).*(?:day|hour)', 'Unrealistic financial claim'),
-        (r'guaranteed.*(?:profit|return)', 'Financial guarantee without risk disclosure')
-    ]
-    
-    for pattern, status in financial_patterns:
-        if re.search(pattern, text_lower):
+    # Medical and financial claims
+    for pattern, status in lexicon.claim_patterns('en'):
+        match = pattern.search(text_lower)
+        if match:
             claims.append({
-                'claim': re.search(pattern, text_lower).group(0)[:50],
+                'claim': match.group(0)[:50],
                 'status': status,
                 'type': 'suspicious'
             })
     
     # If no suspicious claims, check for verifiable claims
     if not claims:
-        verifiable_phrases = ['according to', 'study', 'research', 'data shows']
-        if any(phrase in text_lower for phrase in verifiable_phrases):
+        if lexicon.terms('en')['verifiable'].any_in(text_lower):
             claims.append({
                 'claim': 'Contains verifiable references',
                 'status': 'Verifiable',
@@ -304,258 +454,225 @@ def get_trust_level(confidence, fake_score):
         }
 
 
-def highlight_words(text, lang_code='en'):
-    """Identify words to highlight (supports English and Tamil)"""
-    words = text.split()
-    highlighted = []
+def highlight_words(text, lang_code='en', highlight_format='words', lexicon=None):
+    """
+    Identify words to highlight (supports English and Tamil)
     
-    # Select word lists based on language
-    if lang_code == 'ta':
-        sensational_words = TAMIL_SENSATIONAL_WORDS
-        trusted_words = TAMIL_TRUSTED_WORDS
-    else:
-        text_lower = text.lower()
-        sensational_words = SENSATIONAL_WORDS
-        trusted_words = TRUSTED_WORDS
+    highlight_format='words' returns one dict per word (legacy format)
+    highlight_format='spans' returns [start, end, type] character offsets into
+    text for suspicious and trusted words only; everything else is neutral
+    """
+    terms = (lexicon or lexicon_store.current()).terms(lang_code)
+    sensational_words = terms['sensational']
+    trusted_words = terms['trusted']
     
-    for i, word in enumerate(words):
+    def classify(word):
         if lang_code == 'ta':
             # For Tamil, check if word contains any Tamil sensational/trusted words
-            is_suspicious = any(tamil_word in word for tamil_word in sensational_words)
-            is_trusted = any(tamil_word in word for tamil_word in trusted_words)
+            word_clean = word
         else:
             word_clean = re.sub(r'[^\w]', '', word.lower())
-            is_suspicious = any(sensational in word_clean for sensational in sensational_words)
-            is_trusted = any(trusted in word_clean for trusted in trusted_words)
-        
-        if is_suspicious:
-            highlighted.append({
-                'index': i,
-                'word': word,
-                'type': 'suspicious',
-                'color': '#ef4444'
-            })
-        elif is_trusted:
-            highlighted.append({
-                'index': i,
-                'word': word,
-                'type': 'trusted',
-                'color': '#22c55e'
-            })
-        else:
-            highlighted.append({
-                'index': i,
-                'word': word,
-                'type': 'neutral',
-                'color': '#6b7280'
-            })
+        if sensational_words.any_in(word_clean):
+            return 'suspicious'
+        if trusted_words.any_in(word_clean):
+            return 'trusted'
+        return 'neutral'
+    
+    if highlight_format == 'spans':
+        spans = []
+        for match in re.finditer(r'\S+', text):
+            word_type = classify(match.group())
+            if word_type != 'neutral':
+                spans.append([match.start(), match.end(), word_type])
+        return spans
+    
+    highlighted = []
+    for i, word in enumerate(text.split()):
+        word_type = classify(word)
+        highlighted.append({
+            'index': i,
+            'word': word,
+            'type': word_type,
+            'color': HIGHLIGHT_COLORS[word_type]
+        })
     
     return highlighted
 
 
-def generate_ai_reasoning(prediction, confidence, indicators, patterns, emotions, claims, lang_code='en'):
+# Reasoning cards per message language: (title, description template, severity, icon).
+# Descriptions are str.format templates over the feature signature's values.
+REASONING_TEMPLATES = {
+    'en': {
+        'fake': ('🎯 Primary Reason',
+                 'This news was classified as FAKE with {confidence}% confidence based on multiple indicators.',
+                 'high', '🔴'),
+        'real': ('✅ Trusted News',
+                 'This news appears to be REAL with {confidence}% confidence. The content shows characteristics of credible journalism.',
+                 'low', '🟢'),
+        'sensational_words': ('📢 Sensational Language Detected',
+                              'Found {count} sensational words/phrases: {items}. Fake news often uses emotional language to manipulate readers rather than presenting facts.',
+                              'high', '⚠️'),
+        'patterns': ('🧪 Fake News Patterns Detected',
+                     'Found {count} fake news pattern(s): {items}. These are common characteristics of misinformation designed to deceive readers.',
+                     None, '🔍'),
+        'emotions': ('🎭 Emotional Manipulation',
+                     'High levels of {items} detected. Fake news often manipulates emotions rather than presenting factual information. This is a red flag for misinformation.',
+                     'high', '😱'),
+        'claims': ('🕵️ Suspicious Claims Detected',
+                   'Found {count} suspicious claim(s) that appear medically or financially unrealistic. Legitimate news typically provides verifiable evidence for such claims.',
+                   'high', '❌'),
+        'misleading_phrases': ('⚠️ Misleading Phrases',
+                               'Found misleading phrases: {items}. These phrases are often used to make unverified claims appear credible without providing actual evidence.',
+                               'medium', '⚠️'),
+        'excessive_capitals': ('📢 Excessive Capitalization',
+                               'High use of ALL CAPS detected. This is a common tactic in fake news to grab attention and create urgency, which legitimate journalism typically avoids.',
+                               'medium', '📢'),
+        'summary_fake': "This news was classified as FAKE based on {severity_score} key indicators. The content shows patterns of emotional manipulation, unverified claims, and misleading information that are characteristic of misinformation.",
+        'summary_real': "This news appears to be REAL. The content shows characteristics of credible journalism with balanced reporting and verifiable information."
+    },
+    'ta': {
+        'fake': ('🎯 முக்கிய காரணம்',
+                 'இந்த செய்தி {confidence}% நம்பகத்தன்மையுடன் போலி செய்தியாக கண்டறியப்பட்டது.',
+                 'high', '🔴'),
+        'real': ('✅ நம்பகமான செய்தி',
+                 'இந்த செய்தி {confidence}% நம்பகத்தன்மையுடன் உண்மையான செய்தியாக தோன்றுகிறது.',
+                 'low', '🟢'),
+        'sensational_words': ('📢 அதிர்ச்சி சொற்கள் கண்டறியப்பட்டன',
+                              'பின்வரும் அதிர்ச்சி சொற்கள் கண்டறியப்பட்டன: {items}. போலி செய்திகள் பெரும்பாலும் உணர்ச்சிகளை கையாள்வதற்கு இத்தகைய சொற்களை பயன்படுத்துகின்றன.',
+                              'high', '⚠️'),
+        'patterns': ('🧪 போலி செய்தி வடிவங்கள்',
+                     '{count} போலி செய்தி வடிவங்கள் கண்டறியப்பட்டன: {items}. இவை போலி செய்திகளின் பொதுவான பண்புகள்.',
+                     None, '🔍'),
+        'emotions': ('🎭 உணர்ச்சி கையாளுதல்',
+                     'உயர் நிலை உணர்ச்சிகள் கண்டறியப்பட்டன: {items}. போலி செய்திகள் பெரும்பாலும் உண்மைகளை விட உணர்ச்சிகளை கையாளுகின்றன.',
+                     'high', '😱'),
+        'claims': ('🕵️ சந்தேகத்திற்குரிய கூற்றுகள்',
+                   '{count} சந்தேகத்திற்குரிய கூற்றுகள் கண்டறியப்பட்டன. இவை மருத்துவ ரீதியாக அல்லது நிதி ரீதியாக நம்பத்தகாதவை.',
+                   'high', '❌'),
+        'misleading_phrases': ('⚠️ தவறான சொற்றொடர்கள்',
+                               'பின்வரும் தவறான சொற்றொடர்கள் கண்டறியப்பட்டன: {items}. இவை நம்பகமான ஆதாரங்கள் இல்லாமல் கூற்றுகளை முன்வைக்க பயன்படுத்தப்படுகின்றன.',
+                               'medium', '⚠️'),
+        'excessive_capitals': ('📢 அதிகமான பெரிய எழுத்துக்கள்',
+                               'உரையில் அதிகமான பெரிய எழுத்துக்கள் கண்டறியப்பட்டன. இது போலி செய்திகளில் பொதுவானது, கவனத்தை ஈர்க்க முயற்சிக்கிறது.',
+                               'medium', '📢'),
+        'summary_fake': "இந்த செய்தி {severity_score} முக்கிய காரணங்களால் போலி செய்தியாக கண்டறியப்பட்டது. இது உணர்ச்சிகளை கையாளுதல், ஆதாரமற்ற கூற்றுகள், மற்றும் தவறான வடிவங்களை கொண்டுள்ளது.",
+        'summary_real': "இந்த செய்தி நம்பகமானதாக தோன்றுகிறது. உண்மையான செய்தியியலின் பண்புகளைக் கொண்டுள்ளது."
+    }
+}
+
+# Evidence labels for detected patterns and emotions: (feature key, English, Tamil)
+REASONING_PATTERN_LABELS = (
+    ('clickbait_language', 'Clickbait language', 'கிளிக்பெயிட் மொழி'),
+    ('anonymous_source', 'Anonymous sources', 'அறியப்படாத ஆதாரங்கள்'),
+    ('exaggerated_claim', 'Exaggerated claims', 'மிகைப்படுத்தப்பட்ட கூற்றுகள்'),
+    ('no_evidence', 'No evidence', 'ஆதாரம் இல்லை'),
+    ('emotional_manipulation', 'Emotional manipulation', 'உணர்ச்சி கையாளுதல்'),
+    ('urgency_pressure', 'Urgency pressure', 'அவசர அழுத்தம்')
+)
+REASONING_EMOTION_LABELS = (
+    ('fear', 'Fear', 'பயம்'),
+    ('anger', 'Anger', 'கோபம்'),
+    ('urgency', 'Urgency', 'அவசரம்'),
+    ('sensational', 'Sensationalism', 'அதிர்ச்சி')
+)
+
+
+def _compile_reasoning_templates(templates):
+    """Bind each description template's format method once, at startup"""
+    compiled = {}
+    for lang, cards in templates.items():
+        compiled[lang] = {
+            name: card.format if isinstance(card, str) else (card[0], card[1].format, card[2], card[3])
+            for name, card in cards.items()
+        }
+    return compiled
+
+
+COMPILED_REASONING_TEMPLATES = _compile_reasoning_templates(REASONING_TEMPLATES)
+
+# Rendered explanations kept for repeated (prediction, feature signature) pairs
+REASONING_CACHE_SIZE = int(os.environ.get('REASONING_CACHE_SIZE', 4096))
+
+
+def reasoning_signature(prediction, confidence, indicators, patterns, emotions, claims, lang_code='en'):
     """
-    AI Reasoning Module - Explains WHY the news was classified as fake/real
-    Generates detailed, evidence-based explanations
+    The features generate_ai_reasoning depends on, as a hashable tuple
+    Texts with the same signature get the same explanation.
     """
-    reasons = []
-    evidence_points = []
+    sensational = indicators.get('sensational_words') or ()
+    misleading = indicators.get('misleading_phrases') or ()
+    suspicious = [c for c in claims or () if c.get('type') == 'suspicious']
+    return (
+        prediction.lower() == 'fake',
+        confidence,
+        len(sensational),
+        tuple(sensational[:3]),
+        sum(1 for v in patterns.values() if v),
+        tuple(bool(patterns.get(key)) for key, _, _ in REASONING_PATTERN_LABELS),
+        tuple(emotions.get(key, 0) > 50 for key, _, _ in REASONING_EMOTION_LABELS),
+        len(suspicious),
+        tuple(c.get('claim', '')[:50] for c in suspicious[:2]),
+        tuple(misleading[:2]),
+        bool(indicators.get('excessive_capitals')),
+        lang_code
+    )
+
+
+def _reasoning_card(template, evidence=None, severity=None, **values):
+    title, describe, default_severity, icon = template
+    card = {
+        'title': title,
+        'description': describe(**values),
+        'severity': severity or default_severity,
+        'icon': icon
+    }
+    if evidence is not None:
+        card['evidence'] = evidence
+    return card
+
+
+@lru_cache(maxsize=REASONING_CACHE_SIZE)
+def render_ai_reasoning(signature):
+    """Explanation for a reasoning_signature (cached and shared between requests, so read-only)"""
+    (is_fake, confidence, sensational_count, sensational, pattern_count, pattern_flags,
+     emotion_flags, suspicious_count, suspicious, misleading, excessive_capitals, lang_code) = signature
+    templates = COMPILED_REASONING_TEMPLATES['ta' if lang_code == 'ta' else 'en']
+    # Evidence labels are English only for English text
+    label = 1 if lang_code == 'en' else 2
+    reasons = [_reasoning_card(templates['fake' if is_fake else 'real'], confidence=confidence)]
     severity_score = 0
-    
-    is_fake = prediction.lower() == 'fake'
-    
-    # Language-specific messages
-    if lang_code == 'ta':
-        # Tamil messages
-        if is_fake:
-            reasons.append({
-                'title': '🎯 முக்கிய காரணம்',
-                'description': f'இந்த செய்தி {confidence}% நம்பகத்தன்மையுடன் போலி செய்தியாக கண்டறியப்பட்டது.',
-                'severity': 'high',
-                'icon': '🔴'
-            })
-        else:
-            reasons.append({
-                'title': '✅ நம்பகமான செய்தி',
-                'description': f'இந்த செய்தி {confidence}% நம்பகத்தன்மையுடன் உண்மையான செய்தியாக தோன்றுகிறது.',
-                'severity': 'low',
-                'icon': '🟢'
-            })
-    else:
-        # English messages
-        if is_fake:
-            reasons.append({
-                'title': '🎯 Primary Reason',
-                'description': f'This news was classified as FAKE with {confidence}% confidence based on multiple indicators.',
-                'severity': 'high',
-                'icon': '🔴'
-            })
-        else:
-            reasons.append({
-                'title': '✅ Trusted News',
-                'description': f'This news appears to be REAL with {confidence}% confidence. The content shows characteristics of credible journalism.',
-                'severity': 'low',
-                'icon': '🟢'
-            })
-    
-    # Analyze Sensational Words
-    if indicators.get('sensational_words') and len(indicators['sensational_words']) > 0:
+
+    if sensational_count:
         severity_score += 2
-        if lang_code == 'ta':
-            reasons.append({
-                'title': '📢 அதிர்ச்சி சொற்கள் கண்டறியப்பட்டன',
-                'description': f"பின்வரும் அதிர்ச்சி சொற்கள் கண்டறியப்பட்டன: {', '.join(indicators['sensational_words'][:3])}. போலி செய்திகள் பெரும்பாலும் உணர்ச்சிகளை கையாள்வதற்கு இத்தகைய சொற்களை பயன்படுத்துகின்றன.",
-                'severity': 'high',
-                'icon': '⚠️',
-                'evidence': indicators['sensational_words'][:3]
-            })
-        else:
-            reasons.append({
-                'title': '📢 Sensational Language Detected',
-                'description': f"Found {len(indicators['sensational_words'])} sensational words/phrases: {', '.join(indicators['sensational_words'][:3])}. Fake news often uses emotional language to manipulate readers rather than presenting facts.",
-                'severity': 'high',
-                'icon': '⚠️',
-                'evidence': indicators['sensational_words'][:3]
-            })
-    
-    # Analyze Patterns
-    pattern_count = sum(1 for v in patterns.values() if v)
-    if pattern_count > 0:
+        reasons.append(_reasoning_card(templates['sensational_words'], list(sensational),
+                                       count=sensational_count, items=', '.join(sensational)))
+
+    if pattern_count:
         severity_score += pattern_count
-        
-        detected_patterns = []
-        if patterns.get('clickbait_language'):
-            detected_patterns.append('Clickbait language' if lang_code == 'en' else 'கிளிக்பெயிட் மொழி')
-        if patterns.get('anonymous_source'):
-            detected_patterns.append('Anonymous sources' if lang_code == 'en' else 'அறியப்படாத ஆதாரங்கள்')
-        if patterns.get('exaggerated_claim'):
-            detected_patterns.append('Exaggerated claims' if lang_code == 'en' else 'மிகைப்படுத்தப்பட்ட கூற்றுகள்')
-        if patterns.get('no_evidence'):
-            detected_patterns.append('No evidence' if lang_code == 'en' else 'ஆதாரம் இல்லை')
-        if patterns.get('emotional_manipulation'):
-            detected_patterns.append('Emotional manipulation' if lang_code == 'en' else 'உணர்ச்சி கையாளுதல்')
-        if patterns.get('urgency_pressure'):
-            detected_patterns.append('Urgency pressure' if lang_code == 'en' else 'அவசர அழுத்தம்')
-        
-        if lang_code == 'ta':
-            reasons.append({
-                'title': '🧪 போலி செய்தி வடிவங்கள்',
-                'description': f'{pattern_count} போலி செய்தி வடிவங்கள் கண்டறியப்பட்டன: {", ".join(detected_patterns)}. இவை போலி செய்திகளின் பொதுவான பண்புகள்.',
-                'severity': 'high' if pattern_count >= 3 else 'medium',
-                'icon': '🔍',
-                'evidence': detected_patterns
-            })
-        else:
-            reasons.append({
-                'title': '🧪 Fake News Patterns Detected',
-                'description': f'Found {pattern_count} fake news pattern(s): {", ".join(detected_patterns)}. These are common characteristics of misinformation designed to deceive readers.',
-                'severity': 'high' if pattern_count >= 3 else 'medium',
-                'icon': '🔍',
-                'evidence': detected_patterns
-            })
-    
-    # Analyze Emotions
-    high_emotions = []
-    if emotions.get('fear', 0) > 50:
-        high_emotions.append('Fear' if lang_code == 'en' else 'பயம்')
-    if emotions.get('anger', 0) > 50:
-        high_emotions.append('Anger' if lang_code == 'en' else 'கோபம்')
-    if emotions.get('urgency', 0) > 50:
-        high_emotions.append('Urgency' if lang_code == 'en' else 'அவசரம்')
-    if emotions.get('sensational', 0) > 50:
-        high_emotions.append('Sensationalism' if lang_code == 'en' else 'அதிர்ச்சி')
-    
+        detected = [labels[label] for labels, flag in zip(REASONING_PATTERN_LABELS, pattern_flags) if flag]
+        reasons.append(_reasoning_card(templates['patterns'], detected,
+                                       'high' if pattern_count >= 3 else 'medium',
+                                       count=pattern_count, items=', '.join(detected)))
+
+    high_emotions = [labels[label] for labels, flag in zip(REASONING_EMOTION_LABELS, emotion_flags) if flag]
     if high_emotions and is_fake:
         severity_score += 1
-        if lang_code == 'ta':
-            reasons.append({
-                'title': '🎭 உணர்ச்சி கையாளுதல்',
-                'description': f'உயர் நிலை உணர்ச்சிகள் கண்டறியப்பட்டன: {", ".join(high_emotions)}. போலி செய்திகள் பெரும்பாலும் உண்மைகளை விட உணர்ச்சிகளை கையாளுகின்றன.',
-                'severity': 'high',
-                'icon': '😱',
-                'evidence': high_emotions
-            })
-        else:
-            reasons.append({
-                'title': '🎭 Emotional Manipulation',
-                'description': f'High levels of {", ".join(high_emotions)} detected. Fake news often manipulates emotions rather than presenting factual information. This is a red flag for misinformation.',
-                'severity': 'high',
-                'icon': '😱',
-                'evidence': high_emotions
-            })
-    
-    # Analyze Claims
-    if claims and len(claims) > 0:
-        suspicious_claims = [c for c in claims if c.get('type') == 'suspicious']
-        if suspicious_claims:
-            severity_score += len(suspicious_claims)
-            if lang_code == 'ta':
-                reasons.append({
-                    'title': '🕵️ சந்தேகத்திற்குரிய கூற்றுகள்',
-                    'description': f'{len(suspicious_claims)} சந்தேகத்திற்குரிய கூற்றுகள் கண்டறியப்பட்டன. இவை மருத்துவ ரீதியாக அல்லது நிதி ரீதியாக நம்பத்தகாதவை.',
-                    'severity': 'high',
-                    'icon': '❌',
-                    'evidence': [c.get('claim', '')[:50] for c in suspicious_claims[:2]]
-                })
-            else:
-                reasons.append({
-                    'title': '🕵️ Suspicious Claims Detected',
-                    'description': f'Found {len(suspicious_claims)} suspicious claim(s) that appear medically or financially unrealistic. Legitimate news typically provides verifiable evidence for such claims.',
-                    'severity': 'high',
-                    'icon': '❌',
-                    'evidence': [c.get('claim', '')[:50] for c in suspicious_claims[:2]]
-                })
-    
-    # Analyze Misleading Phrases
-    if indicators.get('misleading_phrases') and len(indicators['misleading_phrases']) > 0:
+        reasons.append(_reasoning_card(templates['emotions'], high_emotions, items=', '.join(high_emotions)))
+
+    if suspicious_count:
+        severity_score += suspicious_count
+        reasons.append(_reasoning_card(templates['claims'], list(suspicious), count=suspicious_count))
+
+    if misleading:
         severity_score += 1
-        if lang_code == 'ta':
-            reasons.append({
-                'title': '⚠️ தவறான சொற்றொடர்கள்',
-                'description': f"பின்வரும் தவறான சொற்றொடர்கள் கண்டறியப்பட்டன: {', '.join(indicators['misleading_phrases'][:2])}. இவை நம்பகமான ஆதாரங்கள் இல்லாமல் கூற்றுகளை முன்வைக்க பயன்படுத்தப்படுகின்றன.",
-                'severity': 'medium',
-                'icon': '⚠️',
-                'evidence': indicators['misleading_phrases'][:2]
-            })
-        else:
-            reasons.append({
-                'title': '⚠️ Misleading Phrases',
-                'description': f"Found misleading phrases: {', '.join(indicators['misleading_phrases'][:2])}. These phrases are often used to make unverified claims appear credible without providing actual evidence.",
-                'severity': 'medium',
-                'icon': '⚠️',
-                'evidence': indicators['misleading_phrases'][:2]
-            })
-    
-    # Excessive Capitals
-    if indicators.get('excessive_capitals'):
+        reasons.append(_reasoning_card(templates['misleading_phrases'], list(misleading),
+                                       items=', '.join(misleading)))
+
+    if excessive_capitals:
         severity_score += 1
-        if lang_code == 'ta':
-            reasons.append({
-                'title': '📢 அதிகமான பெரிய எழுத்துக்கள்',
-                'description': 'உரையில் அதிகமான பெரிய எழுத்துக்கள் கண்டறியப்பட்டன. இது போலி செய்திகளில் பொதுவானது, கவனத்தை ஈர்க்க முயற்சிக்கிறது.',
-                'severity': 'medium',
-                'icon': '📢'
-            })
-        else:
-            reasons.append({
-                'title': '📢 Excessive Capitalization',
-                'description': 'High use of ALL CAPS detected. This is a common tactic in fake news to grab attention and create urgency, which legitimate journalism typically avoids.',
-                'severity': 'medium',
-                'icon': '📢'
-            })
-    
-    # Generate Summary Reasoning
-    if is_fake:
-        if lang_code == 'ta':
-            summary = f"இந்த செய்தி {severity_score} முக்கிய காரணங்களால் போலி செய்தியாக கண்டறியப்பட்டது. இது உணர்ச்சிகளை கையாளுதல், ஆதாரமற்ற கூற்றுகள், மற்றும் தவறான வடிவங்களை கொண்டுள்ளது."
-        else:
-            summary = f"This news was classified as FAKE based on {severity_score} key indicators. The content shows patterns of emotional manipulation, unverified claims, and misleading information that are characteristic of misinformation."
-    else:
-        if lang_code == 'ta':
-            summary = f"இந்த செய்தி நம்பகமானதாக தோன்றுகிறது. உண்மையான செய்தியியலின் பண்புகளைக் கொண்டுள்ளது."
-        else:
-            summary = "This news appears to be REAL. The content shows characteristics of credible journalism with balanced reporting and verifiable information."
-    
+        reasons.append(_reasoning_card(templates['excessive_capitals']))
+
+    summary = templates['summary_fake'](severity_score=severity_score) if is_fake else templates['summary_real']()
     return {
         'reasons': reasons,
         'summary': summary,
@@ -564,191 +681,198 @@ def generate_ai_reasoning(prediction, confidence, indicators, patterns, emotions
     }
 
 
+def generate_ai_reasoning(prediction, confidence, indicators, patterns, emotions, claims, lang_code='en'):
+    """
+    AI Reasoning Module - Explains WHY the news was classified as fake/real
+    Generates detailed, evidence-based explanations from the reasoning templates;
+    identical feature profiles reuse the rendered explanation
+    """
+    return render_ai_reasoning(
+        reasoning_signature(prediction, confidence, indicators, patterns, emotions, claims, lang_code)
+    )
+
+
 def detect_social_media_platform(url):
     """
     Detect if URL is from a social media platform
     Returns: (platform_name, is_social_media)
     """
-    parsed = urllib.parse.urlparse(url.lower())
-    domain = parsed.netloc.replace('www.', '')
-    
-    social_platforms = {
-        'twitter.com': 'Twitter',
-        'x.com': 'Twitter',
-        'facebook.com': 'Facebook',
-        'fb.com': 'Facebook',
-        'instagram.com': 'Instagram',
-        'linkedin.com': 'LinkedIn',
-        'reddit.com': 'Reddit',
-        'youtube.com': 'YouTube',
-        'tiktok.com': 'TikTok',
-        'whatsapp.com': 'WhatsApp',
-        'telegram.org': 'Telegram',
-        'snapchat.com': 'Snapchat'
-    }
+    platform_name = platform_for_url(url)
+    return platform_name, platform_name is not None
+
+
+def parse_article_html(content):
+    """
+    Extract the title and main text of an article page
+    Returns: (title, text_content)
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # Remove script and style elements
+    for script in soup(["script", "style", "nav", "footer", "header", "aside", "advertisement"]):
+        script.decompose()
+    
+    # Try to find article title
+    title = None
+    title_selectors = [
+        'h1.article-title', 'h1.post-title', 'h1.entry-title',
+        'h1', 'title', '[property="og:title"]', '[name="twitter:title"]'
+    ]
+    
+    for selector in title_selectors:
+        element = soup.select_one(selector)
+        if element:
+            title = element.get_text().strip()
+            if title:
+                break
+    
+    if not title:
+        title = soup.find('title')
+        title = title.get_text().strip() if title else "Article"
+    
+    # Try to find main article content
+    article_content = None
+    content_selectors = [
+        'article', '[role="article"]', '.article-content', '.post-content',
+        '.entry-content', '.article-body', 'main', '.content', '#content'
+    ]
     
-    for platform_domain, platform_name in social_platforms.items():
-        if platform_domain in domain:
-            return platform_name, True
+    for selector in content_selectors:
+        element = soup.select_one(selector)
+        if element:
+            article_content = element
+            break
     
-    return None, False
+    # If no article container found, use body
+    if not article_content:
+        article_content = soup.find('body') or soup
+    
+    # Extract text
+    text_content = article_content.get_text(separator=' ', strip=True)
+    
+    # Clean up text
+    text_content = re.sub(r'\s+', ' ', text_content)  # Multiple spaces to single
+    text_content = text_content.strip()
+    
+    return title, text_content
 
 
-def extract_content_from_url(url):
+def describe_fetch_error(error):
+    """User-facing message for a failed page fetch"""
+    if isinstance(error, requests.exceptions.Timeout):
+        return "Request timeout - URL took too long to respond"
+    if isinstance(error, requests.exceptions.RequestException):
+        return f"Error fetching URL: {str(error)}"
+    if isinstance(error, RobotsDisallowed):
+        return str(error)
+    return f"Error processing URL: {str(error)}"
+
+
+def get_platform_info(url):
+    """Social media platform details of a URL, or None for other sites"""
+    platform_name, is_social = detect_social_media_platform(url)
+    return {
+        'platform': platform_name,
+        'is_social_media': is_social
+    } if is_social else None
+
+
+def extract_page_content(url, content, error=None):
     """
-    Extract article content from a URL
+    Extract article content from a fetched page (or report its fetch error)
     Supports regular websites and social media platforms
     Returns: (title, text_content, success, error_message, platform_info)
     """
-    if not URL_EXTRACTION_AVAILABLE:
-        return None, None, False, "URL extraction libraries not installed", None
+    platform_info = get_platform_info(url)
+    if error is not None:
+        return None, None, False, describe_fetch_error(error), platform_info
     
     try:
-        # Detect social media platform
-        platform_name, is_social = detect_social_media_platform(url)
-        platform_info = {
-            'platform': platform_name,
-            'is_social_media': is_social
-        } if is_social else None
-        
-        # Validate URL
-        parsed = urllib.parse.urlparse(url)
-        if not parsed.scheme or not parsed.netloc:
-            return None, None, False, "Invalid URL format", platform_info
-        
-        # Set headers to mimic a browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        }
-        
-        # Fetch the URL with timeout
-        response = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
-        response.raise_for_status()
-        
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header", "aside", "advertisement"]):
-            script.decompose()
-        
-        # Try to find article title
-        title = None
-        title_selectors = [
-            'h1.article-title', 'h1.post-title', 'h1.entry-title',
-            'h1', 'title', '[property="og:title"]', '[name="twitter:title"]'
-        ]
-        
-        for selector in title_selectors:
-            element = soup.select_one(selector)
-            if element:
-                title = element.get_text().strip()
-                if title:
-                    break
-        
-        if not title:
-            title = soup.find('title')
-            title = title.get_text().strip() if title else "Article"
-        
-        # Try to find main article content
-        article_content = None
-        content_selectors = [
-            'article', '[role="article"]', '.article-content', '.post-content',
-            '.entry-content', '.article-body', 'main', '.content', '#content'
-        ]
-        
-        for selector in content_selectors:
-            element = soup.select_one(selector)
-            if element:
-                article_content = element
-                break
-        
-        # If no article container found, use body
-        if not article_content:
-            article_content = soup.find('body') or soup
-        
-        # Extract text
-        text_content = article_content.get_text(separator=' ', strip=True)
-        
-        # Clean up text
-        text_content = re.sub(r'\s+', ' ', text_content)  # Multiple spaces to single
-        text_content = text_content.strip()
-        
-        # Check if we got meaningful content
-        if len(text_content) < 50:
-            return title, text_content, False, "Could not extract sufficient content from URL", platform_info
-        
-        return title, text_content, True, None, platform_info
-        
-    except requests.exceptions.Timeout:
-        return None, None, False, "Request timeout - URL took too long to respond", platform_info
-    except requests.exceptions.RequestException as e:
-        return None, None, False, f"Error fetching URL: {str(e)}", platform_info
+        # Page body is capped at MAX_URL_CONTENT_BYTES by the fetcher
+        title, text_content = parse_article_html(content)
     except Exception as e:
         return None, None, False, f"Error processing URL: {str(e)}", platform_info
+    
+    # Check if we got meaningful content
+    if len(text_content) < 50:
+        return title, text_content, False, "Could not extract sufficient content from URL", platform_info
+    
+    return title, text_content, True, None, platform_info
+
+
+# Real-time warning checks: (warning type, lexicon, message, severity).
+# Browsers run the same checks locally from /lexicon-bundle.
+REALTIME_CHECKS = (
+    ('exaggeration', 'exaggeration', 'This sentence shows exaggeration patterns', 'medium'),
+    ('urgency', 'urgency', 'Urgency language detected - common in fake news', 'high'),
+    ('emotion', 'fear', 'Fear-inducing language detected', 'high')
+)
+REALTIME_MIN_CHARS = 10
+REALTIME_MAX_WARNINGS = 3
 
 
 def analyze_realtime(text):
     """Real-time analysis for live warnings"""
-    if len(text.strip()) < 10:
+    if len(text.strip()) < REALTIME_MIN_CHARS:
         return {'warnings': []}
     
-    warnings = []
     text_lower = text.lower()
-    
-    # Check for exaggeration
-    exaggeration_words = ['completely', 'all', 'never', 'always', '100%', 'guaranteed']
-    if any(word in text_lower for word in exaggeration_words):
-        warnings.append({
-            'type': 'exaggeration',
-            'message': 'This sentence shows exaggeration patterns',
-            'severity': 'medium'
-        })
-    
-    # Check for urgency
-    if any(word in text_lower for word in URGENCY_WORDS):
-        warnings.append({
-            'type': 'urgency',
-            'message': 'Urgency language detected - common in fake news',
-            'severity': 'high'
-        })
-    
-    # Check for emotional manipulation
-    if any(word in text_lower for word in FEAR_WORDS):
-        warnings.append({
-            'type': 'emotion',
-            'message': 'Fear-inducing language detected',
-            'severity': 'high'
-        })
-    
-    return {'warnings': warnings[:3]}  # Limit to 3 warnings
+    terms = lexicon_store.current().terms('en')
+    warnings = [
+        {'type': warning_type, 'message': message, 'severity': severity}
+        for warning_type, name, message, severity in REALTIME_CHECKS
+        if terms[name].any_in(text_lower)
+    ]
+    return {'warnings': warnings[:REALTIME_MAX_WARNINGS]}
 
 
-def predict_fake_news(text):
+@lru_cache(maxsize=1)
+def lexicon_bundle_for(lexicon):
+    """The real-time checks of a lexicon version, in the form the browser runs them"""
+    terms = lexicon.terms('en')
+    return {
+        'version': lexicon.version,
+        'min_chars': REALTIME_MIN_CHARS,
+        'max_warnings': REALTIME_MAX_WARNINGS,
+        'checks': [
+            {'type': warning_type, 'terms': list(terms[name].terms), 'message': message, 'severity': severity}
+            for warning_type, name, message, severity in REALTIME_CHECKS
+        ]
+    }
+
+
+def predict_fake_news(text, fields=None, highlight_format=None, use_ml=True):
     """
     Enhanced fake news detection with ML + NLP features
     Supports both English and Tamil languages
     Uses Machine Learning model if available, falls back to rule-based heuristics
     
+    Args:
+        text: News article text
+        fields: Set of response fields to compute (see resolve_analysis_fields).
+                Stages whose fields are not requested are skipped. Defaults to all.
+        highlight_format: 'spans' or 'words' encoding for highlighted_words
+        use_ml: False to skip ML scoring and use the rule-based heuristics only
+                (degraded mode under overload)
+    
     Returns:
         dict: Complete analysis including trust meter, emotions, patterns, etc.
     """
+    if fields is None:
+        fields = ANALYSIS_FIELDS
+    highlight_format = highlight_format or DEFAULT_HIGHLIGHT_FORMAT
+    
+    # Expand requested fields with the stages they depend on
+    stages = set(fields)
+    for field in fields:
+        stages.update(FIELD_DEPENDENCIES.get(field, ()))
+    
     # Detect language first
     lang_code, lang_name = detect_language(text)
     
-    # Select word lists based on detected language
-    if lang_code == 'ta':
-        sensational_words = TAMIL_SENSATIONAL_WORDS
-        misleading_phrases = TAMIL_MISLEADING_PHRASES
-        text_lower = text  # Tamil doesn't use lowercase
-    else:
-        sensational_words = SENSATIONAL_WORDS
-        misleading_phrases = MISLEADING_PHRASES
-        text_lower = text.lower()
+    # Snapshot the lexicon so a concurrent reload cannot mix versions within one analysis
+    lexicon = lexicon_store.current()
+    terms = lexicon.terms(lang_code)
     
     indicators = {
         'sensational_words': [],
@@ -757,7 +881,7 @@ def predict_fake_news(text):
     }
     
     # Detect sensational words (NLP feature)
-    found_sensational = [word for word in sensational_words if word in text]
+    found_sensational = terms['sensational'].found(text)
     indicators['sensational_words'] = found_sensational[:5]
     
     # Excessive capitals (NLP feature) - only for English
@@ -768,28 +892,67 @@ def predict_fake_news(text):
         indicators['excessive_capitals'] = caps_ratio > 0.1
     
     # Misleading phrases (NLP feature)
-    found_misleading = [phrase for phrase in misleading_phrases if phrase in text]
+    found_misleading = terms['misleading'].found(text)
     indicators['misleading_phrases'] = found_misleading[:5]
     
     # Calculate fake score from NLP heuristics
     fake_score = len(found_sensational) + (1 if indicators['excessive_capitals'] else 0) + len(found_misleading)
     
+    # Snapshot the model serving this language so a concurrent hot swap cannot mix versions.
+    # Languages without a model of their own get none (rule-based analysis only).
+    model, model_version = language_router.route(lang_code) if ML_AVAILABLE and use_ml else (None, None)
+    if model is not None and not model.can_score(text):
+        # Preprocessing would leave nothing to score (e.g. only digits and punctuation)
+        model, model_version = None, None
+    
+    # Near-duplicate lookup - reuse the verdict of a recently seen near-copy
+    signature = None
+    duplicate = None
+    if NEAR_DUPLICATE_ENABLED:
+        try:
+            signature = near_duplicate_index.signature((model or ml_model).preprocess_text(text).split())
+            duplicate = near_duplicate_index.query(signature)
+        except Exception as e:
+            print(f"Near-duplicate lookup failed: {e}")
+    
+    ml_scored = False
+    if duplicate:
+        prediction, confidence, model_version = duplicate['verdict']
+        print(f"Near-duplicate of cluster {duplicate['cluster_id']} (similarity {duplicate['similarity']})")
     # MACHINE LEARNING PREDICTION (if model is available)
-    if ML_AVAILABLE and ML_MODEL_LOADED:
+    elif model is not None:
         try:
-            ml_result = ml_model.predict(text)
+            if len(text) > LONG_DOCUMENT_CHUNK_CHARS:
+                # Long document mode - score bounded chunks in one batch
+                start = time.perf_counter()
+                ml_result = model.predict_long(text)
+                ml_latency_ms = (time.perf_counter() - start) * 1000
+            else:
+                # Scored together with concurrent requests for the same model; the latency
+                # is the model's scoring time only, so shadow comparisons exclude the batch wait
+                probabilities, ml_latency_ms = micro_batcher.predict_proba_timed(model, text)
+                ml_result = model.format_prediction(probabilities)
+            
+            # Candidate model scores a sample of traffic off the request path
+            # (the candidate replaces the default model, so language models are not compared)
+            if model is model_registry.snapshot()[0]:
+                shadow_scorer.submit(text, ml_result['prediction'], ml_latency_ms)
             prediction = ml_result['prediction_label']
             confidence = ml_result['confidence']
             ml_probabilities = ml_result['probabilities']
             
-            # Combine ML confidence with NLP heuristics for better accuracy
-            # Weight: 70% ML, 30% NLP heuristics
-            nlp_confidence = min(85 + fake_score * 5, 98) if fake_score > 2 else (70 + fake_score * 4 if fake_score > 0 else 75)
-            combined_confidence = (confidence * 0.7) + (nlp_confidence * 0.3)
-            confidence = min(max(combined_confidence, 50), 99)
+            if model.calibrator is None and not model.uses_heuristic_features:
+                # Combine ML confidence with NLP heuristics for better accuracy
+                # Weight: 70% ML, 30% NLP heuristics
+                nlp_confidence = min(85 + fake_score * 5, 98) if fake_score > 2 else (70 + fake_score * 4 if fake_score > 0 else 75)
+                combined_confidence = (confidence * 0.7) + (nlp_confidence * 0.3)
+                confidence = min(max(combined_confidence, 50), 99)
+            # Calibrated models report P(predicted class) as is, so scores stay comparable across
+            # versions; models trained on the heuristic features already weigh them
             
             print(f"ML Prediction: {prediction} ({confidence:.1f}% confidence)")
             print(f"ML Probabilities: Real={ml_probabilities['real']}%, Fake={ml_probabilities['fake']}%")
+            ml_scored = True
         except Exception as e:
             print(f"ML prediction failed: {e}. Using rule-based heuristics.")
             # Fall back to rule-based
@@ -800,46 +963,67 @@ def predict_fake_news(text):
     
     confidence = round(confidence, 1)
     
+    # Index this article so later near-copies join its cluster; a near-copy is already
+    # represented by the document it matched. Only ML verdicts are reused: rule-based
+    # ones are noisy and would outlive a model published later for the language.
+    if duplicate:
+        cluster_id = duplicate['cluster_id']
+    else:
+        cluster_id = near_duplicate_index.add(signature if ml_scored else None,
+                                              (prediction, confidence, model_version))
+    
+    analysis = {
+        'prediction': prediction,
+        'confidence': round(confidence, 1),
+        'indicators': indicators,
+        'language': {
+            'code': lang_code,
+            'name': lang_name,
+            'detected': True
+        },
+        'duplicate': {
+            'cluster_id': cluster_id,
+            'matched': duplicate is not None,
+            'similarity': duplicate['similarity'] if duplicate else None
+        } if cluster_id is not None else None,
+        'model_version': model_version
+    }
+    
     # Generate summary if text is long
-    summary = generate_summary(text) if len(text) > 200 else text
+    if 'summary' in stages:
+        analysis['summary'] = generate_summary(text) if len(text) > 200 else text
     
     # Detect emotions (with language support)
-    emotions = detect_emotions(text, lang_code)
+    if 'emotions' in stages:
+        analysis['emotions'] = detect_emotions(text, lang_code, lexicon)
     
     # Detect patterns (with language support)
-    patterns = detect_patterns(text, lang_code)
+    if 'patterns' in stages:
+        analysis['patterns'] = detect_patterns(text, lang_code, lexicon)
     
     # Fact-check claims
-    claims = fact_check_claims(text)
+    if 'claims' in stages:
+        analysis['claims'] = fact_check_claims(text, lexicon)
     
     # Get trust level
-    trust_level = get_trust_level(confidence, fake_score)
+    if 'trust_level' in stages:
+        analysis['trust_level'] = get_trust_level(confidence, fake_score)
     
     # Highlight words (with language support)
-    highlighted_words = highlight_words(text, lang_code)
+    if 'highlighted_words' in stages:
+        analysis['highlighted_words'] = highlight_words(text, lang_code, highlight_format, lexicon)
+        analysis['highlight_format'] = highlight_format
     
     # Generate AI Reasoning - WHY it's fake/real
-    ai_reasoning = generate_ai_reasoning(
-        prediction, confidence, indicators, patterns, emotions, claims, lang_code
-    )
+    if 'ai_reasoning' in stages:
+        analysis['ai_reasoning'] = generate_ai_reasoning(
+            prediction, confidence, indicators, analysis['patterns'], analysis['emotions'],
+            analysis['claims'], lang_code
+        )
     
-    return {
-        'prediction': prediction,
-        'confidence': round(confidence, 1),
-        'indicators': indicators,
-        'summary': summary,
-        'emotions': emotions,
-        'patterns': patterns,
-        'claims': claims,
-        'trust_level': trust_level,
-        'highlighted_words': highlighted_words,
-        'language': {
-            'code': lang_code,
-            'name': lang_name,
-            'detected': True
-        },
-        'ai_reasoning': ai_reasoning
-    }
+    # Only serialize what was asked for
+    return {key: value for key, value in analysis.items()
+            if key in fields or (key == 'highlight_format' and 'highlighted_words' in fields)}
 
 
 @app.route('/')
@@ -849,6 +1033,7 @@ def index():
 
 
 @app.route('/predict', methods=['POST'])
+@admission.limit('predict')
 def predict():
     """Enhanced prediction endpoint with all features"""
     try:
@@ -865,16 +1050,43 @@ def predict():
         if len(text) < 10:
             return jsonify({'error': 'Text must be at least 10 characters long'}), 400
         
-        # Get comprehensive analysis
-        analysis = predict_fake_news(text)
+        if len(text) > MAX_TEXT_CHARS:
+            return jsonify({'error': f'Text must be at most {MAX_TEXT_CHARS} characters long'}), 413
+        
+        try:
+            fields = resolve_analysis_fields(data.get('profile'), data.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        highlight_format = data.get('highlight_format', DEFAULT_HIGHLIGHT_FORMAT)
+        if highlight_format not in HIGHLIGHT_FORMATS:
+            return jsonify({'error': f"highlight_format must be one of: {', '.join(HIGHLIGHT_FORMATS)}"}), 400
+        
+        # Minimal and rule-based only when admitted under overload
+        degraded = g.degraded
+        if degraded:
+            fields = resolve_analysis_fields('minimal')
         
-        return jsonify(analysis), 200
+        # Read before scoring, so a result is never labelled with versions newer than its own
+        headers = serving_version_headers()
+        if degraded:
+            headers.update(DEGRADED_HEADERS)
         
+        # Get comprehensive analysis, shared with identical requests in flight
+        key = (hashlib.sha1(text.encode('utf-8')).hexdigest(), fields, highlight_format, degraded)
+        analysis, _ = predict_flight.do(key, predict_fake_news, text, fields, highlight_format,
+                                        use_ml=not degraded)
+        
+        return jsonify(analysis), 200, headers
+        
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Request body must be at most {MAX_REQUEST_BYTES} bytes'}), 413
     except Exception as e:
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
 
 @app.route('/analyze-realtime', methods=['POST'])
+@admission.limit('realtime')
 def analyze_realtime_endpoint():
     """Real-time analysis endpoint for live warnings"""
     try:
@@ -892,7 +1104,24 @@ def analyze_realtime_endpoint():
         return jsonify({'warnings': []}), 200
 
 
+@app.route('/lexicon-bundle', methods=['GET'])
+def lexicon_bundle():
+    """
+    Word lists and messages of the real-time checks, so the browser can run them locally
+    Versioned by ETag: clients revalidate with If-None-Match and get 304 while it is unchanged.
+    The ETag also covers the serving model versions, which a 304 would not report.
+    """
+    response = app.json.response(lexicon_bundle_for(lexicon_store.current()))
+    response.headers.update(serving_version_headers())
+    response.set_etag(hashlib.sha1(
+        response.get_data() + response.headers['X-Model-Version'].encode('utf-8')
+    ).hexdigest())
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
 @app.route('/analyze-url-realtime', methods=['POST'])
+@admission.limit('realtime')
 def analyze_url_realtime():
     """Real-time URL analysis - validates and provides feedback as user types"""
     try:
@@ -960,73 +1189,332 @@ def analyze_url_realtime():
 @app.route('/model-status', methods=['GET'])
 def model_status():
     """Check if ML model is loaded and available"""
+    model_loaded = ML_AVAILABLE and model_registry.is_loaded()
     return jsonify({
         'ml_available': ML_AVAILABLE,
-        'model_loaded': ML_MODEL_LOADED if ML_AVAILABLE else False,
-        'method': 'Machine Learning + NLP' if (ML_AVAILABLE and ML_MODEL_LOADED) else 'Rule-based NLP (ML model not trained)'
+        'model_loaded': model_loaded,
+        'model_version': model_registry.active_version if ML_AVAILABLE else None,
+        'available_versions': model_registry.versions() if ML_AVAILABLE else [],
+        'language_models': language_router.status() if ML_AVAILABLE else {},
+        'method': 'Machine Learning + NLP' if model_loaded else 'Rule-based NLP (ML model not trained)'
     }), 200
 
 
-@app.route('/analyze-url', methods=['POST'])
-def analyze_url():
-    """Analyze fake news from a URL"""
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Operational metrics"""
+    return jsonify({
+        'shadow': shadow_scorer.metrics() if ML_AVAILABLE else None,
+        'online_learning': online_learner.metrics() if ML_AVAILABLE else None,
+        'admission': admission.metrics(),
+        'coalescing': {
+            'predict': predict_flight.metrics(),
+            'analyze_url': url_analysis_flight.metrics()
+        },
+        'redirect_cache': redirect_cache.metrics(),
+        'micro_batching': micro_batcher.metrics(),
+        'reasoning_cache': render_ai_reasoning.cache_info()._asdict(),
+        'lexicon': lexicon_store.metrics(),
+        'fetch': fetch_scheduler.metrics() if URL_EXTRACTION_AVAILABLE else None
+    }), 200
+
+
+def is_admin_request():
+    """Check the X-Admin-Token header against ADMIN_TOKEN"""
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+
+
+@app.route('/admin/reload-model', methods=['POST'])
+def reload_model():
+    """
+    Hot-swap the serving model without a restart
+    Body: {"version": "<version>"} to switch versions, or empty to reload CURRENT
+    """
+    if not is_admin_request():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    if not ML_AVAILABLE:
+        return jsonify({'error': 'ML model module not available'}), 503
+    
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+    
     try:
-        data = request.get_json()
+        result = model_registry.activate(version, persist=bool(version))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Model reload failed: {str(e)}'}), 500
+
+
+@app.route('/admin/reload-lexicon', methods=['POST'])
+def reload_lexicon():
+    """
+    Reload the lexicon files (lexicons/*.json) without a restart
+    Invalid files are rejected and the current lexicon keeps serving.
+    """
+    if not is_admin_request():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    try:
+        return jsonify(lexicon_store.reload()), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Lexicon reload failed: {str(e)}'}), 500
+
+
+@app.route('/feedback', methods=['POST'])
+def feedback():
+    """
+    Submit a moderator-labeled article for online learning
+    Body: {"text": "...", "label": 0 | 1} (0 = Real, 1 = Fake)
+    Labels are queued and applied in the background; the response does not wait.
+    """
+    if not is_admin_request():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    if not ML_AVAILABLE:
+        return jsonify({'error': 'ML model module not available'}), 503
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        text = str(data.get('text', '')).strip()
+        label = data.get('label')
         
-        if not data or 'url' not in data:
-            return jsonify({'error': 'Missing url field in request'}), 400
+        if len(text) < 10:
+            return jsonify({'error': 'Text must be at least 10 characters long'}), 400
         
-        url = data['url'].strip()
+        if len(text) > MAX_TEXT_CHARS:
+            return jsonify({'error': f'Text must be at most {MAX_TEXT_CHARS} characters long'}), 413
         
-        if not url:
-            return jsonify({'error': 'URL cannot be empty'}), 400
+        if label not in (0, 1) or isinstance(label, bool):
+            return jsonify({'error': 'label must be 0 (Real) or 1 (Fake)'}), 400
         
-        # Extract content from URL
-        title, text_content, success, error_message, platform_info = extract_content_from_url(url)
+        # Only the process holding the registry's writer lock learns (it may have exited since)
+        if not online_learner.start():
+            return jsonify({'error': 'Online learning runs in another worker process, try again'}), 503
         
-        if not success:
-            return jsonify({
-                'error': error_message or 'Failed to extract content from URL',
-                'url': url
-            }), 400
+        if not online_learner.submit(text, label):
+            return jsonify({'error': 'Feedback buffer is full, try again later'}), 503
         
-        if len(text_content) < 10:
+        return jsonify({'accepted': True, 'pending': online_learner.pending}), 202
+    
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Request body must be at most {MAX_REQUEST_BYTES} bytes'}), 413
+
+
+@app.route('/admin/shadow-model', methods=['POST'])
+def set_shadow_model():
+    """
+    Choose the candidate model for shadow scoring
+    Body: {"version": "<version>"} to start shadowing, {"version": null} to stop
+    """
+    if not is_admin_request():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    if not ML_AVAILABLE:
+        return jsonify({'error': 'ML model module not available'}), 503
+    
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+    
+    try:
+        candidate = model_registry.load(version) if version else None
+        shadow_scorer.set_candidate(candidate, version)
+        return jsonify({'candidate_version': version, 'sample_rate': shadow_scorer.sample_rate}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Shadow model load failed: {str(e)}'}), 500
+
+
+@app.route('/analyze-url', methods=['POST'])
+@admission.limit('analyze_url')
+def analyze_url():
+    """Analyze fake news from a URL"""
+    try:
+        url, fields, highlight_format, error = parse_url_request(request.get_json())
+        if error:
+            return jsonify(error[0]), error[1]
+        
+        # Fetch the canonical article URL (tracking params, AMP/mobile variants, shortener and
+        # known redirect hops resolved) through the host's queue; the analysis options travel
+        # with the job, and identical requests in flight join the same job
+        url = redirect_cache.resolve(url)
+        job = fetch_scheduler.submit(url, {
+            'fields': fields,
+            'highlight_format': highlight_format,
+            'degraded': g.degraded
+        }, key=(url, fields, highlight_format, g.degraded))
+        if job is None:
             return jsonify({
-                'error': 'Extracted content is too short for analysis',
+                'error': 'Too many pending page fetches, try again shortly',
                 'url': url
-            }), 400
-        
-        # Analyze the extracted content
-        analysis = predict_fake_news(text_content)
+            }), 503, {'Retry-After': '5'}
         
-        # Add URL metadata with social media info
-        analysis['source'] = {
-            'type': 'url',
-            'url': url,
-            'title': title,
-            'content_length': len(text_content),
-            'platform': platform_info.get('platform') if platform_info else None,
-            'is_social_media': platform_info.get('is_social_media', False) if platform_info else False
-        }
-        
-        # Add social media specific indicators if it's social media
-        if platform_info and platform_info.get('is_social_media'):
-            analysis['social_media'] = {
-                'platform': platform_info.get('platform'),
-                'warning': 'Social media content often spreads misinformation faster. Verify claims with official sources.',
-                'indicators': [
-                    'Unverified user content',
-                    'Potential for viral misinformation',
-                    'Limited fact-checking on platform'
-                ]
-            }
-        
-        return jsonify(analysis), 200
+        # Wait inline only if nothing is queued ahead for this host; otherwise free the worker
+        if job.position == 0 and job.wait(FETCH_WAIT_SECONDS):
+            return analyze_fetched_url(job)
+        return fetch_pending_response(job)
         
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Request body must be at most {MAX_REQUEST_BYTES} bytes'}), 413
     except Exception as e:
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
 
+def parse_url_request(data):
+    """
+    Validate an /analyze-url request body
+    Returns: (url, fields, highlight_format, error) - error is a (body, status) pair or None
+    """
+    if not data or 'url' not in data:
+        return None, None, None, ({'error': 'Missing url field in request'}, 400)
+    
+    url = data['url'].strip()
+    
+    if not url:
+        return None, None, None, ({'error': 'URL cannot be empty'}, 400)
+    
+    try:
+        fields = resolve_analysis_fields(data.get('profile'), data.get('fields'))
+    except ValueError as e:
+        return None, None, None, ({'error': str(e)}, 400)
+    
+    highlight_format = data.get('highlight_format', DEFAULT_HIGHLIGHT_FORMAT)
+    if highlight_format not in HIGHLIGHT_FORMATS:
+        return None, None, None, ({'error': f"highlight_format must be one of: {', '.join(HIGHLIGHT_FORMATS)}"}, 400)
+    
+    if not URL_EXTRACTION_AVAILABLE:
+        return None, None, None, ({'error': 'URL extraction libraries not installed', 'url': url}, 400)
+    
+    parsed = urllib.parse.urlparse(url)
+    if not parsed.scheme or not parsed.netloc:
+        return None, None, None, ({'error': 'Invalid URL format', 'url': url}, 400)
+    
+    return url, fields, highlight_format, None
+
+
+@app.route('/analyze-url/jobs/<job_id>', methods=['GET'])
+@admission.limit('analyze_url')
+def analyze_url_job(job_id):
+    """Poll a queued /analyze-url request; returns the analysis once the page is fetched"""
+    job = fetch_scheduler.get(job_id) if URL_EXTRACTION_AVAILABLE else None
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if not job.done:
+        return fetch_pending_response(job)
+    if g.degraded and 'response' not in job.context:
+        # The poll that builds the analysis had to queue, so it is built degraded
+        job.context['degraded'] = True
+    try:
+        return analyze_fetched_url(job)
+    except Exception as e:
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+def fetch_pending_response(job):
+    """202 response pointing the client at the job's status URL"""
+    status_url = url_for('analyze_url_job', job_id=job.id)
+    return jsonify({
+        'status': job.status,
+        'job_id': job.id,
+        'position': job.position,
+        'status_url': status_url,
+        'url': job.url
+    }), 202, {'Location': status_url, 'Retry-After': '1'}
+
+
+def analyze_fetched_url(job):
+    """Analysis response for a finished fetch job (computed once for all its requests and polls)"""
+    if 'response' not in job.context:
+        url_analysis_flight.do(job.id, store_url_analysis, job)
+    body, status, headers = job.context['response']
+    return jsonify(body), status, headers
+
+
+def store_url_analysis(job):
+    if 'response' not in job.context:
+        job.context['response'] = build_url_analysis(
+            job.url, job.content, job.context['fields'], job.context['highlight_format'],
+            job.context['degraded'], final_url=job.final_url, error=job.error
+        )
+        job.content = None  # Page body is no longer needed
+
+
+def build_url_analysis(url, content, fields, highlight_format, degraded=False, final_url=None, error=None):
+    """
+    (body, status, headers) of the /analyze-url response for a fetched page
+    
+    Args:
+        url: Canonical URL that was fetched
+        content: Page body (None if the fetch failed)
+        final_url: URL after redirects
+        error: Fetch exception, if the fetch failed
+    """
+    # Later requests for this URL skip the redirects the fetch followed
+    if final_url:
+        redirect_cache.record(url, canonicalize_url(final_url))
+    
+    # Extract content from URL
+    title, text_content, success, error_message, platform_info = extract_page_content(url, content, error)
+    
+    if not success:
+        return {
+            'error': error_message or 'Failed to extract content from URL',
+            'url': url
+        }, 400, {}
+    
+    if len(text_content) < 10:
+        return {
+            'error': 'Extracted content is too short for analysis',
+            'url': url
+        }, 400, {}
+    
+    # Only the first MAX_TEXT_CHARS characters of long pages are analyzed
+    content_length = len(text_content)
+    truncated = content_length > MAX_TEXT_CHARS
+    if truncated:
+        text_content = text_content[:MAX_TEXT_CHARS]
+    
+    # Analyze the extracted content
+    if degraded:
+        analysis = predict_fake_news(text_content, resolve_analysis_fields('minimal'), highlight_format,
+                                     use_ml=False)
+    else:
+        analysis = predict_fake_news(text_content, fields, highlight_format)
+    
+    # Add URL metadata with social media info
+    analysis['source'] = {
+        'type': 'url',
+        'url': url,
+        'title': title,
+        'content_length': content_length,
+        'truncated': truncated,
+        'platform': platform_info.get('platform') if platform_info else None,
+        'is_social_media': platform_info.get('is_social_media', False) if platform_info else False
+    }
+    if 'highlighted_words' in analysis:
+        # Highlights index into the analyzed text, which the client has not seen for a URL
+        analysis['source']['analyzed_text'] = text_content
+    
+    # Add social media specific indicators if it's social media
+    if platform_info and platform_info.get('is_social_media'):
+        analysis['social_media'] = {
+            'platform': platform_info.get('platform'),
+            'warning': 'Social media content often spreads misinformation faster. Verify claims with official sources.',
+            'indicators': [
+                'Unverified user content',
+                'Potential for viral misinformation',
+                'Limited fact-checking on platform'
+            ]
+        }
+    
+    return analysis, 200, DEGRADED_HEADERS if degraded else {}
+
+
 @app.route('/static/sw.js')
 def service_worker():
     """Serve service worker for PWA"""
@@ -0,0 +1,383 @@
+"""
+ASGI Serving Mode
+Serves POST /analyze-url on an asyncio event loop so one process can hold
+thousands of slow page fetches, each costing a coroutine instead of a
+worker thread
+
+- Pages are fetched with httpx's async client, with the same per-host
+  spacing, queue limit, robots.txt policy, retries and body limit as
+  fetch_scheduler; a fetch takes one of ASGI_MAX_FETCHES slots only once
+  its host's turn has come, so a slow host cannot starve the others.
+  Redirects are followed hop by hop, each hop as a fetch from its own host
+- Parsing and analysis (CPU-bound) run in a thread pool, behind the
+  analyze_url rate and concurrency limits (queued analyses are degraded)
+- Identical requests in flight share one fetch and analysis
+- Every other route is the unchanged Flask app, run in the same thread
+  pool through a small WSGI bridge
+
+Usage:
+    pip install httpx uvicorn
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+Configuration (environment variables):
+    ASGI_MAX_FETCHES    Page fetches in flight at once (default 1000)
+    ASGI_WORKERS        Threads for analysis and Flask routes (default 32)
+"""
+
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import httpx
+except ImportError as e:
+    raise ImportError("ASGI mode requires httpx: pip install httpx uvicorn") from e
+import requests
+
+from app import (
+    app, admission, build_url_analysis, fetch_scheduler, parse_url_request, redirect_cache,
+    FETCH_HEADERS, MAX_REQUEST_BYTES, MAX_URL_CONTENT_BYTES
+)
+from fetch_scheduler import RobotsDisallowed, TransientFetchError, TRANSIENT_STATUS
+
+ASGI_MAX_FETCHES = int(os.environ.get('ASGI_MAX_FETCHES', 1000))
+executor = ThreadPoolExecutor(max_workers=int(os.environ.get('ASGI_WORKERS', 32)),
+                              thread_name_prefix='asgi')
+
+
+class HostQueueFull(Exception):
+    """Too many fetches are already waiting for the host"""
+
+
+class _HostState:
+    __slots__ = ('lock', 'next_time', 'waiting')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.next_time = 0.0
+        self.waiting = 0  # fetches waiting for or holding the lock
+
+
+class AsyncFetcher:
+    """Polite async page fetches, configured like the app's FetchScheduler"""
+
+    def __init__(self, scheduler, max_fetches=ASGI_MAX_FETCHES):
+        self.scheduler = scheduler
+        self.max_fetches = max_fetches
+        self.max_hosts = scheduler.max_jobs
+        self.client = None
+        self._slots = None
+        self._hosts = {}
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                headers=FETCH_HEADERS, timeout=self.scheduler.timeout, follow_redirects=False,
+                limits=httpx.Limits(max_connections=self.max_fetches)
+            )
+            self._slots = asyncio.Semaphore(self.max_fetches)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def fetch(self, url):
+        """
+        Fetch a page, following redirects one hop at a time; every hop waits for
+        its own host's turn and is checked against that host's robots.txt
+
+        Returns:
+            tuple: (page body, URL after redirects)
+        Raises the same requests exceptions as the threaded fetcher, RobotsDisallowed,
+        or HostQueueFull when max_queue_per_host fetches are already waiting for a host
+        """
+        self.start()
+        for _ in range(self.scheduler.max_redirects + 1):
+            content, location = await self._fetch_hop(url)
+            if location is None:
+                return content, url
+            url = location
+        raise requests.exceptions.TooManyRedirects(f'Exceeded {self.scheduler.max_redirects} redirects')
+
+    async def _fetch_hop(self, url):
+        """(page body, None) of url, or (None, redirect target), once its host's turn has come"""
+        loop = asyncio.get_running_loop()
+        scheduler = self.scheduler
+        spacing = scheduler.min_interval
+        if scheduler.robots is not None:
+            # Cached after the first request per site; a miss does a blocking fetch, so off the loop
+            allowed, crawl_delay = await loop.run_in_executor(executor, scheduler.robots.policy, url)
+            if not allowed:
+                raise RobotsDisallowed("The site's robots.txt does not allow fetching this URL")
+            spacing = max(spacing, crawl_delay or 0)
+
+        host = self._host(urllib.parse.urlparse(url).netloc.lower())
+        if host.waiting >= scheduler.max_queue_per_host:
+            raise HostQueueFull('Too many pending requests for this site, try again shortly')
+        host.waiting += 1
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                async with host.lock:
+                    delay = host.next_time - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    try:
+                        # Only the fetch itself holds a slot, not the wait for the host's turn
+                        async with self._slots:
+                            return await self._get(url)
+                    except TransientFetchError as e:
+                        if attempt > scheduler.max_retries:
+                            raise e.error
+                        # Exponential backoff with jitter, at least as long as the server asked
+                        backoff = min(scheduler.max_backoff, scheduler.backoff * 2 ** (attempt - 1))
+                        retry_in = min(scheduler.max_backoff,
+                                       max(backoff * random.uniform(0.5, 1.0), e.retry_after or 0))
+                        spacing = max(spacing, retry_in)
+                    finally:
+                        host.next_time = loop.time() + spacing
+        finally:
+            host.waiting -= 1
+
+    def _host(self, name):
+        host = self._hosts.get(name)
+        if host is None:
+            if len(self._hosts) >= self.max_hosts:
+                self._prune_hosts()
+            host = self._hosts[name] = _HostState()
+        return host
+
+    def _prune_hosts(self):
+        """Forget hosts with no fetch waiting whose spacing has passed"""
+        now = asyncio.get_running_loop().time()
+        for name in [name for name, host in self._hosts.items() if not host.waiting and host.next_time <= now]:
+            del self._hosts[name]
+
+    async def _get(self, url):
+        max_bytes = MAX_URL_CONTENT_BYTES
+        try:
+            async with self.client.stream('GET', url) as response:
+                if response.is_redirect:
+                    return None, urllib.parse.urljoin(url, response.headers['Location'])
+                if response.status_code >= 400:
+                    error = requests.exceptions.HTTPError(f'{response.status_code} Error for url: {response.url}')
+                    if response.status_code not in TRANSIENT_STATUS:
+                        raise error
+                    retry_after = response.headers.get('Retry-After', '')
+                    raise TransientFetchError(error, float(retry_after) if retry_after.isdigit() else None)
+
+                chunks = []
+                total = 0
+                async for chunk in response.aiter_bytes(64 * 1024):
+                    chunks.append(chunk)
+                    total += len(chunk)
+                    if total >= max_bytes:
+                        break
+                return b''.join(chunks)[:max_bytes], None
+        except httpx.TimeoutException as e:
+            raise TransientFetchError(requests.exceptions.Timeout(str(e)))
+        except httpx.TransportError as e:
+            raise TransientFetchError(requests.exceptions.ConnectionError(str(e)))
+
+
+fetcher = AsyncFetcher(fetch_scheduler) if fetch_scheduler is not None else None
+_in_flight = {}  # coalescing key -> task
+
+
+async def _analyze(url, fields, highlight_format):
+    """(body, status, headers) of the analysis of url"""
+    try:
+        content, final_url = await fetcher.fetch(url)
+        error = None
+    except HostQueueFull as e:
+        return {'error': str(e), 'url': url}, 503, {'Retry-After': '5'}
+    except Exception as e:
+        content, final_url, error = None, None, e
+
+    # The analysis is what the analyze_url concurrency limit protects; waiting for the page holds no slot
+    loop = asyncio.get_running_loop()
+    limiter = admission.limiters['analyze_url']
+    outcome = await loop.run_in_executor(executor, admission.admit, 'analyze_url')
+    if outcome in (limiter.REJECTED, limiter.TIMED_OUT):
+        return ({'error': 'Server is busy, try again shortly'}, 503,
+                {'Retry-After': str(max(1, round(limiter.queue_timeout)))})
+    try:
+        return await loop.run_in_executor(
+            executor, build_url_analysis, url, content, fields, highlight_format,
+            outcome == limiter.QUEUED, final_url, error
+        )
+    finally:
+        limiter.release()
+
+
+async def analyze_url(scope, receive, send):
+    """Async POST /analyze-url"""
+    body = await read_body(receive, MAX_REQUEST_BYTES)
+    if body is None:
+        return await send_json(scope, send, {'error': f'Request body must be at most {MAX_REQUEST_BYTES} bytes'}, 413)
+
+    client = scope.get('client')
+    retry_after = admission.check_rate('analyze_url', client[0] if client else None)
+    if retry_after:
+        return await send_json(scope, send, {'error': 'Rate limit exceeded, slow down'}, 429,
+                               {'Retry-After': str(max(1, round(retry_after)))})
+
+    try:
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            return await send_json(scope, send, {'error': 'Request body must be JSON'}, 400)
+
+        url, fields, highlight_format, error = parse_url_request(data)
+        if error:
+            return await send_json(scope, send, *error)
+
+        loop = asyncio.get_running_loop()
+        url = await loop.run_in_executor(executor, redirect_cache.resolve, url)
+
+        # Identical requests in flight share one fetch and analysis
+        key = (url, fields, highlight_format)
+        task = _in_flight.get(key)
+        if task is None:
+            task = _in_flight[key] = asyncio.ensure_future(_analyze(url, fields, highlight_format))
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+        result, status, headers = await asyncio.shield(task)
+        await send_json(scope, send, result, status, headers)
+    except Exception as e:
+        await send_json(scope, send, {'error': f'Server error: {str(e)}'}, 500)
+
+
+async def read_body(receive, max_bytes):
+    """Request body, or None if it exceeds max_bytes"""
+    chunks = []
+    total = 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        total += len(chunk)
+        if total > max_bytes:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def _render_json(scope, body, status, headers):
+    """Build the response with Flask, so CORS, serializer and compression settings apply"""
+    request_headers = [(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']]
+    with app.test_request_context(scope['path'], method=scope['method'], headers=request_headers):
+        response = app.make_response((app.json.response(body), status, headers or {}))
+        response = app.process_response(response)
+        return response.status_code, list(response.headers.items()), response.get_data()
+
+
+async def send_json(scope, send, body, status=200, headers=None):
+    status, headers, data = await asyncio.get_running_loop().run_in_executor(
+        executor, _render_json, scope, body, status, headers
+    )
+    await send_response(send, status, headers, data)
+
+
+async def send_response(send, status, headers, data):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    })
+    await send({'type': 'http.response.body', 'body': data})
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    client = scope.get('client')
+    if client:
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = client[0], str(client[1])
+    for name, value in scope['headers']:
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def run_wsgi(environ):
+    """Run the Flask app on one request, returning (status, headers, body)"""
+    started = []
+
+    def start_response(status, headers, exc_info=None):
+        started[:] = [status, headers]
+
+    result = app(environ, start_response)
+    try:
+        data = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    status, headers = started
+    return int(status.split(' ', 1)[0]), headers, data
+
+
+async def wsgi_route(scope, receive, send):
+    """Any other route: the Flask app in the thread pool (request bodies are small JSON)"""
+    body = await read_body(receive, MAX_REQUEST_BYTES)
+    if body is None:
+        return await send_json(scope, send, {'error': f'Request body must be at most {MAX_REQUEST_BYTES} bytes'}, 413)
+    status, headers, data = await asyncio.get_running_loop().run_in_executor(
+        executor, run_wsgi, build_environ(scope, body)
+    )
+    await send_response(send, status, headers, data)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            if fetcher is not None:
+                fetcher.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if fetcher is not None:
+                await fetcher.close()
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+    if scope['method'] == 'POST' and scope['path'] == '/analyze-url' and fetcher is not None:
+        return await analyze_url(scope, receive, send)
+    return await wsgi_route(scope, receive, send)
@@ -0,0 +1,295 @@
+"""
+Benchmark Script for Fake News Detection System
+Measures latency and payload size of the analysis pipeline
+
+Usage:
+    python benchmark.py profiles [--size 50000] [--runs 20]
+    python benchmark.py serializers [--size 50000] [--runs 50]
+    python benchmark.py near-duplicates [--docs 1000000] [--queries 1000]
+    python benchmark.py vectorizers [--runs 200]
+    python benchmark.py load-test [--concurrency 32] [--requests 5000] [--window-ms 2] [--max-batch 32]
+"""
+
+import argparse
+import itertools
+import os
+import pickle
+import random
+import resource
+import statistics
+import threading
+import time
+
+
+def build_article(size):
+    """Build a synthetic article of roughly `size` characters from the sample data"""
+    from train_model import create_sample_data
+
+    texts, _ = create_sample_data()
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        sentence = texts[i % len(texts)]
+        parts.append(sentence)
+        length += len(sentence) + 1
+        i += 1
+    return ' '.join(parts)[:size]
+
+
+def time_calls(func, runs):
+    """Run func `runs` times and return latencies in milliseconds"""
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def print_row(name, latencies, payload_bytes):
+    """Print one result row"""
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<12} {statistics.median(latencies):>10.2f} {p95:>10.2f} {payload_bytes:>14,}")
+
+
+def benchmark_profiles(args):
+    """Latency and response size of /predict for each analysis profile"""
+    # The same article is posted repeatedly; the near-duplicate index would answer
+    # every call after the first without ML scoring
+    os.environ['NEAR_DUPLICATE_ENABLED'] = '0'
+    # Measure the pipeline, not the per-client rate limit
+    os.environ['RATE_LIMIT_PER_SECOND'] = '0'
+    from app import app, ANALYSIS_PROFILES
+
+    client = app.test_client()
+    text = build_article(args.size)
+    print(f"Article size: {len(text):,} characters, {args.runs} runs per profile\n")
+    print(f"{'profile':<12} {'p50 (ms)':>10} {'p95 (ms)':>10} {'payload (B)':>14}")
+
+    for profile in ANALYSIS_PROFILES:
+        payload = {'text': text, 'profile': profile}
+        response = client.post('/predict', json=payload)
+        if response.status_code != 200:
+            print(f"{profile:<12} failed: {response.get_json()}")
+            continue
+
+        def call():
+            response = client.post('/predict', json=payload)
+            assert response.status_code == 200, response.get_json()
+            assert 'X-Degraded' not in response.headers, 'degraded response'
+
+        latencies = time_calls(call, args.runs)
+        print_row(profile, latencies, len(response.data))
+
+
+def benchmark_serializers(args):
+    """Encoding time and compressed size of real analysis payloads per serializer"""
+    from app import app, predict_fake_news
+    from flask.json.provider import DefaultJSONProvider
+    from response_serializer import FastJSONProvider, ORJSON_AVAILABLE, compress_body
+
+    text = build_article(args.size)
+    tamil_text = ' '.join(['இந்த செய்தி அதிர்ச்சி ரகசியம் ஆதாரங்கள் கூறுகின்றன.'] * (args.size // 50))
+    payloads = {
+        'full/spans': predict_fake_news(text, highlight_format='spans'),
+        'full/words': predict_fake_news(text, highlight_format='words'),
+        'tamil/words': predict_fake_news(tamil_text, highlight_format='words'),
+    }
+
+    serializers = ['stdlib'] + (['orjson'] if ORJSON_AVAILABLE else [])
+    if not ORJSON_AVAILABLE:
+        print("orjson not installed - only the stdlib encoder is measured\n")
+
+    print(f"{'payload':<14} {'encoder':<8} {'p50 (ms)':>10} {'bytes':>12} {'identical':>10} {'gzip (B)':>10} {'gzip (ms)':>10}")
+    with app.app_context():
+        for name, payload in payloads.items():
+            reference = DefaultJSONProvider(app).response(payload).get_data()
+            for serializer in serializers:
+                provider = FastJSONProvider(app, serializer)
+                body = provider.response(payload).get_data()
+                latencies = sorted(time_calls(lambda: provider.response(payload).get_data(), args.runs))
+                start = time.perf_counter()
+                compressed = compress_body(body, 'gzip')
+                gzip_ms = (time.perf_counter() - start) * 1000
+                print(f"{name:<14} {serializer:<8} {statistics.median(latencies):>10.2f} {len(body):>12,} "
+                      f"{str(body == reference):>10} {len(compressed):>10,} {gzip_ms:>10.2f}")
+
+
+def benchmark_near_duplicates(args):
+    """Lookup latency of the near-duplicate index with --docs indexed documents"""
+    from near_duplicate import NearDuplicateIndex
+
+    rng = random.Random(42)
+    vocabulary = [f"tok{i}" for i in range(50000)]
+    index = NearDuplicateIndex(capacity=args.docs)
+
+    def random_doc():
+        return [rng.choice(vocabulary) for _ in range(args.tokens)]
+
+    print(f"Indexing {args.docs:,} documents of {args.tokens} tokens...")
+    originals = []
+    start = time.perf_counter()
+    for i in range(args.docs):
+        tokens = random_doc()
+        if i % max(args.docs // args.queries, 1) == 0:
+            originals.append(tokens)
+        index.add(index.signature(tokens), ('Real', 80.0))
+    build_seconds = time.perf_counter() - start
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Built in {build_seconds:.1f}s ({build_seconds / args.docs * 1e6:.0f} us/doc), peak RSS {rss_mb:,.0f} MB\n")
+
+    def near_copy(tokens):
+        tokens = list(tokens)
+        for _ in range(max(len(tokens) // 20, 1)):
+            tokens[rng.randrange(len(tokens))] = rng.choice(vocabulary)
+        return tokens
+
+    print(f"{'query':<14} {'p50 (ms)':>10} {'p99 (ms)':>10} {'hit rate':>10}")
+    for name, docs in (('near-copy', [near_copy(d) for d in originals[:args.queries]]),
+                       ('novel', [random_doc() for _ in range(args.queries)])):
+        latencies = []
+        hits = 0
+        for tokens in docs:
+            start = time.perf_counter()
+            match = index.query(index.signature(tokens))
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += match is not None
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:<14} {statistics.median(latencies):>10.3f} {p99:>10.3f} {hits / len(docs):>10.1%}")
+
+
+def benchmark_vectorizers(args):
+    """Accuracy, artifact size, memory and latency of the TF-IDF and hashing vectorizers"""
+    import tracemalloc
+    from ml_model import FakeNewsMLModel
+    from train_model import load_training_data
+
+    texts, labels = load_training_data()
+    sample = texts[:max(1, min(len(texts), 50))]
+    rows = []
+    for vectorizer_type in ('tfidf', 'hashing'):
+        model = FakeNewsMLModel(vectorizer_type=vectorizer_type)
+        model.train(texts, labels)
+        accuracy = model.evaluate_processed(model.holdout_texts, model.holdout_labels, model.holdout_raw_texts)
+
+        blob = pickle.dumps(model.vectorizer)
+        tracemalloc.start()
+        start = time.perf_counter()
+        pickle.loads(blob)
+        load_ms = (time.perf_counter() - start) * 1000
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        sample_iter = itertools.cycle(sample)
+        latencies = time_calls(lambda: model.predict(next(sample_iter)), args.runs)
+        rows.append((vectorizer_type, accuracy, len(blob), memory, load_ms, statistics.median(latencies)))
+
+    print(f"\n{'vectorizer':<10} {'accuracy':>9} {'pickle (B)':>12} {'memory (B)':>12} {'load (ms)':>10} {'predict (ms)':>13}")
+    for name, accuracy, size, memory, load_ms, predict_ms in rows:
+        print(f"{name:<10} {accuracy:>9.4f} {size:>12,} {memory:>12,} {load_ms:>10.2f} {predict_ms:>13.3f}")
+
+
+def run_load(score, texts, concurrency, requests):
+    """
+    Closed-loop load: `concurrency` threads call score(text) until `requests` calls are done
+
+    Returns:
+        tuple: (requests per second, sorted latencies in milliseconds)
+    """
+    counter = itertools.count()
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for i in counter:
+            if i >= requests:
+                break
+            start = time.perf_counter()
+            score(texts[i % len(texts)])
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return requests / (time.perf_counter() - start), sorted(latencies)
+
+
+def benchmark_load_test(args):
+    """Throughput and tail latency of concurrent ML scoring with and without micro-batching"""
+    from ml_model import FakeNewsMLModel
+    from micro_batcher import MicroBatcher
+    from train_model import load_training_data
+
+    texts, labels = load_training_data()
+    model = FakeNewsMLModel(vectorizer_type=args.vectorizer)
+    model.train(texts, labels)
+    batcher = MicroBatcher(window_ms=args.window_ms, max_batch_size=args.max_batch)
+    modes = {
+        'direct': lambda text: model.predict_proba_batch([text])[0],
+        'batched': lambda text: batcher.predict_proba(model, text)
+    }
+
+    print(f"{args.requests:,} requests, {args.concurrency} concurrent clients, window {args.window_ms} ms, "
+          f"max batch {args.max_batch}\n")
+    print(f"{'mode':<10} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'avg batch':>10}")
+    for name, score in modes.items():
+        run_load(score, texts, args.concurrency, min(args.requests, 200))  # Warm-up
+        before = batcher.metrics()
+        throughput, latencies = run_load(score, texts, args.concurrency, args.requests)
+        after = batcher.metrics()
+        batches = after['batches'] - before['batches']
+        avg_batch = (after['texts'] - before['texts']) / batches if batches else 1.0
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:<10} {throughput:>10,.0f} {statistics.median(latencies):>10.2f} {p99:>10.2f} {avg_batch:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake News Detection benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    profiles = subparsers.add_parser('profiles', help='Benchmark analysis profiles')
+    profiles.add_argument('--size', type=int, default=50000, help='Article size in characters')
+    profiles.add_argument('--runs', type=int, default=20, help='Requests per profile')
+    profiles.set_defaults(func=benchmark_profiles)
+
+    serializers = subparsers.add_parser('serializers', help='Benchmark JSON response serializers')
+    serializers.add_argument('--size', type=int, default=50000, help='Article size in characters')
+    serializers.add_argument('--runs', type=int, default=50, help='Encodings per serializer')
+    serializers.set_defaults(func=benchmark_serializers)
+
+    near_duplicates = subparsers.add_parser('near-duplicates', help='Benchmark near-duplicate index lookups')
+    near_duplicates.add_argument('--docs', type=int, default=1000000, help='Documents to index')
+    near_duplicates.add_argument('--tokens', type=int, default=200, help='Tokens per document')
+    near_duplicates.add_argument('--queries', type=int, default=1000, help='Lookups per query type')
+    near_duplicates.set_defaults(func=benchmark_near_duplicates)
+
+    vectorizers = subparsers.add_parser('vectorizers', help='Compare TF-IDF and hashing vectorizers')
+    vectorizers.add_argument('--runs', type=int, default=200, help='Single-text predictions per vectorizer')
+    vectorizers.set_defaults(func=benchmark_vectorizers)
+
+    load_test = subparsers.add_parser('load-test', help='Concurrent ML scoring with and without micro-batching')
+    load_test.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+    load_test.add_argument('--requests', type=int, default=5000, help='Predictions per mode')
+    load_test.add_argument('--window-ms', type=float, default=2.0, help='Micro-batch window')
+    load_test.add_argument('--max-batch', type=int, default=32, help='Maximum micro-batch size')
+    load_test.add_argument('--vectorizer', choices=['tfidf', 'hashing'], default='tfidf', help='Model vectorizer')
+    load_test.set_defaults(func=benchmark_load_test)
+
+    args = parser.parse_args()
+    print("=" * 60)
+    print("Fake News Detection Benchmark")
+    print("=" * 60)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
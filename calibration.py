@@ -0,0 +1,106 @@
+"""
+Probability Calibration for the Fake News Classifier
+Maps raw classifier decision scores to calibrated P(fake)
+
+Both calibrators are fitted once at training time and reduce to a few
+NumPy operations at inference: Platt scaling is a sigmoid of an affine
+function of the score, isotonic calibration is a linear interpolation
+over the fitted step points.
+"""
+
+import numpy as np
+from sklearn.isotonic import IsotonicRegression
+from sklearn.linear_model import LogisticRegression
+
+CALIBRATION_METHODS = ('platt', 'isotonic')
+
+
+class PlattCalibrator:
+    """Sigmoid calibration: P(fake) = 1 / (1 + exp(-(a * score + b)))"""
+
+    method = 'platt'
+
+    def __init__(self, threshold=0.5):
+        self.a = 1.0
+        self.b = 0.0
+        self.threshold = threshold
+
+    def fit(self, scores, labels):
+        # Large C: plain maximum likelihood, as in Platt's method
+        lr = LogisticRegression(C=1e6).fit(np.asarray(scores).reshape(-1, 1), labels)
+        self.a = float(lr.coef_[0, 0])
+        self.b = float(lr.intercept_[0])
+        return self
+
+    def transform(self, scores):
+        return 1.0 / (1.0 + np.exp(-(self.a * np.asarray(scores, dtype=np.float64) + self.b)))
+
+
+class IsotonicCalibrator:
+    """Monotonic step calibration, stored as interpolation points"""
+
+    method = 'isotonic'
+
+    def __init__(self, threshold=0.5):
+        self.x_ = np.array([0.0])
+        self.y_ = np.array([0.5])
+        self.threshold = threshold
+
+    def fit(self, scores, labels):
+        isotonic = IsotonicRegression(out_of_bounds='clip', y_min=0.0, y_max=1.0).fit(scores, labels)
+        self.x_ = isotonic.X_thresholds_.astype(np.float64)
+        self.y_ = isotonic.y_thresholds_.astype(np.float64)
+        return self
+
+    def transform(self, scores):
+        return np.interp(np.asarray(scores, dtype=np.float64), self.x_, self.y_)
+
+
+def make_calibrator(method, threshold=0.5):
+    """Create an unfitted calibrator by name"""
+    if method == 'platt':
+        return PlattCalibrator(threshold)
+    if method == 'isotonic':
+        return IsotonicCalibrator(threshold)
+    raise ValueError(f"calibration must be one of: {', '.join(CALIBRATION_METHODS)}")
+
+
+def sweep_thresholds(probabilities, labels, thresholds):
+    """
+    Classification metrics of P(fake) at every decision threshold at once
+
+    Args:
+        probabilities: P(fake) per held-out text
+        labels: true labels (0 = Real, 1 = Fake)
+        thresholds: decision thresholds to evaluate
+
+    Returns:
+        list of dicts with threshold, accuracy, precision, recall, f1 and fake_rate
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    labels = np.asarray(labels).astype(bool)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+
+    # One row per threshold, one column per text
+    predicted = probabilities[None, :] > thresholds[:, None]
+    true_positive = (predicted & labels).sum(axis=1)
+    predicted_positive = predicted.sum(axis=1)
+    actual_positive = labels.sum()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted_positive > 0, true_positive / predicted_positive, 0.0)
+        recall = true_positive / actual_positive if actual_positive else np.zeros(len(thresholds))
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    accuracy = (predicted == labels).mean(axis=1)
+
+    return [
+        {
+            'threshold': round(float(thresholds[i]), 4),
+            'accuracy': round(float(accuracy[i]), 4),
+            'precision': round(float(precision[i]), 4),
+            'recall': round(float(recall[i]), 4),
+            'f1': round(float(f1[i]), 4),
+            'fake_rate': round(float(predicted_positive[i] / len(labels)), 4)
+        }
+        for i in range(len(thresholds))
+    ]
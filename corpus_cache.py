@@ -0,0 +1,168 @@
+"""
+Persistent Preprocessed-Corpus Cache
+Content-addressed on-disk store of preprocess_text output for training runs
+
+Every row is keyed by the SHA-1 of its raw text, inside a directory per
+preprocessing version, so editing preprocess_text (and bumping
+PREPROCESS_VERSION) invalidates everything while appending rows to a
+dataset only preprocesses the new rows.
+
+Layout (one set of files per append-only segment):
+    cache/corpus/v<version>/<segment>.keys.npy     sorted 20-byte row keys
+    cache/corpus/v<version>/<segment>.offsets.npy  int64 offsets into .data
+    cache/corpus/v<version>/<segment>.data         concatenated UTF-8 texts
+
+Keys and offsets are memory-mapped NumPy arrays and the data file is
+memory-mapped bytes, so lookups never load the whole cache into memory.
+"""
+
+import hashlib
+import mmap
+import os
+import time
+
+import numpy as np
+
+from ml_model import PREPROCESS_VERSION
+
+CORPUS_CACHE_DIR = os.path.join('cache', 'corpus')
+KEY_DTYPE = 'S20'
+MAX_SEGMENTS = 8
+
+
+def row_key(text):
+    """Content address of one raw text"""
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+
+def dataset_hash(keys):
+    """Hash of a whole dataset, from its ordered row keys"""
+    return hashlib.sha1(keys.tobytes()).hexdigest()
+
+
+class CorpusSegment:
+    """One immutable, memory-mapped segment of cached rows"""
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = np.load(path + '.keys.npy', mmap_mode='r')
+        self.offsets = np.load(path + '.offsets.npy', mmap_mode='r')
+        self._file = open(path + '.data', 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, keys):
+        """Positions of keys in this segment (-1 where absent)"""
+        if not len(self.keys):
+            return np.full(len(keys), -1)
+        positions = np.searchsorted(self.keys, keys)
+        positions = np.minimum(positions, len(self.keys) - 1)
+        return np.where(self.keys[positions] == keys, positions, -1)
+
+    def text(self, position):
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return self._data[start:end].decode('utf-8')
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    @staticmethod
+    def write(path, keys, texts):
+        """Write rows as a new segment, sorted by key"""
+        order = np.argsort(keys)
+        encoded = [texts[i].encode('utf-8') for i in order]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+        # Data and offsets first, keys last: a segment only counts once its keys file exists
+        tmp = path + '.tmp'
+        with open(tmp + '.data', 'wb') as f:
+            f.write(b''.join(encoded))
+        np.save(tmp + '.offsets.npy', offsets)
+        np.save(tmp + '.keys.npy', keys[order])
+        os.replace(tmp + '.data', path + '.data')
+        os.replace(tmp + '.offsets.npy', path + '.offsets.npy')
+        os.replace(tmp + '.keys.npy', path + '.keys.npy')
+
+
+class PreprocessedCorpusCache:
+    """Append-only cache of preprocessed texts for one preprocessing version"""
+
+    def __init__(self, root=CORPUS_CACHE_DIR, version=PREPROCESS_VERSION):
+        self.directory = os.path.join(root, f'v{version}')
+        os.makedirs(self.directory, exist_ok=True)
+        self.segments = [CorpusSegment(path) for path in self._segment_paths()]
+
+    def _segment_paths(self):
+        names = sorted(name[:-len('.keys.npy')] for name in os.listdir(self.directory)
+                       if name.endswith('.keys.npy') and '.tmp' not in name)
+        return [os.path.join(self.directory, name) for name in names]
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+    def preprocess(self, texts, preprocess_fn):
+        """
+        Return preprocess_fn(text) for every text, reusing cached rows
+        Only rows missing from the cache are preprocessed, then appended
+        as a new segment.
+        """
+        start = time.perf_counter()
+        keys = np.array([row_key(text) for text in texts], dtype=KEY_DTYPE)
+        processed = [None] * len(texts)
+
+        missing = np.ones(len(keys), dtype=bool)
+        for segment in self.segments:
+            if not missing.any():
+                break
+            indices = np.flatnonzero(missing)
+            positions = segment.find(keys[indices])
+            for index, position in zip(indices[positions >= 0], positions[positions >= 0]):
+                processed[index] = segment.text(position)
+            missing[indices[positions >= 0]] = False
+
+        # Duplicate rows in the dataset are preprocessed once
+        new_rows = {}
+        for index in np.flatnonzero(missing):
+            key = keys[index]
+            if key not in new_rows:
+                new_rows[key] = preprocess_fn(texts[index])
+            processed[index] = new_rows[key]
+
+        if new_rows:
+            self._append(new_rows)
+
+        hits = len(texts) - int(missing.sum())
+        print(f"Corpus cache: dataset {dataset_hash(keys)[:12]}, {hits}/{len(texts)} rows cached, "
+              f"{len(new_rows)} preprocessed ({time.perf_counter() - start:.1f}s)")
+        return processed
+
+    def _append(self, rows):
+        path = os.path.join(self.directory, f'{time.time_ns():020d}')
+        CorpusSegment.write(path, np.array(list(rows), dtype=KEY_DTYPE), list(rows.values()))
+        self.segments.append(CorpusSegment(path))
+        if len(self.segments) > MAX_SEGMENTS:
+            self.compact()
+
+    def compact(self):
+        """Merge all segments into one"""
+        keys, texts = [], []
+        for segment in self.segments:
+            keys.extend(segment.keys)
+            texts.extend(segment.text(i) for i in range(len(segment)))
+        old_paths = [segment.path for segment in self.segments]
+        self.close()
+
+        path = os.path.join(self.directory, f'{time.time_ns():020d}')
+        CorpusSegment.write(path, np.array(keys, dtype=KEY_DTYPE), texts)
+        for old_path in old_paths:
+            for suffix in ('.keys.npy', '.offsets.npy', '.data'):
+                os.remove(old_path + suffix)
+        self.segments = [CorpusSegment(path)]
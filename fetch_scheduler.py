@@ -0,0 +1,394 @@
+"""
+Polite URL Fetch Scheduler
+Fetches pages for /analyze-url with per-host request spacing, a cached
+robots.txt policy (Disallow rules and Crawl-delay) and retry with
+exponential backoff for transient failures
+
+Each host has its own FIFO queue and fetches at most one page at a time,
+no sooner than its spacing allows. A single dispatcher thread hands the
+next due host to a small worker pool, so a burst of requests for one site
+waits in that site's queue instead of holding web server threads.
+Redirects are followed one hop at a time: each hop is queued on its target
+host, so it gets that host's robots.txt check and spacing.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+import urllib.parse
+import urllib.robotparser
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Responses worth retrying later; other errors are final
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+
+def read_limited_content(response, max_bytes):
+    """Read a streamed response body, stopping after max_bytes"""
+    chunks = []
+    total = 0
+    try:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= max_bytes:
+                break
+    finally:
+        response.close()
+    return b''.join(chunks)[:max_bytes]
+
+
+class RobotsDisallowed(Exception):
+    """The site's robots.txt does not allow fetching the URL"""
+
+
+class TransientFetchError(Exception):
+    """A failure worth retrying, with the server's Retry-After in seconds if it sent one"""
+
+    def __init__(self, error, retry_after=None):
+        super().__init__(str(error))
+        self.error = error
+        self.retry_after = retry_after
+
+
+class RobotsCache:
+    """robots.txt rules per origin, refetched after ttl seconds"""
+
+    def __init__(self, user_agent='*', headers=None, ttl=3600.0, error_ttl=300.0, max_origins=10000):
+        self.user_agent = user_agent
+        self.headers = headers or {}
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_origins = max_origins
+        self._entries = OrderedDict()  # origin -> (expires, parser or None = allow all)
+        self._lock = threading.Lock()
+
+    def _load(self, origin):
+        """Parsed robots.txt of origin, or None if everything is allowed, plus how long to keep it"""
+        try:
+            response = requests.get(f'{origin}/robots.txt', headers=self.headers, timeout=5)
+        except requests.exceptions.RequestException:
+            # Unreachable robots.txt: allow, but ask again soon
+            return None, self.error_ttl
+        if response.status_code >= 500:
+            return None, self.error_ttl
+        if response.status_code >= 400:
+            return None, self.ttl
+        parser = urllib.robotparser.RobotFileParser()
+        parser.parse(response.text.splitlines())
+        return parser, self.ttl
+
+    def policy(self, url):
+        """
+        robots.txt rules for url's origin
+
+        Returns:
+            tuple: (allowed, crawl_delay) - crawl_delay is None if the site sets none
+        """
+        parsed = urllib.parse.urlparse(url)
+        origin = f'{parsed.scheme}://{parsed.netloc}'
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(origin)
+        if entry is None or entry[0] <= now:
+            # Only the host's own worker loads its robots.txt, so no two loads race
+            parser, ttl = self._load(origin)
+            entry = (now + ttl, parser)
+            with self._lock:
+                self._entries[origin] = entry
+                self._entries.move_to_end(origin)
+                if len(self._entries) > self.max_origins:
+                    self._entries.popitem(last=False)
+
+        parser = entry[1]
+        if parser is None:
+            return True, None
+        delay = parser.crawl_delay(self.user_agent)
+        return parser.can_fetch(self.user_agent, url), float(delay) if delay is not None else None
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FetchJob:
+    """One page fetch; `context` holds whatever the caller needs to finish the request later"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, url, host, context=None, key=None):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.host = host
+        self.context = context if context is not None else {}
+        self.key = key
+        self.shared = 0         # later submissions coalesced into this job
+        self.current_url = url  # next URL to fetch, moved along redirects
+        self.redirects = 0
+        self.status = self.QUEUED
+        self.position = 0       # jobs ahead of this one for the same host when submitted
+        self.attempts = 0
+        self.content = None     # page body (bytes) once DONE
+        self.final_url = None   # URL after redirects once DONE
+        self.error = None       # exception once FAILED
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the fetch finishes; False on timeout"""
+        return self._done.wait(timeout)
+
+    def _finish(self, content=None, final_url=None, error=None):
+        self.content = content
+        self.final_url = final_url
+        self.error = error
+        self.status = self.FAILED if error is not None else self.DONE
+        self.finished_at = time.monotonic()
+        self._done.set()
+
+
+class _Host:
+    __slots__ = ('name', 'queue', 'busy', 'next_time')
+
+    def __init__(self, name):
+        self.name = name
+        self.queue = deque()
+        self.busy = False
+        self.next_time = 0.0
+
+
+class FetchScheduler:
+    """Per-host queues, spacing, robots.txt and retries for page fetches"""
+
+    def __init__(self, headers=None, timeout=10, max_bytes=5 * 1024 * 1024, min_interval=1.0,
+                 max_workers=8, max_retries=2, backoff=1.0, max_backoff=30.0,
+                 max_queue_per_host=50, respect_robots=True, robots_ttl=3600.0,
+                 robots_user_agent='*', job_ttl=600.0, max_jobs=10000, max_redirects=10):
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_queue_per_host = max_queue_per_host
+        self.job_ttl = job_ttl
+        self.max_jobs = max_jobs
+        self.max_redirects = max_redirects
+        self.robots = RobotsCache(robots_user_agent, self.headers, robots_ttl) if respect_robots else None
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+        self._cond = threading.Condition()
+        self._hosts = {}
+        self._ready = []  # heap of (due time, seq, host): hosts with queued jobs and no fetch running
+        self._seq = itertools.count()
+        self._jobs = {}
+        self._finished = OrderedDict()  # job id -> finished job, oldest first
+        self._pending = {}  # coalescing key -> unfinished job
+        self._thread = None
+        self._metrics = {'submitted': 0, 'coalesced': 0, 'fetched': 0, 'failed': 0, 'retries': 0,
+                         'redirects': 0, 'robots_blocked': 0, 'rejected': 0}
+
+    def start(self):
+        """Start the dispatcher thread (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._dispatch, name='fetch-scheduler', daemon=True)
+            self._thread.start()
+
+    def submit(self, url, context=None, key=None):
+        """
+        Queue a fetch of url behind earlier fetches from the same host
+        While a job submitted with the same key is unfinished, that job is
+        returned instead, so identical concurrent requests fetch only once.
+
+        Returns:
+            FetchJob, or None if the host's queue is full or all max_jobs
+            retained jobs are still unfinished
+        """
+        host_name = urllib.parse.urlparse(url).netloc.lower()
+        job = FetchJob(url, host_name, context, key)
+        with self._cond:
+            pending = self._pending.get(key) if key is not None else None
+            if pending is not None:
+                pending.shared += 1
+                self._metrics['coalesced'] += 1
+                return pending
+
+            self._prune(time.monotonic())
+            host = self._hosts.get(host_name)
+            if host is None:
+                host = self._hosts[host_name] = _Host(host_name)
+            if len(host.queue) >= self.max_queue_per_host or len(self._jobs) >= self.max_jobs:
+                self._metrics['rejected'] += 1
+                return None
+
+            job.position = len(host.queue) + host.busy
+            host.queue.append(job)
+            if len(host.queue) == 1 and not host.busy:
+                heapq.heappush(self._ready, (host.next_time, next(self._seq), host))
+                self._cond.notify()
+            self._jobs[job.id] = job
+            if key is not None:
+                self._pending[key] = job
+            self._metrics['submitted'] += 1
+        return job
+
+    def get(self, job_id):
+        """Job by id, or None once it has expired"""
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def _prune(self, now):
+        """
+        Forget finished jobs past job_ttl (or the oldest finished ones beyond
+        max_jobs) and idle hosts; queued and running jobs are always kept
+        """
+        while self._finished:
+            job = next(iter(self._finished.values()))
+            if now - job.finished_at <= self.job_ttl and len(self._jobs) < self.max_jobs:
+                break
+            self._finished.popitem(last=False)
+            del self._jobs[job.id]
+        if len(self._hosts) > self.max_jobs:
+            for name in [name for name, host in self._hosts.items()
+                         if not host.queue and not host.busy and host.next_time <= now]:
+                del self._hosts[name]
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._ready or self._ready[0][0] > time.monotonic():
+                    self._cond.wait(self._ready[0][0] - time.monotonic() if self._ready else None)
+                _, _, host = heapq.heappop(self._ready)
+                job = host.queue.popleft()
+                host.busy = True
+                job.status = FetchJob.RUNNING
+            self._executor.submit(self._run, host, job)
+
+    def _run(self, host, job):
+        spacing = self.min_interval
+        retry_in = None
+        redirect_to = None
+        try:
+            url = job.current_url
+            allowed, crawl_delay = self.robots.policy(url) if self.robots is not None else (True, None)
+            if crawl_delay:
+                spacing = max(spacing, crawl_delay)
+            if not allowed:
+                self._count('robots_blocked')
+                job._finish(error=RobotsDisallowed("The site's robots.txt does not allow fetching this URL"))
+            else:
+                job.attempts += 1
+                content, location = self._fetch(url)
+                if location is None:
+                    job._finish(content=content, final_url=url)
+                    self._count('fetched')
+                elif job.redirects >= self.max_redirects:
+                    self._count('failed')
+                    job._finish(error=requests.exceptions.TooManyRedirects(
+                        f'Exceeded {self.max_redirects} redirects'))
+                else:
+                    job.redirects += 1
+                    job.attempts = 0
+                    job.current_url = redirect_to = location
+                    self._count('redirects')
+        except TransientFetchError as e:
+            if job.attempts <= self.max_retries:
+                # Exponential backoff with jitter, at least as long as the server asked
+                delay = min(self.max_backoff, self.backoff * 2 ** (job.attempts - 1))
+                retry_in = min(self.max_backoff, max(delay * random.uniform(0.5, 1.0), e.retry_after or 0))
+                self._count('retries')
+            else:
+                self._count('failed')
+                job._finish(error=e.error)
+        except Exception as e:
+            self._count('failed')
+            job._finish(error=e)
+        finally:
+            with self._cond:
+                if job.done:
+                    self._finished[job.id] = job
+                    if self._pending.get(job.key) is job:
+                        del self._pending[job.key]
+                host.busy = False
+                now = time.monotonic()
+                host.next_time = now + spacing
+                if retry_in is not None:
+                    job.status = FetchJob.QUEUED
+                    host.queue.appendleft(job)
+                    host.next_time = max(host.next_time, now + retry_in)
+                if host.queue:
+                    heapq.heappush(self._ready, (host.next_time, next(self._seq), host))
+                    self._cond.notify()
+                if redirect_to is not None:
+                    self._enqueue_hop(job, redirect_to)
+
+    def _enqueue_hop(self, job, url):
+        """Queue the next redirect hop of job on its target host (called with self._cond held)"""
+        name = urllib.parse.urlparse(url).netloc.lower()
+        host = self._hosts.get(name)
+        if host is None:
+            host = self._hosts[name] = _Host(name)
+        job.host = name
+        job.status = FetchJob.QUEUED
+        host.queue.append(job)
+        if len(host.queue) == 1 and not host.busy:
+            heapq.heappush(self._ready, (host.next_time, next(self._seq), host))
+            self._cond.notify()
+
+    def _fetch(self, url):
+        """
+        (page body, None) of url, or (None, redirect target) if it redirects
+        Raises TransientFetchError for failures worth retrying.
+        """
+        try:
+            response = requests.get(url, headers=self.headers, timeout=self.timeout,
+                                    allow_redirects=False, stream=True)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            raise TransientFetchError(e)
+        if response.is_redirect:
+            location = urllib.parse.urljoin(url, response.headers['Location'])
+            response.close()
+            return None, location
+        if response.status_code in TRANSIENT_STATUS:
+            retry_after = response.headers.get('Retry-After', '')
+            response.close()
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                raise TransientFetchError(e, float(retry_after) if retry_after.isdigit() else None)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        return read_limited_content(response, self.max_bytes), None
+
+    def _count(self, key):
+        with self._cond:
+            self._metrics[key] += 1
+
+    def metrics(self):
+        """Fetch counts plus current queue state"""
+        with self._cond:
+            metrics = dict(self._metrics)
+            metrics.update({
+                'queued': sum(len(host.queue) for host in self._hosts.values()),
+                'running': sum(host.busy for host in self._hosts.values()),
+                'hosts': len(self._hosts),
+                'jobs': len(self._jobs)
+            })
+        metrics['robots_cached'] = len(self.robots) if self.robots is not None else 0
+        return metrics
@@ -0,0 +1,183 @@
+"""
+Vectorized Heuristic Feature Extractor
+Turns a batch of texts into a dense NumPy matrix of the NLP heuristics
+used by predict_fake_news (sensational words, capitals, misleading
+phrases, emotions, patterns, trusted sources)
+
+Every lexicon term is tested once per text to build a term-presence
+matrix; all lexicon-based features then come out of a single matrix
+product with a term-to-feature membership matrix.
+
+The built-in extractor uses the lexicon loaded at import. A model trained
+on heuristic features saves its extractor's state (term lists plus lexicon
+version) and rebuilds the extractor from it on load, so later lexicon
+edits do not change the features the model sees.
+"""
+
+import re
+
+import numpy as np
+
+from lexicon import (
+    LEXICON_VERSION, SENSATIONAL_WORDS, MISLEADING_PHRASES, FEAR_WORDS, ANGER_WORDS, URGENCY_WORDS,
+    SENSATIONAL_WORDS_EMOTION, TRUSTED_WORDS, TAMIL_SENSATIONAL_WORDS, TAMIL_MISLEADING_PHRASES,
+    TAMIL_FEAR_WORDS, TAMIL_ANGER_WORDS, TAMIL_URGENCY_WORDS, TAMIL_TRUSTED_WORDS,
+    CLICKBAIT_PHRASES, ANONYMOUS_SOURCE_PHRASES, EXAGGERATED_CLAIMS, EVIDENCE_PHRASES,
+    TAMIL_CLICKBAIT_PHRASES, TAMIL_ANONYMOUS_SOURCE_PHRASES, TAMIL_EXAGGERATED_CLAIMS,
+    TAMIL_EVIDENCE_PHRASES
+)
+
+HEURISTIC_FEATURES = (
+    'sensational_count', 'misleading_count', 'excessive_capitals', 'caps_ratio', 'fake_score',
+    'fear', 'anger', 'urgency', 'sensational_emotion',
+    'clickbait_language', 'anonymous_source', 'exaggerated_claim', 'no_evidence',
+    'emotional_manipulation', 'urgency_pressure',
+    'trusted_count', 'log_word_count', 'is_tamil'
+)
+
+TAMIL_SCRIPT = re.compile('[\u0B80-\u0BFF]')
+
+# (group, terms, source) per language; source is the text form the terms are
+# matched against, mirroring predict_fake_news, detect_emotions and detect_patterns
+LEXICON_GROUPS = {
+    'en': (
+        ('sensational_count', SENSATIONAL_WORDS, 'raw'),
+        ('misleading_count', MISLEADING_PHRASES, 'raw'),
+        ('fear', FEAR_WORDS, 'raw'),
+        ('anger', ANGER_WORDS, 'raw'),
+        ('urgency', URGENCY_WORDS, 'raw'),
+        ('sensational_emotion', SENSATIONAL_WORDS_EMOTION, 'raw'),
+        ('clickbait_language', CLICKBAIT_PHRASES, 'lower'),
+        ('anonymous_source', ANONYMOUS_SOURCE_PHRASES, 'lower'),
+        ('exaggerated_claim', EXAGGERATED_CLAIMS, 'lower'),
+        ('evidence', EVIDENCE_PHRASES, 'lower'),
+        ('emotional_manipulation', FEAR_WORDS + ANGER_WORDS, 'lower'),
+        ('urgency_pressure', URGENCY_WORDS, 'lower'),
+        ('trusted_count', TRUSTED_WORDS, 'lower'),
+    ),
+    'ta': (
+        ('sensational_count', TAMIL_SENSATIONAL_WORDS, 'raw'),
+        ('misleading_count', TAMIL_MISLEADING_PHRASES, 'raw'),
+        ('fear', TAMIL_FEAR_WORDS, 'raw'),
+        ('anger', TAMIL_ANGER_WORDS, 'raw'),
+        ('urgency', TAMIL_URGENCY_WORDS, 'raw'),
+        ('sensational_emotion', TAMIL_SENSATIONAL_WORDS, 'raw'),
+        ('clickbait_language', TAMIL_CLICKBAIT_PHRASES, 'raw'),
+        ('anonymous_source', TAMIL_ANONYMOUS_SOURCE_PHRASES, 'raw'),
+        ('exaggerated_claim', TAMIL_EXAGGERATED_CLAIMS, 'raw'),
+        ('evidence', TAMIL_EVIDENCE_PHRASES, 'raw'),
+        ('emotional_manipulation', TAMIL_FEAR_WORDS + TAMIL_ANGER_WORDS, 'raw'),
+        ('urgency_pressure', TAMIL_URGENCY_WORDS, 'raw'),
+        ('trusted_count', TAMIL_TRUSTED_WORDS, 'raw'),
+    )
+}
+
+EMOTION_GROUPS = ('fear', 'anger', 'urgency', 'sensational_emotion')
+PATTERN_GROUPS = ('clickbait_language', 'anonymous_source', 'exaggerated_claim',
+                  'emotional_manipulation', 'urgency_pressure')
+
+
+class HeuristicFeatureExtractor:
+    """Batch extractor of HEURISTIC_FEATURES from raw texts"""
+
+    def __init__(self, lexicon_groups=LEXICON_GROUPS, version=LEXICON_VERSION):
+        self.lexicon_groups = lexicon_groups
+        self.version = version
+        self.groups = tuple(name for name, _, _ in lexicon_groups['en'])
+        self._index = {name: i for i, name in enumerate(self.groups)}
+        self._languages = {lang: self._compile(groups) for lang, groups in lexicon_groups.items()}
+
+    def state(self):
+        """Plain-data term lists and lexicon version, saved with a trained model"""
+        return {
+            'version': self.version,
+            'groups': {lang: [(group, list(terms), source) for group, terms, source in groups]
+                       for lang, groups in self.lexicon_groups.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Extractor over the term lists of a state() dict"""
+        groups = {lang: tuple((group, tuple(terms), source) for group, terms, source in lang_groups)
+                  for lang, lang_groups in state['groups'].items()}
+        return cls(groups, state['version'])
+
+    def _compile(self, groups):
+        """Deduplicated (term, source) vocabulary plus its term-to-group count matrix"""
+        vocabulary = {}
+        entries = []
+        for group, terms, source in groups:
+            for term in terms:
+                key = (term, source)
+                if key not in vocabulary:
+                    vocabulary[key] = len(vocabulary)
+                entries.append((vocabulary[key], self._index[group]))
+        membership = np.zeros((len(vocabulary), len(self.groups)), dtype=np.float32)
+        for term_index, group_index in entries:
+            membership[term_index, group_index] += 1
+        sizes = np.array([len(terms) for _, terms, _ in groups], dtype=np.float32)
+        return list(vocabulary), membership, np.maximum(sizes, 1)
+
+    def transform(self, texts):
+        """
+        Heuristic feature matrix of texts
+
+        Returns:
+            float32 array of shape (len(texts), len(HEURISTIC_FEATURES))
+        """
+        n = len(texts)
+        counts = np.zeros((n, len(self.groups)), dtype=np.float32)
+        sizes = np.ones((n, len(self.groups)), dtype=np.float32)
+        word_counts = np.zeros(n, dtype=np.float32)
+        caps_counts = np.zeros(n, dtype=np.float32)
+        is_tamil = np.zeros(n, dtype=bool)
+
+        for i, text in enumerate(texts):
+            is_tamil[i] = bool(TAMIL_SCRIPT.search(text))
+            words = text.split()
+            word_counts[i] = len(words)
+            if not is_tamil[i]:
+                caps_counts[i] = sum(1 for word in words if word.isupper() and len(word) > 2)
+
+        for lang, rows in (('en', np.flatnonzero(~is_tamil)), ('ta', np.flatnonzero(is_tamil))):
+            if not len(rows):
+                continue
+            vocabulary, membership, group_sizes = self._languages[lang]
+            presence = np.zeros((len(rows), len(vocabulary)), dtype=np.float32)
+            for row, i in enumerate(rows):
+                forms = {'raw': texts[i], 'lower': texts[i].lower()}
+                presence[row] = [term in forms[source] for term, source in vocabulary]
+            counts[rows] = presence @ membership
+            sizes[rows] = group_sizes
+
+        group = lambda name: counts[:, self._index[name]]
+        caps_ratio = np.divide(caps_counts, word_counts, out=np.zeros(n, dtype=np.float32),
+                               where=word_counts > 0)
+        excessive_capitals = (caps_ratio > 0.1).astype(np.float32)
+
+        columns = {
+            'sensational_count': group('sensational_count'),
+            'misleading_count': group('misleading_count'),
+            'excessive_capitals': excessive_capitals,
+            'caps_ratio': caps_ratio,
+            'fake_score': group('sensational_count') + excessive_capitals + group('misleading_count'),
+            'no_evidence': ((group('evidence') == 0) & (word_counts > 50)).astype(np.float32),
+            'trusted_count': group('trusted_count'),
+            'log_word_count': np.log1p(word_counts),
+            'is_tamil': is_tamil.astype(np.float32)
+        }
+        for name in EMOTION_GROUPS:
+            # Share of the emotion lexicon present, as in detect_emotions
+            columns[name] = group(name) / sizes[:, self._index[name]]
+        for name in PATTERN_GROUPS:
+            columns[name] = (group(name) > 0).astype(np.float32)
+
+        return np.column_stack([columns[name] for name in HEURISTIC_FEATURES]).astype(np.float32)
+
+
+default_extractor = HeuristicFeatureExtractor()
+
+
+def extract_heuristic_features(texts):
+    """Heuristic feature matrix of texts using the built-in lexicons"""
+    return default_extractor.transform(texts)
@@ -0,0 +1,272 @@
+"""
+Lexicon Store with Hot Reload
+Word and phrase lists shared by the analysis pipeline in app.py and the
+heuristic feature extractor used by the ML model
+
+Layout:
+    lexicons/<language>.json    {"terms": {"<lexicon>": [...]},
+                                 "claim_patterns": [["<regex>", "<status>"], ...]}
+
+Each load compiles the files into an immutable Lexicon snapshot (term
+tuples plus one precompiled regex per lexicon) whose version is a hash of
+the file contents. A reload builds and validates the new snapshot while
+the old one keeps serving, then swaps it in with a single reference
+assignment; invalid files leave the old snapshot in place.
+
+The module-level constants below are the lexicon loaded at import. New ML
+models are trained on them; a trained model saves the term lists it used
+and keeps scoring with those, whatever the files say after a restart.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from types import MappingProxyType
+
+LEXICON_DIR = os.environ.get('LEXICON_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicons'))
+DEFAULT_LANGUAGE = 'en'
+
+# Lexicons every language file must define
+REQUIRED_LEXICONS = (
+    'sensational', 'misleading', 'fear', 'anger', 'urgency', 'sensational_emotion', 'trusted',
+    'clickbait', 'anonymous_source', 'exaggerated', 'evidence'
+)
+# Lexicons the language-independent checks (realtime warnings, claims) read from DEFAULT_LANGUAGE
+DEFAULT_LANGUAGE_LEXICONS = ('exaggeration', 'verifiable')
+
+
+class TermMatcher:
+    """Immutable list of terms, each matched as a substring"""
+
+    __slots__ = ('terms', '_pattern')
+
+    def __init__(self, terms):
+        self.terms = tuple(terms)
+        self._pattern = re.compile('|'.join(re.escape(term) for term in self.terms)) if self.terms else None
+
+    def any_in(self, text):
+        """True if any term occurs in text (one regex scan)"""
+        return self._pattern is not None and self._pattern.search(text) is not None
+
+    def found(self, text):
+        """Terms that occur in text, in lexicon order"""
+        if not self.any_in(text):
+            return []
+        return [term for term in self.terms if term in text]
+
+    def count(self, text):
+        """Number of terms that occur in text"""
+        return len(self.found(text))
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __iter__(self):
+        return iter(self.terms)
+
+
+class Lexicon:
+    """One loaded version of all language lexicons; never modified after loading"""
+
+    __slots__ = ('version', 'loaded_at', '_languages', '_claim_patterns')
+
+    def __init__(self, version, languages, claim_patterns):
+        self.version = version
+        self.loaded_at = time.time()
+        self._languages = MappingProxyType(languages)
+        self._claim_patterns = MappingProxyType(claim_patterns)
+
+    @property
+    def languages(self):
+        return sorted(self._languages)
+
+    def terms(self, lang_code=DEFAULT_LANGUAGE):
+        """name -> TermMatcher for a language, falling back to DEFAULT_LANGUAGE"""
+        return self._languages.get(lang_code) or self._languages[DEFAULT_LANGUAGE]
+
+    def claim_patterns(self, lang_code=DEFAULT_LANGUAGE):
+        """(compiled regex, status) pairs of suspicious claims for a language"""
+        return self._claim_patterns.get(lang_code, ())
+
+    def to_dict(self):
+        """Plain lists of every lexicon, keyed by language"""
+        return {
+            lang: {
+                'terms': {name: list(matcher.terms) for name, matcher in lexicons.items()},
+                'claim_patterns': [[pattern.pattern, status] for pattern, status in self.claim_patterns(lang)]
+            }
+            for lang, lexicons in self._languages.items()
+        }
+
+
+def _lexicon_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+
+
+def _parse_language(lang, data):
+    """Validated TermMatchers and claim patterns of one language file"""
+    terms = data.get('terms') if isinstance(data, dict) else None
+    if not isinstance(terms, dict):
+        raise ValueError(f"{lang}: expected an object with a 'terms' object")
+    required = REQUIRED_LEXICONS + (DEFAULT_LANGUAGE_LEXICONS if lang == DEFAULT_LANGUAGE else ())
+    missing = [name for name in required if name not in terms]
+    if missing:
+        raise ValueError(f"{lang}: missing lexicons {', '.join(missing)}")
+
+    matchers = {}
+    for name, words in terms.items():
+        if not isinstance(words, list) or not all(isinstance(word, str) and word for word in words):
+            raise ValueError(f"{lang}.{name}: expected a list of non-empty strings")
+        matchers[name] = TermMatcher(words)
+
+    patterns = []
+    for entry in data.get('claim_patterns', []):
+        if not (isinstance(entry, list) and len(entry) == 2 and all(isinstance(part, str) for part in entry)):
+            raise ValueError(f"{lang}.claim_patterns: expected [regex, status] pairs")
+        try:
+            patterns.append((re.compile(entry[0]), entry[1]))
+        except re.error as e:
+            raise ValueError(f"{lang}.claim_patterns: invalid regex {entry[0]!r}: {e}")
+    return MappingProxyType(matchers), tuple(patterns)
+
+
+def load_lexicon(directory=LEXICON_DIR):
+    """
+    Compile every lexicons/<language>.json file into a Lexicon
+    Raises ValueError if a file is malformed or DEFAULT_LANGUAGE is missing.
+    """
+    digest = hashlib.sha256()
+    languages = {}
+    claim_patterns = {}
+    for name in _lexicon_files(directory):
+        with open(os.path.join(directory, name), 'rb') as f:
+            raw = f.read()
+        digest.update(name.encode('utf-8') + b'\0' + raw + b'\0')
+        lang = name[:-len('.json')]
+        try:
+            data = json.loads(raw.decode('utf-8'))
+        except ValueError as e:
+            raise ValueError(f"{name}: invalid JSON: {e}")
+        languages[lang], claim_patterns[lang] = _parse_language(lang, data)
+
+    if DEFAULT_LANGUAGE not in languages:
+        raise ValueError(f"No {DEFAULT_LANGUAGE}.json lexicon in {directory}")
+    return Lexicon(digest.hexdigest()[:12], languages, claim_patterns)
+
+
+class LexiconStore:
+    """The lexicon currently serving, reloaded from its directory on demand or on change"""
+
+    def __init__(self, directory=LEXICON_DIR, lexicon=None):
+        self.directory = directory
+        self._current = lexicon or load_lexicon(directory)
+        self._load_lock = threading.Lock()
+        self._watcher = None
+        self._metrics = {'reloads': 0, 'failed_reloads': 0}
+
+    def current(self):
+        """The Lexicon serving now; callers keep this snapshot for a whole request"""
+        return self._current
+
+    @property
+    def version(self):
+        return self._current.version
+
+    def reload(self):
+        """
+        Load the lexicon files and swap them in
+        The previous lexicon keeps serving if the files are invalid (ValueError).
+
+        Returns:
+            dict with the new and previous version and the load time in milliseconds
+        """
+        with self._load_lock:
+            start = time.perf_counter()
+            try:
+                lexicon = load_lexicon(self.directory)
+            except Exception:
+                self._metrics['failed_reloads'] += 1
+                raise
+            load_ms = (time.perf_counter() - start) * 1000
+
+            previous = self._current.version
+            if lexicon.version != previous:
+                self._current = lexicon
+                self._metrics['reloads'] += 1
+                print(f"Lexicon version {lexicon.version} active (was {previous}, loaded in {load_ms:.0f} ms)")
+            return {'version': lexicon.version, 'previous_version': previous, 'load_ms': round(load_ms, 1)}
+
+    def _files_state(self):
+        """(name, mtime, size) of the lexicon files, to notice edits cheaply"""
+        state = []
+        for name in _lexicon_files(self.directory):
+            stat = os.stat(os.path.join(self.directory, name))
+            state.append((name, stat.st_mtime_ns, stat.st_size))
+        return tuple(state)
+
+    def start_watcher(self, interval):
+        """Poll the lexicon files every `interval` seconds and reload when they change"""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        # Baseline taken before returning, so edits made right after startup are not missed
+        initial_state = self._files_state()
+
+        def watch():
+            last_state = initial_state
+            while True:
+                time.sleep(interval)
+                try:
+                    state = self._files_state()
+                    if state == last_state:
+                        continue
+                    last_state = state
+                    self.reload()
+                except Exception as e:
+                    print(f"Hot reload of lexicons failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='lexicon-watcher', daemon=True)
+        self._watcher.start()
+
+    def metrics(self):
+        lexicon = self._current
+        metrics = dict(self._metrics)
+        metrics.update({'version': lexicon.version, 'languages': lexicon.languages,
+                        'loaded_at': round(lexicon.loaded_at, 3)})
+        return metrics
+
+
+# Lexicon loaded at import
+_initial = load_lexicon()
+LEXICON_VERSION = _initial.version
+_en = _initial.terms('en')
+_ta = _initial.terms('ta')
+
+SENSATIONAL_WORDS = _en['sensational'].terms
+MISLEADING_PHRASES = _en['misleading'].terms
+FEAR_WORDS = _en['fear'].terms
+ANGER_WORDS = _en['anger'].terms
+URGENCY_WORDS = _en['urgency'].terms
+SENSATIONAL_WORDS_EMOTION = _en['sensational_emotion'].terms
+TRUSTED_WORDS = _en['trusted'].terms
+
+TAMIL_SENSATIONAL_WORDS = _ta['sensational'].terms
+TAMIL_MISLEADING_PHRASES = _ta['misleading'].terms
+TAMIL_FEAR_WORDS = _ta['fear'].terms
+TAMIL_ANGER_WORDS = _ta['anger'].terms
+TAMIL_URGENCY_WORDS = _ta['urgency'].terms
+TAMIL_TRUSTED_WORDS = _ta['trusted'].terms
+
+# Fake news pattern phrases (detect_patterns)
+CLICKBAIT_PHRASES = _en['clickbait'].terms
+ANONYMOUS_SOURCE_PHRASES = _en['anonymous_source'].terms
+EXAGGERATED_CLAIMS = _en['exaggerated'].terms
+EVIDENCE_PHRASES = _en['evidence'].terms
+
+TAMIL_CLICKBAIT_PHRASES = _ta['clickbait'].terms
+TAMIL_ANONYMOUS_SOURCE_PHRASES = _ta['anonymous_source'].terms
+TAMIL_EXAGGERATED_CLAIMS = _ta['exaggerated'].terms
+TAMIL_EVIDENCE_PHRASES = _ta['evidence'].terms
@@ -0,0 +1,121 @@
+"""
+Micro-Batching of Concurrent Predictions
+Single-text predictions that arrive within a short window are scored by
+the model in one vectorized call, and each caller gets its own row back
+
+There is no background thread: the first caller for a model opens a
+batch, waits up to the window (or until the batch is full) while other
+callers join it, then scores the whole batch. A caller that finds no
+other batch being scored and whose previous batch was a single text is
+alone, and skips the wait. Each model gets its own batches, so routed
+per-language models are never mixed.
+
+predict_proba_timed also reports how long the model took to score the
+caller's batch, without the time spent waiting for it, so latency
+comparisons (shadow scoring) are not skewed by the batching window.
+"""
+
+import threading
+import time
+
+
+class _Batch:
+    __slots__ = ('texts', 'full', 'done', 'result', 'error', 'scoring_ms')
+
+    def __init__(self):
+        self.texts = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.scoring_ms = 0.0
+
+
+class MicroBatcher:
+    """Coalesces concurrent predict_proba calls per model into batches"""
+
+    def __init__(self, window_ms=2.0, max_batch_size=32):
+        """
+        Args:
+            window_ms: How long the first text of a batch waits for others (0 disables batching)
+            max_batch_size: Batch size that is scored at once without waiting out the window
+        """
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._open = {}  # model -> batch still accepting texts
+        self._scoring = 0  # batches being scored right now
+        self._last_size = 1
+        self._lock = threading.Lock()
+        self._metrics = {'batches': 0, 'texts': 0, 'largest_batch': 0, 'scoring_ms': 0.0}
+
+    def predict_proba(self, model, text):
+        """[real, fake] probabilities of text, scored together with concurrent callers"""
+        return self.predict_proba_timed(model, text)[0]
+
+    def predict_proba_timed(self, model, text):
+        """
+        Like predict_proba, plus the model's own scoring time
+
+        Returns:
+            tuple: ([real, fake] probabilities, milliseconds the model spent scoring
+                   the batch the text was in, excluding any wait for the batch)
+        """
+        if self.window <= 0 or self.max_batch_size <= 1:
+            start = time.perf_counter()
+            probabilities = model.predict_proba_batch([text])[0]
+            return probabilities, (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            batch = self._open.get(model)
+            leader = batch is None
+            if leader:
+                batch = self._open[model] = _Batch()
+            index = len(batch.texts)
+            batch.texts.append(text)
+            if len(batch.texts) >= self.max_batch_size:
+                del self._open[model]
+                batch.full.set()
+            # Waiting only pays off when other requests are around
+            concurrent = self._scoring > 0 or self._last_size > 1
+
+        if leader:
+            if concurrent:
+                batch.full.wait(self.window)
+            with self._lock:
+                if self._open.get(model) is batch:
+                    del self._open[model]
+                self._scoring += 1
+            self._score(model, batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.result[index], batch.scoring_ms
+
+    def _score(self, model, batch):
+        start = time.perf_counter()
+        try:
+            batch.result = model.predict_proba_batch(batch.texts)
+        except Exception as e:
+            batch.error = e
+        finally:
+            batch.scoring_ms = (time.perf_counter() - start) * 1000
+            batch.done.set()
+        with self._lock:
+            self._scoring -= 1
+            self._last_size = len(batch.texts)
+            self._metrics['batches'] += 1
+            self._metrics['texts'] += len(batch.texts)
+            self._metrics['largest_batch'] = max(self._metrics['largest_batch'], len(batch.texts))
+            self._metrics['scoring_ms'] += batch.scoring_ms
+
+    def metrics(self):
+        """Batch counts and sizes"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        batches = metrics['batches']
+        metrics['avg_batch_size'] = round(metrics['texts'] / batches, 2) if batches else 0.0
+        metrics['scoring_ms'] = round(metrics['scoring_ms'], 1)
+        metrics.update({'window_ms': self.window * 1000, 'max_batch_size': self.max_batch_size})
+        return metrics
@@ -7,13 +7,20 @@ import os
 
 nltk.data.path.append(os.environ.get("NLTK_DATA", "/opt/nltk_data"))
 
+import copy
 import re
 import pickle
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
+from scipy.sparse import csr_matrix, hstack
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize, StandardScaler
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.model_selection import train_test_split, cross_val_predict, StratifiedKFold
 from sklearn.metrics import accuracy_score, classification_report
+from sklearn.utils.class_weight import compute_class_weight
+from calibration import make_calibrator, CALIBRATION_METHODS
+from heuristic_features import default_extractor, HeuristicFeatureExtractor, HEURISTIC_FEATURES
 import nltk
 import os
 
@@ -31,18 +38,138 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.stem import PorterStemmer
 
+# Bump whenever preprocess_text changes so cached preprocessed corpora are invalidated
+PREPROCESS_VERSION = 1
+PREPROCESS_CONFIG = {'version': PREPROCESS_VERSION, 'stemmer': 'porter', 'stop_words': 'english'}
+
+# Vectorizer used by train(): 'tfidf' (vocabulary based) or 'hashing' (feature hashing)
+VECTORIZER_TYPE = os.environ.get('VECTORIZER_TYPE', 'tfidf')
+HASHING_N_FEATURES = int(os.environ.get('HASHING_N_FEATURES', 2 ** 18))
+
+# Classifier used by train(): 'logistic' (batch only) or 'sgd' (supports online
+# partial_fit updates when combined with the hashing vectorizer)
+CLASSIFIER_TYPE = os.environ.get('CLASSIFIER_TYPE', 'logistic')
+
+# Calibration fitted by train(): 'platt', 'isotonic' or 'none' (raw predict_proba)
+CALIBRATION_METHOD = os.environ.get('CALIBRATION_METHOD', 'platt')
+# Saved next to the model file
+CALIBRATION_FILE = 'calibration.pkl'
+
+# Stack the NLP heuristic features (heuristic_features.py) with the text features
+HEURISTIC_FEATURES_ENABLED = os.environ.get('HEURISTIC_FEATURES', '0') == '1'
+# Scaler for the heuristic columns, saved next to the model file
+HEURISTIC_SCALER_FILE = 'heuristic_scaler.pkl'
+# Term lists and lexicon version the heuristic columns were computed with
+HEURISTIC_LEXICON_FILE = 'heuristic_lexicon.pkl'
+
+# Optional model parts saved next to the model file: attribute -> file name
+EXTRA_FILES = {
+    'calibrator': CALIBRATION_FILE,
+    'heuristic_scaler': HEURISTIC_SCALER_FILE,
+    'heuristic_lexicon': HEURISTIC_LEXICON_FILE
+}
+
+# Language of the default model; other languages get their own models (see LanguageModelRouter)
+DEFAULT_LANGUAGE = 'en'
+# Punctuation, symbols and digits stripped by the non-English preprocessing. Unlike
+# [^\w\s] this keeps combining vowel signs, which Indic scripts need inside words.
+NON_ENGLISH_STRIP = re.compile(r'[\d!-/:-@\[-`{-~\u2000-\u206F\u0964\u0965]')
+# Whitespace tokens - \w-based patterns would split Indic words at vowel signs
+NON_ENGLISH_TOKEN_PATTERN = r'\S+'
+
+# Long documents are scored as a batch of chunks of at most this many characters
+LONG_DOCUMENT_CHUNK_CHARS = int(os.environ.get('LONG_DOCUMENT_CHUNK_CHARS', 5000))
+
+
+def split_into_chunks(text, max_chars=LONG_DOCUMENT_CHUNK_CHARS):
+    """Split text into chunks of at most max_chars characters, breaking on whitespace"""
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + max_chars, length)
+        if end < length:
+            # Break at the last space in the window so words are not cut
+            space = text.rfind(' ', start, end)
+            if space > start:
+                end = space
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end
+    return chunks
+
+
+class HashingTfidfVectorizer:
+    """
+    TF-IDF over hashed n-gram features
+    There is no vocabulary dict to unpickle or look up: terms are hashed
+    straight to column indices and the IDF weights are a float32 array.
+    """
+    
+    def __init__(self, n_features=HASHING_N_FEATURES, ngram_range=(1, 2), token_pattern=r"(?u)\b\w\w+\b"):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=ngram_range,
+            token_pattern=token_pattern,
+            alternate_sign=False,
+            norm=None
+        )
+        self.idf_ = None
+    
+    def fit_transform(self, texts):
+        """Learn IDF weights from texts and return their TF-IDF matrix"""
+        counts = self.hasher.transform(texts)
+        document_frequency = np.bincount(counts.indices, minlength=self.n_features)
+        # Smoothed IDF, same formula as sklearn's TfidfTransformer
+        n_samples = counts.shape[0]
+        self.idf_ = (np.log((1 + n_samples) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self._weight(counts)
+    
+    def transform(self, texts):
+        """TF-IDF matrix of texts using the fitted IDF weights"""
+        return self._weight(self.hasher.transform(texts))
+    
+    def _weight(self, counts):
+        counts.data *= self.idf_[counts.indices]
+        return normalize(counts, copy=False)
+
+
 class FakeNewsMLModel:
     """Machine Learning Model for Fake News Detection"""
     
-    def __init__(self):
+    def __init__(self, vectorizer_type=None, classifier_type=None, heuristic_features=None,
+                 language=DEFAULT_LANGUAGE):
+        self.vectorizer_type = vectorizer_type or VECTORIZER_TYPE
+        if self.vectorizer_type not in ('tfidf', 'hashing'):
+            raise ValueError("vectorizer_type must be 'tfidf' or 'hashing'")
+        self.classifier_type = classifier_type or CLASSIFIER_TYPE
+        if self.classifier_type not in ('logistic', 'sgd'):
+            raise ValueError("classifier_type must be 'logistic' or 'sgd'")
+        self.language = language
         self.vectorizer = None
         self.model = None
         self.stemmer = PorterStemmer()
         self.stop_words = set(stopwords.words('english'))
         self.is_trained = False
+        self.weight_dtype = 'float64'
+        self.heuristic_features = HEURISTIC_FEATURES_ENABLED if heuristic_features is None else heuristic_features
+        self.heuristic_scaler = None  # set when the model was trained on heuristic features
+        self.heuristic_lexicon = None  # extractor state the heuristic columns were trained with
+        self._heuristic_extractor = default_extractor
+        self.calibrator = None      # maps decision scores to calibrated P(fake)
+        self.holdout_texts = None   # preprocessed held-out texts from the last train()
+        self.holdout_raw_texts = None
+        self.holdout_labels = None
     
     def preprocess_text(self, text):
         """Preprocess text for ML model"""
+        if self.language != DEFAULT_LANGUAGE:
+            # No English stopwords or stemming; keep the script's own characters
+            return ' '.join(NON_ENGLISH_STRIP.sub(' ', text.lower()).split())
+        
         # Convert to lowercase
         text = text.lower()
         
@@ -58,7 +185,8 @@ class FakeNewsMLModel:
         # Join back
         return ' '.join(tokens)
     
-    def train(self, texts, labels, test_size=0.2, random_state=42):
+    def train(self, texts, labels, test_size=0.2, random_state=42, processed_texts=None,
+              calibration=None):
         """
         Train the ML model
         
@@ -67,37 +195,90 @@ class FakeNewsMLModel:
             labels: List of labels (0 = Real, 1 = Fake)
             test_size: Proportion of test set
             random_state: Random seed
+            processed_texts: preprocess_text output for texts, if already computed
+            calibration: 'platt', 'isotonic' or 'none' (default: CALIBRATION_METHOD)
         """
-        print("Preprocessing texts...")
-        processed_texts = [self.preprocess_text(text) for text in texts]
+        calibration = calibration or CALIBRATION_METHOD
+        if calibration not in CALIBRATION_METHODS + ('none',):
+            raise ValueError(f"calibration must be one of: {', '.join(CALIBRATION_METHODS + ('none',))}")
+
+        if processed_texts is None:
+            print("Preprocessing texts...")
+            processed_texts = [self.preprocess_text(text) for text in texts]
         
-        print("Creating TF-IDF vectors...")
-        self.vectorizer = TfidfVectorizer(
-            max_features=5000,
-            ngram_range=(1, 2),  # Unigrams and bigrams
-            min_df=2,
-            max_df=0.95
-        )
+        token_pattern = TfidfVectorizer().token_pattern
+        if self.language != DEFAULT_LANGUAGE:
+            token_pattern = NON_ENGLISH_TOKEN_PATTERN
+        
+        if self.vectorizer_type == 'hashing':
+            print("Creating hashed TF-IDF vectors...")
+            self.vectorizer = HashingTfidfVectorizer(ngram_range=(1, 2), token_pattern=token_pattern)
+        else:
+            print("Creating TF-IDF vectors...")
+            self.vectorizer = TfidfVectorizer(
+                max_features=5000,
+                ngram_range=(1, 2),  # Unigrams and bigrams
+                min_df=2,
+                max_df=0.95,
+                token_pattern=token_pattern
+            )
         
         X = self.vectorizer.fit_transform(processed_texts)
         y = np.array(labels)
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state, stratify=y
-        )
+        self.heuristic_scaler = None
+        self.heuristic_lexicon = None
+        self._heuristic_extractor = default_extractor
+        if self.heuristic_features:
+            print("Stacking heuristic features...")
+            H = self._heuristic_extractor.transform(texts)
+            self.heuristic_scaler = StandardScaler().fit(H)
+            self.heuristic_lexicon = self._heuristic_extractor.state()
+            X = self._stack(X, H)
         
-        print("Training Logistic Regression model...")
-        self.model = LogisticRegression(
-            max_iter=1000,
-            random_state=random_state,
-            class_weight='balanced'  # Handle imbalanced data
+        # Split data (the held-out texts are kept for later evaluation)
+        X_train, X_test, y_train, y_test, _, holdout_texts, _, holdout_raw_texts = train_test_split(
+            X, y, processed_texts, list(texts), test_size=test_size, random_state=random_state, stratify=y
         )
+        self.holdout_texts = holdout_texts
+        self.holdout_raw_texts = holdout_raw_texts
+        self.holdout_labels = y_test
+        
+        if self.classifier_type == 'sgd':
+            print("Training SGD logistic model...")
+            # Balanced weights are fixed up front - partial_fit cannot recompute them
+            class_weight = compute_class_weight('balanced', classes=np.array([0, 1]), y=y_train)
+            self.model = SGDClassifier(
+                loss='log_loss',
+                alpha=1e-5,
+                max_iter=1000,
+                random_state=random_state,
+                class_weight={0: class_weight[0], 1: class_weight[1]}  # Handle imbalanced data
+            )
+        else:
+            print("Training Logistic Regression model...")
+            self.model = LogisticRegression(
+                max_iter=1000,
+                random_state=random_state,
+                class_weight='balanced'  # Handle imbalanced data
+            )
         
         self.model.fit(X_train, y_train)
         
+        self.calibrator = None
+        if calibration != 'none' and np.bincount(y_train).min() < 2:
+            print("Too few samples per class to calibrate; using raw probabilities.")
+        elif calibration != 'none':
+            # Out-of-fold decision scores on the training split, so the held-out set stays unseen
+            print(f"Fitting {calibration} calibration...")
+            folds = StratifiedKFold(n_splits=min(5, np.bincount(y_train).min()), shuffle=True,
+                                    random_state=random_state)
+            scores = cross_val_predict(clone(self.model), X_train, y_train, cv=folds,
+                                       method='decision_function')
+            self.calibrator = make_calibrator(calibration).fit(scores, y_train)
+        
         # Evaluate
-        y_pred = self.model.predict(X_test)
+        y_pred = (self._predict_proba_vectors(X_test)[:, 1] > self.decision_threshold).astype(int)
         accuracy = accuracy_score(y_test, y_pred)
         
         print(f"\nModel Training Complete!")
@@ -121,24 +302,82 @@ class FakeNewsMLModel:
                 confidence: float 0-100
                 probabilities: dict with 'real' and 'fake' probabilities
         """
+        return self.format_prediction(self.predict_proba_batch([text])[0])
+    
+    def predict_proba_batch(self, texts):
+        """
+        Score several texts with a single vectorizer/model call
+        
+        Returns:
+            numpy array of shape (len(texts), 2) with [real, fake] probabilities
+        """
         if not self.is_trained:
             raise ValueError("Model not trained. Please train the model first or load a saved model.")
         
         # Preprocess
-        processed_text = self.preprocess_text(text)
-        
-        # Vectorize
-        text_vector = self.vectorizer.transform([processed_text])
+        processed_texts = [self.preprocess_text(text) for text in texts]
         
-        # Predict
-        prediction = self.model.predict(text_vector)[0]
-        probabilities = self.model.predict_proba(text_vector)[0]
+        return self.predict_proba_processed(processed_texts, texts)
+    
+    def predict_proba_processed(self, processed_texts, raw_texts=None):
+        """
+        [real, fake] probabilities of already preprocessed texts
+        Models trained on heuristic features also need the raw texts.
+        """
+        return self._predict_proba_vectors(self._vectorize(processed_texts, raw_texts))
+    
+    @property
+    def uses_heuristic_features(self):
+        return self.heuristic_scaler is not None
+    
+    def _stack(self, X, H):
+        """Append scaled heuristic feature columns to a text feature matrix"""
+        return hstack([X, csr_matrix(self.heuristic_scaler.transform(H))], format='csr')
+    
+    def _vectorize(self, processed_texts, raw_texts=None):
+        X = self.vectorizer.transform(processed_texts)
+        if self.heuristic_scaler is None:
+            return X
+        if raw_texts is None:
+            raise ValueError("This model uses heuristic features; raw texts are required")
+        return self._stack(X, self._heuristic_extractor.transform(raw_texts))
+    
+    def _predict_proba_vectors(self, X):
+        if self.calibrator is None:
+            return self.model.predict_proba(X)
+        fake = self.calibrator.transform(self.model.decision_function(X))
+        return np.column_stack([1 - fake, fake])
+    
+    @property
+    def decision_threshold(self):
+        """P(fake) above which a text is classified as fake"""
+        return self.calibrator.threshold if self.calibrator is not None else 0.5
+    
+    def predict_batch(self, texts):
+        """Predict several texts at once, returning one result dict per text"""
+        return [self.format_prediction(probabilities) for probabilities in self.predict_proba_batch(texts)]
+    
+    def predict_long(self, text, chunk_chars=LONG_DOCUMENT_CHUNK_CHARS):
+        """
+        Predict a long document by scoring bounded chunks in one batch
+        Chunk probabilities are averaged, weighted by chunk length
+        """
+        chunks = split_into_chunks(text, chunk_chars) or [text]
+        probabilities = self.predict_proba_batch(chunks)
+        weights = np.array([len(chunk) for chunk in chunks], dtype=float)
+        result = self.format_prediction(np.average(probabilities, axis=0, weights=weights))
+        result['chunks'] = len(chunks)
+        return result
+    
+    def format_prediction(self, probabilities):
+        """Build the prediction result dict from [real, fake] probabilities"""
+        prediction = int(probabilities[1] > self.decision_threshold)
         
         # Get confidence (probability of predicted class)
         confidence = probabilities[prediction] * 100
         
         return {
-            'prediction': int(prediction),
+            'prediction': prediction,
             'prediction_label': 'Fake' if prediction == 1 else 'Real',
             'confidence': round(confidence, 2),
             'probabilities': {
@@ -147,17 +386,123 @@ class FakeNewsMLModel:
             }
         }
     
+    def can_score(self, text):
+        """False when preprocessing would leave nothing for the model to score"""
+        if self.language == DEFAULT_LANGUAGE:
+            return bool(re.search(r'[a-zA-Z]', text))
+        return bool(NON_ENGLISH_STRIP.sub('', text).strip())
+    
+    @property
+    def supports_online_updates(self):
+        """
+        Online updates need a fixed feature space and an incremental classifier
+        Calibrated models are excluded: partial_fit would leave the calibrator fitted
+        to the old decision scores.
+        """
+        return (self.is_trained and isinstance(self.vectorizer, HashingTfidfVectorizer)
+                and hasattr(self.model, 'partial_fit') and self.calibrator is None)
+    
+    def partial_fit(self, texts, labels):
+        """
+        Update the classifier in place with a mini-batch of labeled texts
+        The hashed feature space and IDF weights stay fixed, so the update
+        never changes the vectorizer.
+        """
+        if not self.supports_online_updates:
+            raise ValueError("Online updates need an uncalibrated model trained with the hashing vectorizer "
+                             "and the sgd classifier")
+        # Compacted weights are float32; continue learning at full precision
+        self.model.coef_ = self.model.coef_.astype(np.float64, copy=False)
+        self.weight_dtype = 'float64'
+        
+        processed_texts = [self.preprocess_text(text) for text in texts]
+        self.model.partial_fit(self._vectorize(processed_texts, texts), np.array(labels),
+                               classes=np.array([0, 1]))
+    
+    def evaluate_processed(self, processed_texts, labels, raw_texts=None):
+        """Accuracy on already preprocessed texts"""
+        probabilities = self.predict_proba_processed(processed_texts, raw_texts)
+        predicted = (probabilities[:, 1] > self.decision_threshold).astype(int)
+        return accuracy_score(labels, predicted)
+    
+    def compact(self, prune_ratio=0.01, weight_dtype='float32'):
+        """
+        Shrink the trained model so workers load it faster
+        
+        - Drops the vectorizer's stop_words_ set (only kept for introspection)
+        - Prunes features whose |coefficient| is below prune_ratio * max |coefficient|,
+          together with their vocabulary entries and IDF weights (TF-IDF vectorizer
+          only - hashed features have no vocabulary to prune)
+        - Stores coefficients as float32, or as int8 plus a scale factor when saved
+        
+        Returns:
+            int: number of features kept
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Please train the model first or load a saved model.")
+        if weight_dtype not in ('float32', 'int8'):
+            raise ValueError("weight_dtype must be 'float32' or 'int8'")
+        
+        if hasattr(self.vectorizer, 'stop_words_'):
+            del self.vectorizer.stop_words_
+        
+        coef = self.model.coef_
+        # Heuristic feature columns (if any) follow the text features and are always kept
+        n_text = coef.shape[1] - (len(HEURISTIC_FEATURES) if self.uses_heuristic_features else 0)
+        text_coef = np.abs(coef[:, :n_text])
+        keep = np.flatnonzero(text_coef.max(axis=0) >= prune_ratio * text_coef.max())
+        if isinstance(self.vectorizer, HashingTfidfVectorizer):
+            keep = np.arange(n_text)
+        
+        if len(keep) < n_text:
+            # Rebuild the vectorizer over the surviving terms only
+            terms = self.vectorizer.get_feature_names_out()[keep]
+            idf = self.vectorizer.idf_[keep]
+            pruned = TfidfVectorizer(
+                vocabulary={term: i for i, term in enumerate(terms)},
+                ngram_range=self.vectorizer.ngram_range,
+                lowercase=self.vectorizer.lowercase,
+                norm=self.vectorizer.norm,
+                sublinear_tf=self.vectorizer.sublinear_tf,
+                token_pattern=self.vectorizer.token_pattern
+            )
+            pruned.idf_ = idf
+            self.vectorizer = pruned
+            self.model.coef_ = np.hstack([coef[:, keep], coef[:, n_text:]])
+            self.model.n_features_in_ = self.model.coef_.shape[1]
+        
+        self.model.coef_ = self.model.coef_.astype(np.float32)
+        self.weight_dtype = weight_dtype
+        return self.model.coef_.shape[1]
+    
     def save_model(self, vectorizer_path='models/tfidf_vectorizer.pkl', 
                    model_path='models/ml_model.pkl'):
         """Save the trained model"""
-        import os
-        os.makedirs('models', exist_ok=True)
+        for path in (vectorizer_path, model_path):
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
         
         with open(vectorizer_path, 'wb') as f:
             pickle.dump(self.vectorizer, f)
         
+        model = self.model
+        if self.weight_dtype == 'int8':
+            # Quantize coefficients; load_model restores float32 weights
+            model = copy.copy(self.model)
+            scale = float(np.abs(model.coef_).max()) / 127 or 1.0
+            model.coef_ = np.round(model.coef_ / scale).astype(np.int8)
+            model.coef_scale_ = scale
+        
         with open(model_path, 'wb') as f:
-            pickle.dump(self.model, f)
+            pickle.dump(model, f)
+        
+        for attribute, filename in EXTRA_FILES.items():
+            path = os.path.join(os.path.dirname(model_path), filename)
+            if getattr(self, attribute) is not None:
+                with open(path, 'wb') as f:
+                    pickle.dump(getattr(self, attribute), f)
+            elif os.path.exists(path):
+                # Do not leave a stale file next to a model that does not use it
+                os.remove(path)
         
         print(f"Model saved to {model_path}")
         print(f"Vectorizer saved to {vectorizer_path}")
@@ -172,6 +517,27 @@ class FakeNewsMLModel:
             with open(model_path, 'rb') as f:
                 self.model = pickle.load(f)
             
+            for attribute, filename in EXTRA_FILES.items():
+                try:
+                    with open(os.path.join(os.path.dirname(model_path), filename), 'rb') as f:
+                        setattr(self, attribute, pickle.load(f))
+                except FileNotFoundError:
+                    setattr(self, attribute, None)
+            self.heuristic_features = self.heuristic_scaler is not None
+            if self.heuristic_features and self.heuristic_lexicon is None:
+                # Features from today's lexicon files may not be the ones the model was trained on
+                raise FileNotFoundError(f"{HEURISTIC_LEXICON_FILE} is missing for a model using heuristic features")
+            self._heuristic_extractor = (HeuristicFeatureExtractor.from_state(self.heuristic_lexicon)
+                                         if self.heuristic_features else default_extractor)
+            
+            self.vectorizer_type = 'hashing' if isinstance(self.vectorizer, HashingTfidfVectorizer) else 'tfidf'
+            self.classifier_type = 'sgd' if isinstance(self.model, SGDClassifier) else 'logistic'
+            
+            # Dequantize int8 weights written by a compacted model
+            if hasattr(self.model, 'coef_scale_'):
+                self.model.coef_ = self.model.coef_.astype(np.float32) * np.float32(self.model.coef_scale_)
+                del self.model.coef_scale_
+            
             self.is_trained = True
             print("Model loaded successfully!")
             return True
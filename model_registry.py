@@ -0,0 +1,417 @@
+"""
+Versioned Model Registry with Hot Reload
+
+Layout:
+    models/registry/<version>/tfidf_vectorizer.pkl
+    models/registry/<version>/ml_model.pkl
+    models/registry/<version>/calibration.pkl        (calibrated models only)
+    models/registry/<version>/heuristic_scaler.pkl   (models using heuristic features only)
+    models/registry/<version>/heuristic_lexicon.pkl  (term lists those features were trained with)
+    models/registry/CURRENT          name of the version that should serve
+    models/registry/lang/<code>/...  same layout per language (see LanguageModelRouter)
+
+A new version is loaded and warmed up while the old one keeps serving,
+then swapped in with a single reference assignment.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+
+from ml_model import FakeNewsMLModel, DEFAULT_LANGUAGE
+
+REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', os.path.join('models', 'registry'))
+CURRENT_FILE = 'CURRENT'
+VECTORIZER_FILE = 'tfidf_vectorizer.pkl'
+MODEL_FILE = 'ml_model.pkl'
+LEGACY_VERSION = 'legacy'
+LANGUAGE_DIR = 'lang'
+# Versions updated in memory (e.g. by online learning) are named <base>+<suffix>
+DERIVED_VERSION_SEPARATOR = '+'
+
+# Texts scored once after loading so the first real request is not slow
+WARMUP_TEXTS = [
+    "BREAKING: Doctors HATE this one simple trick that cures all diseases instantly!",
+    "According to a peer-reviewed study, researchers found that regular exercise helps manage diabetes."
+]
+
+
+def base_version(version):
+    """The published version an in-memory derived version was built from"""
+    return version.split(DERIVED_VERSION_SEPARATOR, 1)[0] if version else version
+
+
+class ModelRegistry:
+    """Directory of versioned model artifacts plus the currently serving model"""
+
+    def __init__(self, root=REGISTRY_DIR, model_factory=FakeNewsMLModel):
+        self.root = root
+        self.model_factory = model_factory
+        self._active = (None, None)  # (model, version), swapped atomically
+        self._load_lock = threading.Lock()
+        self._listeners = []
+        self._watcher = None
+
+    def version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def versions(self):
+        """List published versions, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        names = [
+            name for name in os.listdir(self.root)
+            if not name.startswith('.')
+            and os.path.isfile(os.path.join(self.root, name, MODEL_FILE))
+        ]
+        return sorted(names, key=lambda name: (os.path.getmtime(self.version_dir(name)), name))
+
+    def current_version(self):
+        """Version named in the CURRENT pointer file, or None"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_current(self, version):
+        """Atomically point CURRENT at a published version"""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version '{version}'")
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.current-')
+        with os.fdopen(fd, 'w') as f:
+            f.write(version + '\n')
+        os.replace(tmp_path, os.path.join(self.root, CURRENT_FILE))
+
+    def publish(self, model, version=None, activate=True):
+        """
+        Save a trained model as a new registry version
+
+        Artifacts are written to a hidden temporary directory and renamed into
+        place, so watchers never see a half-written version.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        if version is None:
+            # Second resolution; later versions within the same second get a -2, -3, ... suffix
+            version = stamp = datetime.now().strftime('v%Y%m%d-%H%M%S')
+            count = 1
+            while os.path.exists(self.version_dir(version)):
+                count += 1
+                version = f'{stamp}-{count}'
+        if os.path.exists(self.version_dir(version)):
+            raise ValueError(f"Model version '{version}' already exists")
+
+        tmp_dir = tempfile.mkdtemp(dir=self.root, prefix='.publish-')
+        try:
+            model.save_model(
+                vectorizer_path=os.path.join(tmp_dir, VECTORIZER_FILE),
+                model_path=os.path.join(tmp_dir, MODEL_FILE)
+            )
+            os.rename(tmp_dir, self.version_dir(version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        if activate:
+            self.set_current(version)
+        print(f"Published model version {version}")
+        return version
+
+    def load(self, version):
+        """Load and warm up a registry version without activating it"""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version '{version}'")
+        model = self.model_factory()
+        loaded = model.load_model(
+            vectorizer_path=os.path.join(self.version_dir(version), VECTORIZER_FILE),
+            model_path=os.path.join(self.version_dir(version), MODEL_FILE)
+        )
+        if not loaded:
+            raise ValueError(f"Could not load model version '{version}'")
+        model.predict_batch(WARMUP_TEXTS)
+        return model
+
+    def snapshot(self):
+        """The (model, version) pair currently serving; model is None if none is loaded"""
+        return self._active
+
+    @property
+    def active_version(self):
+        return self._active[1]
+
+    def is_loaded(self):
+        return self._active[0] is not None
+
+    def on_swap(self, callback):
+        """Register callback(version) to run after a new model starts serving"""
+        self._listeners.append(callback)
+
+    def _swap(self, model, version):
+        self._active = (model, version)
+        for callback in self._listeners:
+            try:
+                callback(version)
+            except Exception as e:
+                print(f"Model swap listener failed: {e}")
+
+    def activate(self, version=None, persist=False):
+        """
+        Load, warm up and hot-swap a version (default: the CURRENT version)
+        The previous model keeps serving until the new one is ready.
+
+        Returns:
+            dict with the activated version and load time in milliseconds
+        """
+        with self._load_lock:
+            version = version or self.current_version()
+            if version is None:
+                raise ValueError("No model version to activate")
+
+            start = time.perf_counter()
+            model = self.load(version)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            if persist and version != self.current_version():
+                self.set_current(version)
+            previous = self.active_version
+            self._swap(model, version)
+            print(f"Model version {version} active (was {previous}, loaded in {load_ms:.0f} ms)")
+            return {'version': version, 'previous_version': previous, 'load_ms': round(load_ms, 1)}
+
+    def replace(self, model, version, expected_version):
+        """
+        Swap in an already loaded model, unless another version started
+        serving since expected_version was read. Returns True if swapped.
+        """
+        with self._load_lock:
+            if self.active_version != expected_version:
+                return False
+            self._swap(model, version)
+            return True
+
+    def initialize(self):
+        """Activate the CURRENT version, falling back to the legacy models/*.pkl files"""
+        if self.current_version():
+            try:
+                self.activate()
+                return True
+            except Exception as e:
+                print(f"Failed to load registry model: {e}")
+
+        model = self.model_factory()
+        if model.load_model():
+            self._swap(model, LEGACY_VERSION)
+            return True
+
+        print("No pre-trained model found. Using rule-based heuristics.")
+        print("Run train_model.py to train a model with your dataset.")
+        return False
+
+    def start_watcher(self, interval):
+        """Poll CURRENT every `interval` seconds and hot-swap when it changes"""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            failed_version = None
+            while True:
+                time.sleep(interval)
+                version = self.current_version()
+                if not version or version in (base_version(self.active_version), failed_version):
+                    continue
+                try:
+                    self.activate(version)
+                except Exception as e:
+                    failed_version = version
+                    print(f"Hot reload of model version {version} failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='model-registry-watcher', daemon=True)
+        self._watcher.start()
+
+
+def artifact_size_mb(directory):
+    """Size of the artifacts of one model version in MB, an estimate of its memory footprint"""
+    total = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            total += os.path.getsize(path)
+    return total / (1024 * 1024)
+
+
+class LanguageModelRouter:
+    """
+    Picks the model for a detected language
+
+    Languages with a published model under <registry>/lang/<code> get that
+    model, loaded on first use and hot-swapped when its CURRENT changes (see
+    start_watcher). The least recently used language models are
+    evicted when more than max_loaded are resident or their estimated sizes
+    add up to more than memory_limit_mb. DEFAULT_LANGUAGE uses the default
+    registry; every other language gets no model.
+    """
+
+    def __init__(self, default_registry, root=None, max_loaded=4, memory_limit_mb=None,
+                 rescan_interval=10.0):
+        self.default_registry = default_registry
+        self.root = root or os.path.join(default_registry.root, LANGUAGE_DIR)
+        self.max_loaded = max_loaded
+        self.memory_limit_mb = memory_limit_mb
+        self.rescan_interval = rescan_interval
+        self._loaded = OrderedDict()  # code -> ModelRegistry with an active model
+        self._sizes_mb = {}           # code -> estimated size of its loaded model
+        self._failed = {}             # code -> version that failed to load
+        self._available = set()
+        self._scanned_at = None
+        self._lock = threading.Lock()
+        self._loading = {}            # code -> lock held while that language loads
+        self._listeners = []
+        self._watcher = None
+
+    def on_swap(self, callback):
+        """Register callback(code) to run after a language model is loaded, swapped or evicted"""
+        self._listeners.append(callback)
+
+    def _notify(self, codes):
+        for code in codes:
+            for callback in self._listeners:
+                try:
+                    callback(code)
+                except Exception as e:
+                    print(f"Language model swap listener failed: {e}")
+
+    def language_registry(self, code):
+        """Registry holding the models of one language"""
+        return ModelRegistry(root=os.path.join(self.root, code),
+                             model_factory=partial(FakeNewsMLModel, language=code))
+
+    def languages(self):
+        """Languages with a published model (rescanned every rescan_interval seconds)"""
+        now = time.monotonic()
+        if self._scanned_at is None or now - self._scanned_at >= self.rescan_interval:
+            try:
+                self._available = {
+                    code for code in os.listdir(self.root)
+                    if os.path.isfile(os.path.join(self.root, code, CURRENT_FILE))
+                }
+            except FileNotFoundError:
+                self._available = set()
+            self._scanned_at = now
+        return self._available
+
+    def route(self, lang_code):
+        """
+        The (model, version) pair for lang_code; (None, None) if the language has
+        no model of its own and is not DEFAULT_LANGUAGE
+        """
+        registry = self._loaded.get(lang_code)
+        if registry is not None:
+            with self._lock:
+                if lang_code in self._loaded:
+                    self._loaded.move_to_end(lang_code)
+            return registry.snapshot()
+
+        if lang_code != DEFAULT_LANGUAGE and lang_code in self.languages():
+            registry = self._load(lang_code)
+            if registry is not None:
+                return registry.snapshot()
+        if lang_code == DEFAULT_LANGUAGE:
+            return self.default_registry.snapshot()
+        return None, None
+
+    def _load(self, code):
+        # The disk load and warmup run under a per-language lock only, so a cold
+        # load never holds up requests for other languages
+        with self._lock:
+            if code in self._loaded:
+                return self._loaded[code]
+            load_lock = self._loading.setdefault(code, threading.Lock())
+        with load_lock:
+            registry = self._loaded.get(code)
+            if registry is not None:
+                return registry  # loaded by another request meanwhile
+            registry = self.language_registry(code)
+            version = registry.current_version()
+            if version is None or self._failed.get(code) == version:
+                return None
+            try:
+                registry.activate(version)
+            except Exception as e:
+                self._failed[code] = version
+                print(f"Failed to load {code} model version {version}: {e}")
+                return None
+            with self._lock:
+                self._loaded[code] = registry
+                self._sizes_mb[code] = artifact_size_mb(registry.version_dir(version))
+                evicted = self._evict()
+        self._notify([code] + evicted)
+        return registry
+
+    def refresh(self):
+        """
+        Hot-swap loaded language models whose CURRENT names a new version
+        Returns the codes of the languages that were swapped.
+        """
+        swapped = []
+        evicted = []
+        for code, registry in list(self._loaded.items()):
+            version = registry.current_version()
+            if not version or version in (base_version(registry.active_version), self._failed.get(code)):
+                continue
+            try:
+                registry.activate(version)
+            except Exception as e:
+                self._failed[code] = version
+                print(f"Hot reload of {code} model version {version} failed: {e}")
+                continue
+            swapped.append(code)
+            with self._lock:
+                if self._loaded.get(code) is registry:
+                    self._sizes_mb[code] = artifact_size_mb(registry.version_dir(version))
+                    evicted += self._evict()
+        self._notify(swapped + evicted)
+        return swapped
+
+    def start_watcher(self, interval):
+        """Call refresh() every `interval` seconds, like ModelRegistry.start_watcher"""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Hot reload of language models failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='language-model-watcher', daemon=True)
+        self._watcher.start()
+
+    def _evict(self):
+        """Unload least recently used models beyond the limits; returns their codes"""
+        evicted = []
+        while len(self._loaded) > self.max_loaded:
+            evicted.append(self._unload_oldest())
+        # Process RSS rarely drops after a model is released, so budget estimated model sizes instead
+        while (self.memory_limit_mb and len(self._loaded) > 1
+               and sum(self._sizes_mb.values()) > self.memory_limit_mb):
+            evicted.append(self._unload_oldest())
+        return evicted
+
+    def _unload_oldest(self):
+        code, _ = self._loaded.popitem(last=False)
+        self._sizes_mb.pop(code, None)
+        print(f"Evicted {code} model")
+        return code
+
+    def status(self):
+        """Published languages and the version loaded for each (None if not loaded)"""
+        loaded = dict(self._loaded)
+        return {code: loaded[code].active_version if code in loaded else None
+                for code in sorted(self.languages())}
@@ -0,0 +1,160 @@
+"""
+Near-Duplicate Detection for Incoming Articles
+MinHash signatures over word shingles + LSH banding for sub-linear lookup
+
+Reposts and syndicated copies of the same story produce almost the same
+preprocessed token stream, so their MinHash signatures agree on most
+positions even when boilerplate differs.
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class NearDuplicateIndex:
+    """
+    Bounded MinHash/LSH index of recently seen documents
+
+    Each document is stored with its signature, the verdict it received and
+    the id of the cluster of near-copies it belongs to. When capacity is
+    reached the least recently matched document is evicted. Near-copies that
+    match an indexed document are not added again: the matched document
+    stands for its cluster, so a viral story does not fill its buckets.
+    """
+
+    def __init__(self, num_perm=64, bands=8, threshold=0.8, capacity=100000,
+                 shingle_size=2, min_tokens=10, seed=1, max_candidates=64):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.capacity = capacity
+        self.shingle_size = shingle_size
+        self.min_tokens = min_tokens
+        self.max_candidates = max_candidates
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+        self._entries = OrderedDict()  # doc_id -> (signature, cluster_id, verdict)
+        self._buckets = {}             # (band, band_hash) -> list of doc_ids
+        self._next_doc_id = 0
+        self._next_cluster_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def signature(self, tokens):
+        """
+        Compute the MinHash signature of a token list
+        Returns None when the document is too short to compare reliably
+        """
+        if len(tokens) < self.min_tokens:
+            return None
+
+        n = self.shingle_size
+        shingles = {' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # a * h + b stays below 2**63 because a < 2**31 and h < 2**32
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(band, hash(signature[band * rows:(band + 1) * rows].tobytes()))
+                for band in range(self.bands)]
+
+    def query(self, signature):
+        """
+        Find the most similar indexed document at or above the threshold
+        At most max_candidates of the most recently indexed bucket mates are
+        compared, outside the lock.
+
+        Returns:
+            dict with 'cluster_id', 'similarity' and 'verdict', or None
+        """
+        if signature is None:
+            return None
+
+        with self._lock:
+            candidates = {}
+            for key in self._band_keys(signature):
+                for doc_id in reversed(self._buckets.get(key, ())):
+                    if len(candidates) >= self.max_candidates:
+                        break
+                    if doc_id not in candidates:
+                        candidates[doc_id] = self._entries[doc_id]
+        if not candidates:
+            return None
+
+        doc_ids = list(candidates)
+        signatures = np.stack([candidates[doc_id][0] for doc_id in doc_ids])
+        similarities = (signatures == signature).mean(axis=1)
+        best = int(similarities.argmax())
+        best_similarity = float(similarities[best])
+        if best_similarity < self.threshold:
+            return None
+
+        best_id = doc_ids[best]
+        with self._lock:
+            # Matched documents count as recently used for eviction
+            if best_id in self._entries:
+                self._entries.move_to_end(best_id)
+        _, cluster_id, verdict = candidates[best_id]
+        return {
+            'cluster_id': cluster_id,
+            'similarity': round(best_similarity, 3),
+            'verdict': verdict
+        }
+
+    def add(self, signature, verdict, cluster_id=None):
+        """
+        Index a document signature with its verdict
+        Starts a new cluster unless cluster_id is given. Returns the cluster id.
+        """
+        if signature is None:
+            return None
+
+        with self._lock:
+            if cluster_id is None:
+                cluster_id = self._next_cluster_id
+                self._next_cluster_id += 1
+
+            doc_id = self._next_doc_id
+            self._next_doc_id += 1
+            self._entries[doc_id] = (signature, cluster_id, verdict)
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, []).append(doc_id)
+
+            while len(self._entries) > self.capacity:
+                self._evict_oldest()
+
+            return cluster_id
+
+    def _evict_oldest(self):
+        doc_id, (signature, _, _) = self._entries.popitem(last=False)
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            bucket.remove(doc_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def clear(self):
+        """Drop every indexed document"""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
@@ -0,0 +1,205 @@
+"""
+Online Model Updates from Labeled Feedback
+Moderator corrections are buffered and applied to the serving model as
+mini-batch partial_fit updates on a background thread.
+
+Each update is applied to a copy of the serving model, which is then
+swapped in through the registry, so requests never see a half-updated
+model and never wait on training. Updated models are periodically
+published as new registry versions so they survive restarts.
+
+Only one process per registry learns: the learner holds an exclusive lock
+file in the registry directory while it runs. Its snapshots become CURRENT,
+and the other worker processes pick them up through their registry
+watchers. A learner in any other process does not start, so several
+workers never publish competing lineages that reload over each other's
+updates.
+"""
+
+import copy
+import os
+import queue
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # No advisory file locks (Windows): single-process deployments only
+    fcntl = None
+
+from model_registry import DERIVED_VERSION_SEPARATOR, base_version
+
+ONLINE_SUFFIX = 'online'
+WRITER_LOCK_FILE = '.online-learner.lock'
+
+
+class OnlineLearner:
+    """Bounded feedback buffer plus the background thread that learns from it"""
+
+    def __init__(self, registry, batch_size=32, max_pending=1000, flush_interval=5.0,
+                 snapshot_interval=300.0, lock_path=None):
+        self.registry = registry
+        self.lock_path = lock_path or os.path.join(registry.root, WRITER_LOCK_FILE)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._lock_file = None
+        self._last_snapshot = time.monotonic()
+        self._metrics = {
+            'received': 0,
+            'dropped': 0,
+            'applied': 0,
+            'batches': 0,
+            'skipped': 0,
+            'errors': 0,
+            'snapshots': 0,
+            'last_snapshot_version': None
+        }
+
+    def start(self):
+        """
+        Start the background update thread unless another process is the writer
+        Idempotent; call again to take over once the writer process has exited.
+
+        Returns:
+            bool: True if this process is learning
+        """
+        with self._lock:
+            if self._thread is None and self._acquire_writer_lock():
+                self._thread = threading.Thread(target=self._run, name='online-learner', daemon=True)
+                self._thread.start()
+            return self._thread is not None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def _acquire_writer_lock(self):
+        """Take the registry's single-writer lock without waiting; False if another process holds it"""
+        if fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Held (and the lock kept) for the life of the process
+        self._lock_file = lock_file
+        return True
+
+    def submit(self, text, label):
+        """
+        Queue one labeled example. Never blocks.
+
+        Returns:
+            bool: False if the buffer is full and the example was dropped
+        """
+        try:
+            self._queue.put_nowait((text, label))
+        except queue.Full:
+            with self._lock:
+                self._metrics['dropped'] += 1
+            return False
+        with self._lock:
+            self._metrics['received'] += 1
+        return True
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def _next_batch(self):
+        """
+        Wait up to snapshot_interval for one example, then collect up to batch_size
+        within flush_interval. Returns an empty batch if nothing arrived.
+        """
+        try:
+            batch = [self._queue.get(timeout=self.snapshot_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                if batch:
+                    self._apply(batch)
+                # Also when idle, so the last updates before a quiet period are published
+                self._maybe_snapshot()
+            except Exception as e:
+                print(f"Online update failed: {e}")
+                with self._lock:
+                    self._metrics['errors'] += 1
+
+    def _apply(self, batch):
+        model, version = self.registry.snapshot()
+        if model is None or not model.supports_online_updates:
+            with self._lock:
+                self._metrics['skipped'] += len(batch)
+            return
+
+        # Texts the default model cannot read (e.g. other scripts) would only shift the intercept
+        scorable = [(text, label) for text, label in batch if model.can_score(text)]
+        if len(scorable) < len(batch):
+            with self._lock:
+                self._metrics['skipped'] += len(batch) - len(scorable)
+        if not scorable:
+            return
+
+        texts, labels = zip(*scorable)
+        updated = copy.deepcopy(model)
+        updated.partial_fit(list(texts), list(labels))
+
+        # <base>+online<n>: n counts the updates since the last published version
+        _, _, count = version.partition(DERIVED_VERSION_SEPARATOR + ONLINE_SUFFIX)
+        new_version = f"{base_version(version)}{DERIVED_VERSION_SEPARATOR}{ONLINE_SUFFIX}{int(count or 0) + 1}"
+        if not self.registry.replace(updated, new_version, expected_version=version):
+            # A different model was activated meanwhile; this batch trained the old one
+            with self._lock:
+                self._metrics['skipped'] += len(scorable)
+            return
+
+        with self._lock:
+            self._metrics['applied'] += len(scorable)
+            self._metrics['batches'] += 1
+
+    def _maybe_snapshot(self):
+        if time.monotonic() - self._last_snapshot < self.snapshot_interval:
+            return
+        model, version = self.registry.snapshot()
+        if model is None or version == base_version(version):
+            return
+
+        published = self.registry.publish(model)
+        # Same weights under the published name, unless another update landed meanwhile
+        self.registry.replace(model, published, expected_version=version)
+        self._last_snapshot = time.monotonic()
+        with self._lock:
+            self._metrics['snapshots'] += 1
+            self._metrics['last_snapshot_version'] = published
+
+    def metrics(self):
+        """Feedback counts and snapshot state"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics.update({
+            'running': self.running,
+            'pending': self.pending,
+            'model_version': self.registry.active_version
+        })
+        return metrics
@@ -0,0 +1,142 @@
+"""
+Response Serialization for the Flask API
+Pluggable JSON encoder and size-based response compression
+
+Configuration (environment variables):
+    JSON_SERIALIZER       'stdlib' (default), 'orjson' or 'auto' (orjson if installed)
+    COMPRESS_MIN_BYTES    Compress JSON responses at least this large (0 disables)
+"""
+
+import gzip
+import os
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+# Optional fast encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional brotli compression
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+JSON_SERIALIZERS = ('stdlib', 'orjson', 'auto')
+JSON_SERIALIZER = os.environ.get('JSON_SERIALIZER', 'stdlib')
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 8192))
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def use_orjson(serializer):
+    """Decide whether the given serializer setting resolves to orjson"""
+    if serializer not in JSON_SERIALIZERS:
+        raise ValueError(f"JSON_SERIALIZER must be one of: {', '.join(JSON_SERIALIZERS)}")
+    if serializer == 'orjson' and not ORJSON_AVAILABLE:
+        print("orjson not available. Falling back to the standard library JSON encoder.")
+        return False
+    return serializer != 'stdlib' and ORJSON_AVAILABLE
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider with an optional orjson fast path
+
+    With the default 'stdlib' serializer the output is byte-identical to
+    Flask's DefaultJSONProvider. orjson output is semantically the same JSON
+    (sorted keys, numpy scalars converted) but non-ASCII text is written as
+    UTF-8 instead of \\u escapes.
+    """
+
+    def __init__(self, app, serializer=None):
+        super().__init__(app)
+        self.serializer = serializer or JSON_SERIALIZER
+        self.orjson_enabled = use_orjson(self.serializer)
+
+    def dumps_bytes(self, obj):
+        """Serialize obj to compact JSON bytes with the configured encoder"""
+        if self.orjson_enabled:
+            return orjson.dumps(
+                obj,
+                default=self.default,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+        return self.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response, using the fast path for compact output"""
+        if not self.orjson_enabled or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported content encoding from an Accept-Encoding header"""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        try:
+            quality = float(params.strip()[2:]) if params.strip().startswith('q=') else 1.0
+        except ValueError:
+            quality = 1.0
+        if quality > 0:
+            accepted.add(name)
+
+    if BROTLI_AVAILABLE and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress_body(data, encoding):
+    """Compress response bytes with the given content encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response, accept_encoding, min_bytes=None):
+    """
+    Compress a JSON response in place when it is large enough and the client
+    accepts gzip or brotli. The decoded body is unchanged.
+    """
+    min_bytes = COMPRESS_MIN_BYTES if min_bytes is None else min_bytes
+    if min_bytes <= 0:
+        return response
+    if response.direct_passthrough or response.mimetype != 'application/json':
+        return response
+    if 'Content-Encoding' in response.headers:
+        return response
+
+    encoding = choose_encoding(accept_encoding or '')
+    data = response.get_data()
+    if encoding is None or len(data) < min_bytes:
+        return response
+
+    response.set_data(compress_body(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_app(app):
+    """Install the JSON provider and response compression on a Flask app"""
+    app.json = FastJSONProvider(app)
+
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, request.headers.get('Accept-Encoding', ''))
+
+    return app
@@ -0,0 +1,118 @@
+"""
+Shadow Scoring for Candidate Models
+Scores a sampled fraction of live traffic with a candidate model off the
+request path and records how often it disagrees with the serving model.
+
+Submission never blocks: when the bounded backlog is full the sample is
+dropped and counted instead of queued.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ml_model import LONG_DOCUMENT_CHUNK_CHARS
+
+
+class ShadowScorer:
+    """Asynchronously compares a candidate model against the primary model"""
+
+    def __init__(self, sample_rate=0.1, max_workers=1, max_pending=100):
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='shadow')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._candidate = (None, None)  # (model, version)
+        self._lock = threading.Lock()
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self._metrics = {
+            'sampled': 0,
+            'scored': 0,
+            'dropped': 0,
+            'errors': 0,
+            'disagreements': 0,
+            'primary_latency_ms_total': 0.0,
+            'candidate_latency_ms_total': 0.0
+        }
+
+    def set_candidate(self, model, version):
+        """Start shadowing a candidate model (None to stop); resets metrics"""
+        with self._lock:
+            self._candidate = (model, version)
+            self._reset_metrics()
+
+    @property
+    def candidate_version(self):
+        return self._candidate[1]
+
+    def submit(self, text, primary_prediction, primary_latency_ms):
+        """
+        Maybe schedule a shadow scoring of text. Returns immediately.
+
+        Args:
+            text: Text scored by the primary model
+            primary_prediction: 0 (Real) or 1 (Fake) from the primary model
+            primary_latency_ms: Time the primary model took to score text
+        """
+        model, version = self._candidate
+        if model is None or random.random() >= self.sample_rate:
+            return False
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._metrics['dropped'] += 1
+            return False
+
+        with self._lock:
+            self._metrics['sampled'] += 1
+        try:
+            self._executor.submit(self._score, model, version, text, primary_prediction, primary_latency_ms)
+        except RuntimeError:
+            self._slots.release()
+            return False
+        return True
+
+    def _score(self, model, version, text, primary_prediction, primary_latency_ms):
+        try:
+            start = time.perf_counter()
+            # Same scoring path as the primary model
+            result = model.predict_long(text) if len(text) > LONG_DOCUMENT_CHUNK_CHARS else model.predict(text)
+            latency_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                # Ignore results for a candidate that has since been replaced
+                if self._candidate[1] != version:
+                    return
+                self._metrics['scored'] += 1
+                self._metrics['disagreements'] += int(result['prediction'] != primary_prediction)
+                self._metrics['primary_latency_ms_total'] += primary_latency_ms
+                self._metrics['candidate_latency_ms_total'] += latency_ms
+        except Exception as e:
+            print(f"Shadow scoring failed: {e}")
+            with self._lock:
+                self._metrics['errors'] += 1
+        finally:
+            self._slots.release()
+
+    def metrics(self):
+        """Disagreement rate and latency delta of the candidate so far"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            version = self._candidate[1]
+
+        scored = metrics['scored']
+        primary_total = metrics.pop('primary_latency_ms_total')
+        candidate_total = metrics.pop('candidate_latency_ms_total')
+        primary_ms = primary_total / scored if scored else None
+        candidate_ms = candidate_total / scored if scored else None
+        metrics.update({
+            'candidate_version': version,
+            'sample_rate': self.sample_rate,
+            'disagreement_rate': round(metrics['disagreements'] / scored, 4) if scored else None,
+            'primary_latency_ms': round(primary_ms, 3) if scored else None,
+            'candidate_latency_ms': round(candidate_ms, 3) if scored else None,
+            'latency_delta_ms': round(candidate_ms - primary_ms, 3) if scored else None
+        })
+        return metrics
@@ -0,0 +1,71 @@
+"""
+Single-Flight Request Coalescing
+Concurrent calls with the same key share one execution: the first caller
+runs the function, the others wait for it and receive the same result (or
+the same exception)
+
+Nothing is cached once the call completes, so this only absorbs bursts of
+identical requests that overlap in time, e.g. hundreds of users submitting
+the same viral article within seconds.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """In-flight call table keyed by request identity"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._metrics = {'executed': 0, 'coalesced': 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs), or wait for the identical call already running
+
+        Returns:
+            tuple: (result, shared) - shared is True if another caller computed it
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._metrics['coalesced'] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._metrics['executed'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def metrics(self):
+        """Executed and coalesced call counts plus calls currently in flight"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['in_flight'] = len(self._calls)
+        return metrics
@@ -46,6 +46,7 @@ const API_URL = '/predict';
 const URL_API_URL = '/analyze-url';
 const REALTIME_URL = '/analyze-realtime';
 const URL_REALTIME_URL = '/analyze-url-realtime';
+const LEXICON_BUNDLE_URL = '/lexicon-bundle';
 
 // Input mode: 'text' or 'url'
 let inputMode = 'text';
@@ -56,12 +57,16 @@ let urlRealtimeTimeout;
 // Real-time analysis debounce
 let realtimeTimeout;
 
+// Word lists for running the real-time checks in the browser (null until loaded)
+let realtimeBundle = null;
+
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
     initializeTheme();
     setupEventListeners();
     updateCharCount();
     checkPWAInstall();
+    loadLexiconBundle();
 });
 
 // PWA Install Prompt
@@ -71,6 +76,30 @@ function checkPWAInstall() {
     }
 }
 
+// Lexicon bundle for the real-time checks (the service worker keeps it cached)
+async function loadLexiconBundle() {
+    try {
+        const response = await fetch(LEXICON_BUNDLE_URL);
+        if (response.ok) {
+            realtimeBundle = await response.json();
+        }
+    } catch (error) {
+        // Keep using the server-side checks
+    }
+}
+
+// Same checks as analyze_realtime on the server
+function runRealtimeChecks(text, bundle) {
+    if (text.trim().length < bundle.min_chars) {
+        return { warnings: [] };
+    }
+    const textLower = text.toLowerCase();
+    const warnings = bundle.checks
+        .filter(check => check.terms.some(term => textLower.includes(term)))
+        .map(({ type, message, severity }) => ({ type, message, severity }));
+    return { warnings: warnings.slice(0, bundle.max_warnings) };
+}
+
 // Theme Management
 function initializeTheme() {
     const savedTheme = localStorage.getItem('theme');
@@ -160,6 +189,9 @@ function handleUrlInputChange() {
                 body: JSON.stringify({ url })
             });
             
+            // Rate limited or busy - keep the last hint
+            if (!response.ok) return;
+            
             const data = await response.json();
             
             if (data.valid) {
@@ -200,13 +232,18 @@ async function handleRealtimeAnalysis() {
     
     realtimeTimeout = setTimeout(async () => {
         try {
-            const response = await fetch(REALTIME_URL, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ text })
-            });
+            let data;
+            if (realtimeBundle) {
+                data = runRealtimeChecks(text, realtimeBundle);
+            } else {
+                const response = await fetch(REALTIME_URL, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ text })
+                });
+                data = await response.json();
+            }
             
-            const data = await response.json();
             if (data.warnings && data.warnings.length > 0) {
                 const warning = data.warnings[0];
                 liveWarningText.textContent = warning.message;
@@ -217,7 +254,7 @@ async function handleRealtimeAnalysis() {
         } catch (error) {
             // Silent fail for real-time
         }
-    }, 500);
+    }, realtimeBundle ? 150 : 500);
 }
 
 // Input Handling
@@ -264,11 +301,17 @@ async function handleDetect() {
             response = await fetch(URL_API_URL, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ url: url })
+                body: JSON.stringify({ url: url, highlight_format: 'spans' })
             });
             
             data = await response.json();
             
+            // Site busy: the page is queued behind other fetches, poll until it is analyzed
+            if (response.status === 202) {
+                btnText.textContent = 'Waiting for the site...';
+                ({ response, data } = await pollUrlJob(data));
+            }
+            
             if (!response.ok) {
                 throw new Error(data.error || 'Failed to fetch or analyze URL');
             }
@@ -278,7 +321,8 @@ async function handleDetect() {
                 displayUrlSource(data.source);
             }
             
-            textContent = data.source?.title || 'Article content';
+            // Highlights point into the extracted article text, returned with the source
+            textContent = data.source?.analyzed_text || '';
         } else {
             // Text mode
             const text = newsInput.value.trim();
@@ -292,7 +336,7 @@ async function handleDetect() {
             response = await fetch(API_URL, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ text: text })
+                body: JSON.stringify({ text: text, highlight_format: 'spans' })
             });
             
             data = await response.json();
@@ -305,6 +349,10 @@ async function handleDetect() {
         
         displayAllResults(data, textContent);
         
+        if (response.headers.get('X-Degraded')) {
+            showToast('Server is busy: showing a quick rule-based result');
+        }
+        
         setTimeout(() => {
             resultSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
         }, 100);
@@ -316,6 +364,20 @@ async function handleDetect() {
     }
 }
 
+// Poll a queued URL analysis until it finishes (or give up after ~2 minutes)
+async function pollUrlJob(job) {
+    const deadline = Date.now() + 120000;
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const response = await fetch(job.status_url);
+        const data = await response.json();
+        if (response.status !== 202) {
+            return { response, data };
+        }
+    }
+    throw new Error('The site is busy. Please try again later.');
+}
+
 // Display URL source information
 function displayUrlSource(source) {
     // Create or update URL source card
@@ -370,8 +432,10 @@ function displayAllResults(data, originalText) {
         displaySocialMediaWarning(data.social_media);
     }
     
-    // 1. Trust Meter (Feature 1)
-    updateTrustMeter(data.trust_level, data.confidence);
+    // 1. Trust Meter (Feature 1) - absent from minimal (degraded) results
+    if (data.trust_level) {
+        updateTrustMeter(data.trust_level, data.confidence);
+    }
     
     // AI Reasoning Module (NEW!)
     if (data.ai_reasoning) {
@@ -379,10 +443,16 @@ function displayAllResults(data, originalText) {
     }
     
     // 2. Word Highlighting (Feature 2)
-    highlightWords(originalText, data.highlighted_words);
+    if (data.highlight_format === 'spans') {
+        highlightSpans(originalText, data.highlighted_words);
+    } else if (data.highlighted_words) {
+        highlightWords(originalText, data.highlighted_words);
+    }
     
     // 3. Emotion Detector (Feature 3)
-    displayEmotions(data.emotions);
+    if (data.emotions) {
+        displayEmotions(data.emotions);
+    }
     
     // 4. AI Summary (Feature 4)
     if (data.summary && data.summary !== originalText) {
@@ -397,7 +467,9 @@ function displayAllResults(data, originalText) {
     displayFactChecks(data.claims);
     
     // 8. Pattern Score (Feature 8)
-    displayPatterns(data.patterns);
+    if (data.patterns) {
+        displayPatterns(data.patterns);
+    }
     
     resultSection.classList.remove('hidden');
 }
@@ -540,6 +612,28 @@ function highlightWords(text, highlightedWords) {
     highlightedText.innerHTML = html;
 }
 
+// Word highlighting from compact [start, end, type] spans
+// Offsets are in code points, so index into Array.from(text) rather than the UTF-16 string
+function highlightSpans(text, spans) {
+    const chars = Array.from(text);
+    const neutral = (segment) => segment.split(/\s+/)
+        .filter(word => word)
+        .map(word => `<span class="word-neutral">${word}</span> `)
+        .join('');
+    let html = '';
+    let cursor = 0;
+    
+    spans.forEach(([start, end, type]) => {
+        html += neutral(chars.slice(cursor, start).join(''));
+        const className = type === 'suspicious' ? 'word-suspicious' : 'word-trusted';
+        html += `<span class="${className}">${chars.slice(start, end).join('')}</span> `;
+        cursor = end;
+    });
+    html += neutral(chars.slice(cursor).join(''));
+    
+    highlightedText.innerHTML = html;
+}
+
 // Feature 3: Emotion Detector
 function displayEmotions(emotions) {
     const emotionData = [
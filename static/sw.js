@@ -1,9 +1,149 @@
 // Service Worker for PWA
+// - App shell: network first, cached copy when offline
+// - /lexicon-bundle: answered from cache, refreshed in the background (ETag revalidation)
+// - POST /predict: recent results cached by the serving model and lexicon versions
+//   plus the SHA-256 of the request body; dropped when either version changes
+
+const SHELL_CACHE = 'shell-v1';
+const BUNDLE_CACHE = 'lexicon-bundle-v1';
+const PREDICT_CACHE = 'predict-results-v2';
+const CACHE_NAMES = [SHELL_CACHE, BUNDLE_CACHE, PREDICT_CACHE];
+
+const SHELL_URLS = ['/', '/static/js/script.js', '/static/manifest.json'];
+const BUNDLE_URL = '/lexicon-bundle';
+const PREDICT_URL = '/predict';
+const PREDICT_MAX_ENTRIES = 50;
+const PREDICT_MAX_AGE_MS = 60 * 60 * 1000;
+
+// Model and lexicon versions last reported by /predict or /lexicon-bundle
+// (X-Model-Version, X-Lexicon-Version); null until one has been seen
+let servingVersions = null;
+
 self.addEventListener('install', (event) => {
     self.skipWaiting();
+    event.waitUntil(
+        caches.open(SHELL_CACHE).then((cache) => cache.addAll(SHELL_URLS)).catch(() => {})
+    );
 });
 
 self.addEventListener('activate', (event) => {
-    event.waitUntil(self.clients.claim());
+    event.waitUntil(
+        caches.keys()
+            .then((names) => Promise.all(
+                names.filter((name) => !CACHE_NAMES.includes(name)).map((name) => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+    );
 });
 
+self.addEventListener('fetch', (event) => {
+    const url = new URL(event.request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (event.request.method === 'POST' && url.pathname === PREDICT_URL) {
+        event.respondWith(cachedPrediction(event.request));
+    } else if (event.request.method === 'GET' && url.pathname === BUNDLE_URL) {
+        event.respondWith(staleWhileRevalidate(event, BUNDLE_CACHE));
+    } else if (event.request.method === 'GET' && SHELL_URLS.includes(url.pathname)) {
+        event.respondWith(networkFirst(event.request, SHELL_CACHE));
+    }
+});
+
+async function networkFirst(request, cacheName) {
+    const cache = await caches.open(cacheName);
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            await cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request);
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+async function staleWhileRevalidate(event, cacheName) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(event.request);
+    const refresh = fetch(event.request).then(async (response) => {
+        if (response.ok) {
+            await cache.put(event.request, response.clone());
+            await noteVersions(response);
+        }
+        return response;
+    });
+
+    if (cached) {
+        event.waitUntil(refresh.catch(() => {}));
+        return cached;
+    }
+    return refresh;
+}
+
+async function sha256Hex(text) {
+    const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+    return Array.from(new Uint8Array(digest), (byte) => byte.toString(16).padStart(2, '0')).join('');
+}
+
+function versionsOf(response) {
+    const model = response.headers.get('X-Model-Version');
+    const lexicon = response.headers.get('X-Lexicon-Version');
+    if (model === null || lexicon === null) return null;
+    return `model=${encodeURIComponent(model)}&lexicon=${encodeURIComponent(lexicon)}`;
+}
+
+async function currentVersions() {
+    if (servingVersions === null) {
+        // Worker just started - the cached bundle carries the versions it was served with
+        const bundle = await caches.open(BUNDLE_CACHE).then((cache) => cache.match(BUNDLE_URL));
+        servingVersions = bundle ? versionsOf(bundle) : null;
+    }
+    return servingVersions;
+}
+
+// Predictions made with other versions can never be served again - drop them all
+async function noteVersions(response) {
+    const versions = versionsOf(response);
+    if (versions === null || versions === await currentVersions()) return;
+    servingVersions = versions;
+    await caches.delete(PREDICT_CACHE);
+}
+
+async function cachedPrediction(request) {
+    const hash = await sha256Hex(await request.clone().text());
+    const versions = await currentVersions();
+
+    if (versions !== null) {
+        const cached = await caches.open(PREDICT_CACHE)
+            .then((cache) => cache.match(`${PREDICT_URL}?${versions}&sha256=${hash}`));
+        if (cached && Date.now() - Number(cached.headers.get('X-Cached-At')) < PREDICT_MAX_AGE_MS) {
+            return cached;
+        }
+    }
+
+    const response = await fetch(request);
+    if (!response.ok) return response;
+    await noteVersions(response);
+    const responseVersions = versionsOf(response);
+    // Degraded results are a stopgap while the server is busy - ask again next time
+    if (responseVersions !== null && !response.headers.get('X-Degraded')) {
+        const key = `${PREDICT_URL}?${responseVersions}&sha256=${hash}`;
+        const cache = await caches.open(PREDICT_CACHE);
+        const headers = new Headers(response.headers);
+        headers.delete('Content-Encoding');
+        headers.delete('Content-Length');
+        headers.set('X-Cached-At', String(Date.now()));
+        const body = await response.clone().blob();
+        await cache.put(key, new Response(body, { status: response.status, headers }));
+        await trimCache(cache, PREDICT_MAX_ENTRIES);
+    }
+    return response;
+}
+
+// Drop the oldest entries beyond maxEntries (keys are in insertion order)
+async function trimCache(cache, maxEntries) {
+    const keys = await cache.keys();
+    await Promise.all(keys.slice(0, Math.max(0, keys.length - maxEntries)).map((key) => cache.delete(key)));
+}
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeModel:
+    """
+    Stand-in for FakeNewsMLModel
+    Saves `size` bytes of artifacts and remembers the tag it was loaded from,
+    scores a text as [1 - len/100, len/100] recording every batch, and
+    records online updates.
+    """
+
+    supports_online_updates = True
+    _lock = threading.Lock()  # on the class, so online learners can deepcopy instances
+
+    def __init__(self, tag='', size=1024, delay=0.0):
+        self.tag = tag
+        self.size = size
+        self.delay = delay
+        self.batches = []
+        self.seen = []
+
+    def save_model(self, vectorizer_path, model_path):
+        with open(vectorizer_path, 'wb') as f:
+            f.write(b'v')
+        with open(model_path, 'wb') as f:
+            f.write(self.tag.encode('utf-8').ljust(self.size, b'\0'))
+
+    def load_model(self, vectorizer_path, model_path):
+        with open(model_path, 'rb') as f:
+            self.tag = f.read().rstrip(b'\0').decode('utf-8')
+        return True
+
+    def can_score(self, text):
+        return True
+
+    def predict_batch(self, texts):
+        return [(0, 0.5) for _ in texts]
+
+    def predict_proba_batch(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return [[1 - len(text) / 100, len(text) / 100] for text in texts]
+
+    def partial_fit(self, texts, labels):
+        self.seen.extend(zip(texts, labels))
+
+
+class FakeRegistry:
+    """In-memory ModelRegistry serving a FakeModel as v1; publish only records the model"""
+
+    def __init__(self, root):
+        self.root = str(root)
+        self.active = (FakeModel(), 'v1')
+        self.published = []
+
+    def snapshot(self):
+        return self.active
+
+    @property
+    def active_version(self):
+        return self.active[1]
+
+    def replace(self, model, version, expected_version):
+        if self.active[1] != expected_version:
+            return False
+        self.active = (model, version)
+        return True
+
+    def publish(self, model):
+        self.published.append(model)
+        return f'v{len(self.published) + 1}'
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.001)
+    return False
+
+
+@pytest.fixture
+def wait_for():
+    """wait_for(condition, timeout=3.0): polls condition until it holds; False on timeout"""
+    return _wait_for
+
+
+@pytest.fixture
+def fake_model():
+    return FakeModel
+
+
+@pytest.fixture
+def make_fake_registry(tmp_path):
+    """Fake registries rooted at tmp_path (so learners built on them share a writer lock)"""
+    return lambda: FakeRegistry(tmp_path)
+
+
+@pytest.fixture
+def make_router(tmp_path):
+    """LanguageModelRouter over FakeModels, with 'en' v1 serving from the default registry"""
+    from model_registry import LanguageModelRouter, ModelRegistry
+
+    def make(**kwargs):
+        default = ModelRegistry(root=str(tmp_path / 'registry'), model_factory=FakeModel)
+        default.publish(FakeModel('en'), version='v1')
+        default.activate()
+        router = LanguageModelRouter(default, rescan_interval=0, **kwargs)
+        router.language_registry = lambda code: ModelRegistry(root=os.path.join(router.root, code),
+                                                              model_factory=FakeModel)
+        return router
+    return make
+
+
+@pytest.fixture
+def publish_language():
+    """publish_language(router, code, size=1024): publishes a FakeModel tagged code as v1"""
+    def publish(router, code, size=1024):
+        router.language_registry(code).publish(FakeModel(code, size=size), version='v1')
+    return publish
+
+
+@pytest.fixture
+def make_scheduler():
+    """FetchScheduler ignoring robots.txt whose fetches return b'page' unless fetch is given"""
+    from fetch_scheduler import FetchScheduler
+
+    def make(fetch=None, **kwargs):
+        kwargs.setdefault('min_interval', 0)
+        scheduler = FetchScheduler(respect_robots=False, **kwargs)
+        scheduler._fetch = fetch or (lambda url: (b'page', None))
+        return scheduler
+    return make
+
+
+@pytest.fixture
+def make_fetcher():
+    """asgi.AsyncFetcher over a stub scheduler config; tests replace its _get"""
+    asgi = pytest.importorskip('asgi')
+
+    def make(max_fetches=2, max_queue_per_host=50, min_interval=0.0):
+        scheduler = SimpleNamespace(
+            min_interval=min_interval, robots=None, max_retries=0, backoff=0.01, max_backoff=0.01,
+            max_queue_per_host=max_queue_per_host, max_jobs=100, max_redirects=3, timeout=1
+        )
+        fetcher = asgi.AsyncFetcher(scheduler, max_fetches=max_fetches)
+        fetcher.client = object()  # _get is replaced, no real client needed
+        fetcher._slots = asyncio.Semaphore(max_fetches)
+        return fetcher
+    return make
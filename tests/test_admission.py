@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+from flask import Flask, g
+
+from admission import AdmissionController, ConcurrencyLimiter, TokenBucket
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_token_bucket_refuses_beyond_burst_and_reports_wait():
+    bucket = TokenBucket(rate=1, burst=2)
+    assert bucket.take() == 0 and bucket.take() == 0
+    assert 0 < bucket.take() <= 1
+
+
+def test_concurrency_limiter_queues_then_rejects():
+    limiter = ConcurrencyLimiter(max_active=1, max_queue=1, queue_timeout=2)
+    assert limiter.acquire() == limiter.ADMITTED
+
+    outcomes = []
+    waiter = threading.Thread(target=lambda: outcomes.append(limiter.acquire()))
+    waiter.start()
+    wait_for(lambda: limiter.waiting == 1)
+    assert limiter.acquire() == limiter.REJECTED
+
+    limiter.release()
+    waiter.join(2)
+    assert outcomes == [limiter.QUEUED]
+
+
+def test_concurrency_limiter_times_out():
+    limiter = ConcurrencyLimiter(max_active=1, max_queue=1, queue_timeout=0.05)
+    limiter.acquire()
+    assert limiter.acquire() == limiter.TIMED_OUT
+
+
+@pytest.fixture
+def limited_app():
+    admission = AdmissionController(rate=1, burst=2, limits={'predict': (1, 0, 1)})
+    app = Flask(__name__)
+    release = threading.Event()
+
+    @app.route('/predict')
+    @admission.limit('predict')
+    def predict():
+        release.wait(2)
+        return {'degraded': g.degraded}
+
+    return app, admission, release
+
+
+def test_client_over_its_rate_gets_429(limited_app):
+    app, admission, release = limited_app
+    release.set()
+    client = app.test_client()
+    statuses = [client.get('/predict').status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    response = client.get('/predict')
+    assert response.headers['Retry-After'] == '1'
+    assert admission.metrics()['predict']['rate_limited'] == 2
+
+
+def test_saturated_endpoint_sheds_load_with_503(limited_app):
+    app, admission, release = limited_app
+    busy = threading.Thread(target=lambda: app.test_client().get('/predict',
+                                                                 environ_base={'REMOTE_ADDR': '10.0.0.1'}))
+    busy.start()
+    wait_for(lambda: admission.limiters['predict'].active == 1)
+
+    response = app.test_client().get('/predict', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    release.set()
+    busy.join(2)
+
+    assert response.status_code == 503
+    assert admission.metrics()['predict']['rejected'] == 1
@@ -0,0 +1,75 @@
+import pytest
+
+from app import ANALYSIS_PROFILES, app, resolve_analysis_fields
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize('profile', [['x'], {'name': 'full'}, 1, 0, '', [], False])
+def test_non_string_profile_is_a_bad_request(client, profile):
+    with pytest.raises(ValueError, match='Unknown profile'):
+        resolve_analysis_fields(profile)
+
+    response = client.post('/predict', json={'text': 'A perfectly ordinary news text.', 'profile': profile})
+    assert response.status_code == 400
+    assert 'Unknown profile' in response.get_json()['error']
+
+
+def test_known_profile_resolves_to_its_fields():
+    assert resolve_analysis_fields('minimal') == frozenset(ANALYSIS_PROFILES['minimal'])
+
+
+def test_missing_profile_uses_the_default():
+    assert resolve_analysis_fields(None) == resolve_analysis_fields('full')
+
+
+def test_highlights_default_to_the_legacy_word_list(client):
+    data = client.post('/predict', json={'text': 'Shocking secret cure revealed by experts'}).get_json()
+    assert data['highlight_format'] == 'words'
+    assert data['highlighted_words'][0]['word'] == 'Shocking'
+
+
+def test_url_analysis_returns_the_text_its_spans_point_into():
+    from app import build_url_analysis
+
+    page = (b'<html><head><title>Story</title></head><body><article><p>'
+            + b'Shocking secret cure revealed, doctors say the study is peer-reviewed. ' * 3
+            + b'</p></article></body></html>')
+    body, status, _ = build_url_analysis('https://example.com/story', page, resolve_analysis_fields(), 'spans')
+
+    assert status == 200
+    text = body['source']['analyzed_text']
+    assert [text[start:end] for start, end, _ in body['highlighted_words']][:1] == ['Shocking']
+
+
+def test_rule_based_verdicts_are_not_reused_for_near_copies(client):
+    text = ("Le gouvernement a annoncé hier une nouvelle réforme des retraites qui sera "
+            "présentée au parlement la semaine prochaine selon plusieurs ministres.")
+    for _ in range(2):
+        data = client.post('/predict', json={'text': text}).get_json()
+        assert data['language']['code'] == 'fr' and data['model_version'] is None
+        assert data['duplicate'] is None
+
+
+def test_job_polls_go_through_the_analyze_url_limiter(client):
+    from app import admission
+
+    before = admission.metrics()['analyze_url']['admitted']
+    response = client.get('/analyze-url/jobs/no-such-job')
+
+    assert response.status_code == 404
+    assert admission.metrics()['analyze_url']['admitted'] == before + 1
+
+
+def test_predictions_and_the_lexicon_bundle_report_the_serving_versions(client):
+    from app import lexicon_store, model_registry
+
+    predict = client.post('/predict', json={'text': 'A perfectly ordinary news text.'})
+    bundle = client.get('/lexicon-bundle')
+
+    for response in (predict, bundle):
+        assert response.headers['X-Lexicon-Version'] == lexicon_store.version
+        assert response.headers['X-Model-Version'].split()[0] == (model_registry.active_version or 'none')
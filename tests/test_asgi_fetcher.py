@@ -0,0 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('httpx')
+import asgi  # noqa: E402
+
+
+def test_slow_host_does_not_starve_other_hosts(make_fetcher):
+    async def scenario():
+        fetcher = make_fetcher(max_fetches=2)
+
+        async def fake_get(url):
+            await asyncio.sleep(0.5 if 'slow.example' in url else 0)
+            return b'page', None
+
+        fetcher._get = fake_get
+        slow = [asyncio.ensure_future(fetcher.fetch(f'http://slow.example/{i}')) for i in range(5)]
+        await asyncio.sleep(0.05)
+        content, _ = await asyncio.wait_for(fetcher.fetch('http://fast.example/'), 0.2)
+        for task in slow:
+            task.cancel()
+        await asyncio.gather(*slow, return_exceptions=True)
+        return content
+
+    assert asyncio.run(scenario()) == b'page'
+
+
+def test_host_queue_cap(make_fetcher):
+    async def scenario():
+        fetcher = make_fetcher(max_queue_per_host=2)
+
+        async def fake_get(url):
+            await asyncio.sleep(0.2)
+            return b'page', None
+
+        fetcher._get = fake_get
+        waiting = [asyncio.ensure_future(fetcher.fetch(f'http://busy.example/{i}')) for i in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(asgi.HostQueueFull):
+            await fetcher.fetch('http://busy.example/2')
+        results = await asyncio.gather(*waiting)
+        # Finished hosts no longer count against the cap
+        await fetcher.fetch('http://busy.example/3')
+        return results
+
+    assert [content for content, _ in asyncio.run(scenario())] == [b'page', b'page']
+
+
+def test_idle_hosts_are_pruned(make_fetcher):
+    async def scenario():
+        fetcher = make_fetcher()
+        fetcher.max_hosts = 3
+
+        async def fake_get(url):
+            return b'page', None
+
+        fetcher._get = fake_get
+        for i in range(10):
+            await fetcher.fetch(f'http://host{i}.example/')
+        return len(fetcher._hosts)
+
+    assert asyncio.run(scenario()) <= 3
+
+
+def test_redirect_hops_are_fetched_per_host_with_their_robots_policy(make_fetcher):
+    async def scenario():
+        fetcher = make_fetcher(min_interval=0.0)
+        checked = []
+
+        def policy(url):
+            checked.append(url)
+            return 'blocked.example' not in url, None
+
+        fetcher.scheduler.robots = SimpleNamespace(policy=policy)
+        redirects = {'http://a.example/1': 'http://b.example/2', 'http://c.example/1': 'http://blocked.example/'}
+
+        async def fake_get(url):
+            return (None, redirects[url]) if url in redirects else (b'page', None)
+
+        fetcher._get = fake_get
+        result = await fetcher.fetch('http://a.example/1')
+        with pytest.raises(asgi.RobotsDisallowed):
+            await fetcher.fetch('http://c.example/1')
+        return result, checked, sorted(fetcher._hosts)
+
+    result, checked, hosts = asyncio.run(scenario())
+    assert result == (b'page', 'http://b.example/2')
+    assert checked == ['http://a.example/1', 'http://b.example/2', 'http://c.example/1', 'http://blocked.example/']
+    assert hosts == ['a.example', 'b.example', 'c.example']
+
+
+def test_redirect_loops_give_up(make_fetcher):
+    async def scenario():
+        fetcher = make_fetcher()
+
+        async def fake_get(url):
+            return None, url
+
+        fetcher._get = fake_get
+        await fetcher.fetch('http://a.example/')
+
+    with pytest.raises(asgi.requests.exceptions.TooManyRedirects):
+        asyncio.run(scenario())
+
+
+def test_analysis_goes_through_the_analyze_url_limiter(monkeypatch):
+    limiter = asgi.admission.limiters['analyze_url']
+    calls = []
+
+    async def fake_fetch(url):
+        return b'<html></html>', url
+
+    def fake_build(url, content, fields, highlight_format, degraded, final_url, error):
+        calls.append(degraded)
+        return {'url': url}, 200, {}
+
+    monkeypatch.setattr(asgi, 'fetcher', SimpleNamespace(fetch=fake_fetch))
+    monkeypatch.setattr(asgi, 'build_url_analysis', fake_build)
+
+    assert asyncio.run(asgi._analyze('http://a.example/', None, 'spans'))[1] == 200
+    assert calls == [False]
+    assert limiter.active == 0
+
+    monkeypatch.setattr(limiter, 'acquire', lambda: limiter.REJECTED)
+    body, status, headers = asyncio.run(asgi._analyze('http://a.example/', None, 'spans'))
+    assert status == 503 and 'Retry-After' in headers
+    assert calls == [False]
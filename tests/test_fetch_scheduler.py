@@ -0,0 +1,112 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import fetch_scheduler
+from fetch_scheduler import FetchJob, FetchScheduler, RobotsDisallowed
+
+
+def test_unfinished_jobs_are_kept_and_new_submissions_rejected(make_scheduler):
+    scheduler = make_scheduler(max_jobs=2)  # not started: jobs stay queued
+    first = scheduler.submit('http://a.example/1')
+    second = scheduler.submit('http://b.example/1')
+
+    assert scheduler.submit('http://c.example/1') is None
+    assert scheduler.get(first.id) is first and scheduler.get(second.id) is second
+    assert first.status == FetchJob.QUEUED
+    assert scheduler.metrics()['rejected'] == 1
+
+
+def test_oldest_finished_job_makes_room(make_scheduler):
+    scheduler = make_scheduler(max_jobs=2)
+    scheduler.start()
+    first = scheduler.submit('http://a.example/1')
+    assert first.wait(2)
+    blocker = threading.Event()
+    scheduler._fetch = lambda url: (blocker.wait(2), None)
+    running = scheduler.submit('http://b.example/1')
+
+    third = scheduler.submit('http://c.example/1')
+    assert third is not None
+    assert scheduler.get(first.id) is None
+    assert scheduler.get(running.id) is running
+    blocker.set()
+
+
+def test_identical_pending_submissions_share_one_job(make_scheduler):
+    scheduler = make_scheduler()
+    job = scheduler.submit('http://a.example/1', key='a')
+    assert scheduler.submit('http://a.example/1', key='a') is job
+    assert job.shared == 1
+
+
+def test_fetches_from_one_host_are_spaced(make_scheduler):
+    fetched_at = []
+
+    def fetch(url):
+        fetched_at.append(time.monotonic())
+        return b'page', None
+
+    scheduler = make_scheduler(fetch, min_interval=0.2)
+    scheduler.start()
+    jobs = [scheduler.submit(f'http://a.example/{i}') for i in range(2)]
+    assert all(job.wait(2) for job in jobs)
+    assert fetched_at[1] - fetched_at[0] >= 0.2
+
+
+class FakeRobots:
+    def __init__(self, disallowed_host):
+        self.disallowed_host = disallowed_host
+        self.checked = []
+
+    def policy(self, url):
+        self.checked.append(url)
+        return self.disallowed_host not in url, None
+
+    def __len__(self):
+        return 0
+
+
+def test_redirects_are_followed_hop_by_hop_with_each_hosts_robots_policy(make_scheduler):
+    redirects = {'http://a.example/1': 'http://b.example/2', 'http://b.example/2': 'http://b.example/3'}
+    scheduler = make_scheduler(lambda url: (None, redirects[url]) if url in redirects else (b'page', None))
+    scheduler.robots = FakeRobots('c.example')
+    scheduler.start()
+
+    job = scheduler.submit('http://a.example/1')
+    assert job.wait(2)
+    assert job.content == b'page' and job.final_url == 'http://b.example/3'
+    assert scheduler.robots.checked == ['http://a.example/1', 'http://b.example/2', 'http://b.example/3']
+    assert scheduler.metrics()['redirects'] == 2
+
+
+def test_redirect_to_a_disallowed_host_is_blocked(make_scheduler):
+    scheduler = make_scheduler(lambda url: (None, 'http://c.example/') if 'a.example' in url else (b'page', None))
+    scheduler.robots = FakeRobots('c.example')
+    scheduler.start()
+
+    job = scheduler.submit('http://a.example/1')
+    assert job.wait(2)
+    assert isinstance(job.error, RobotsDisallowed)
+
+
+def test_redirect_loops_give_up(make_scheduler):
+    scheduler = make_scheduler(lambda url: (None, url), max_redirects=3)
+    scheduler.start()
+
+    job = scheduler.submit('http://a.example/1')
+    assert job.wait(2)
+    assert job.status == FetchJob.FAILED and 'redirects' in str(job.error)
+
+
+def test_fetch_returns_the_redirect_target_instead_of_following_it(monkeypatch):
+    requested = []
+
+    def get(url, **kwargs):
+        requested.append(kwargs['allow_redirects'])
+        return SimpleNamespace(is_redirect=True, headers={'Location': '/next'}, close=lambda: None)
+
+    monkeypatch.setattr(fetch_scheduler.requests, 'get', get)
+    scheduler = FetchScheduler(respect_robots=False)
+    assert scheduler._fetch('http://a.example/start') == (None, 'http://a.example/next')
+    assert requested == [False]
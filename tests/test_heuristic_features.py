@@ -0,0 +1,49 @@
+import os
+import pickle
+
+import numpy as np
+
+from heuristic_features import HeuristicFeatureExtractor, LEXICON_GROUPS, default_extractor
+
+TEXTS = ['SHOCKING secret cure revealed, share before it is deleted!',
+         'The ministry said in a statement that the report was peer-reviewed.',
+         'அதிர்ச்சி செய்தி உடனே பகிரவும்']
+
+
+def test_extractor_rebuilt_from_its_state_gives_the_same_features():
+    state = pickle.loads(pickle.dumps(default_extractor.state()))
+    extractor = HeuristicFeatureExtractor.from_state(state)
+
+    assert extractor.version == default_extractor.version
+    assert np.array_equal(extractor.transform(TEXTS), default_extractor.transform(TEXTS))
+
+
+def test_state_keeps_the_term_lists_it_was_built_from():
+    groups = {lang: tuple((group, ('zzz',) if group == 'sensational_count' else terms, source)
+                          for group, terms, source in lang_groups)
+              for lang, lang_groups in LEXICON_GROUPS.items()}
+    extractor = HeuristicFeatureExtractor.from_state(HeuristicFeatureExtractor(groups, 'edited').state())
+
+    assert extractor.version == 'edited'
+    assert extractor.transform(['zzz'])[0, 0] == 1
+    assert default_extractor.transform(['zzz'])[0, 0] == 0
+
+
+def test_model_scores_with_the_lexicon_it_was_trained_on(tmp_path):
+    from ml_model import FakeNewsMLModel, HEURISTIC_LEXICON_FILE
+
+    texts = [f'The council approved the budget report number {i} today' for i in range(20)]
+    texts += [f'SHOCKING secret cure number {i} they do not want you to know' for i in range(20)]
+    model = FakeNewsMLModel(heuristic_features=True)
+    model.train(texts, [0] * 20 + [1] * 20, calibration='none')
+    model.heuristic_lexicon['version'] = 'trained'
+    paths = (str(tmp_path / 'vectorizer.pkl'), str(tmp_path / 'model.pkl'))
+    model.save_model(*paths)
+
+    loaded = FakeNewsMLModel()
+    assert loaded.load_model(*paths)
+    assert loaded._heuristic_extractor.version == 'trained'
+    assert np.allclose(loaded.predict_proba_batch(texts[:2]), model.predict_proba_batch(texts[:2]))
+
+    os.remove(tmp_path / HEURISTIC_LEXICON_FILE)
+    assert not FakeNewsMLModel().load_model(*paths)
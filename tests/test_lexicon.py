@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from lexicon import LEXICON_DIR, LexiconStore, TermMatcher
+
+
+@pytest.fixture
+def lexicon_dir(tmp_path):
+    for name in os.listdir(LEXICON_DIR):
+        shutil.copy(os.path.join(LEXICON_DIR, name), tmp_path / name)
+    return tmp_path
+
+
+def edit_lexicon(directory, lang, edit):
+    path = directory / f'{lang}.json'
+    data = json.loads(path.read_text(encoding='utf-8'))
+    edit(data)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+
+def test_term_matcher_finds_terms_in_lexicon_order():
+    matcher = TermMatcher(['shocking', 'secret'])
+    assert matcher.found('the secret is shocking') == ['shocking', 'secret']
+    assert matcher.count('nothing to see') == 0
+    assert not TermMatcher([]).any_in('anything')
+
+
+def test_reload_swaps_in_edited_lexicon(lexicon_dir):
+    store = LexiconStore(str(lexicon_dir))
+    before = store.current()
+    assert not before.terms('en')['sensational'].any_in('flabbergasting')
+
+    edit_lexicon(lexicon_dir, 'en', lambda data: data['terms']['sensational'].append('flabbergasting'))
+    result = store.reload()
+
+    assert result['previous_version'] == before.version != result['version']
+    assert store.current().terms('en')['sensational'].any_in('flabbergasting')
+    # A request holding the old snapshot keeps seeing the old lists
+    assert not before.terms('en')['sensational'].any_in('flabbergasting')
+    assert store.metrics()['reloads'] == 1
+
+
+def test_unchanged_files_keep_the_version(lexicon_dir):
+    store = LexiconStore(str(lexicon_dir))
+    current = store.current()
+    assert store.reload()['version'] == current.version
+    assert store.current() is current
+
+
+def test_invalid_files_leave_the_serving_lexicon(lexicon_dir):
+    store = LexiconStore(str(lexicon_dir))
+    current = store.current()
+    edit_lexicon(lexicon_dir, 'en', lambda data: data['terms'].pop('trusted'))
+
+    with pytest.raises(ValueError, match='missing lexicons trusted'):
+        store.reload()
+    assert store.current() is current
+    assert store.metrics()['failed_reloads'] == 1
+
+
+def test_watcher_reloads_changed_files(lexicon_dir):
+    store = LexiconStore(str(lexicon_dir))
+    version = store.version
+    store.start_watcher(0.05)
+    edit_lexicon(lexicon_dir, 'ta', lambda data: data['terms']['fear'].append('அச்சுறுத்தல்'))
+
+    deadline = time.monotonic() + 3
+    while store.version == version and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert store.version != version
+    assert 'அச்சுறுத்தல்' in store.current().terms('ta')['fear']
+
+
+def test_unknown_language_falls_back_to_english(lexicon_dir):
+    lexicon = LexiconStore(str(lexicon_dir)).current()
+    assert lexicon.terms('fr') is lexicon.terms('en')
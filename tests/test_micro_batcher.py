@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+def test_lone_caller_is_scored_without_waiting(fake_model):
+    batcher = MicroBatcher(window_ms=500, max_batch_size=8)
+    model = fake_model()
+    start = time.perf_counter()
+    assert batcher.predict_proba(model, 'x' * 10) == [0.9, 0.1]
+    assert time.perf_counter() - start < 0.25
+
+
+def test_concurrent_callers_share_batches_and_get_their_own_rows(fake_model):
+    batcher = MicroBatcher(window_ms=50, max_batch_size=8)
+    model = fake_model(delay=0.02)
+    texts = ['x' * n for n in range(1, 33)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda text: batcher.predict_proba(model, text), texts))
+
+    assert results == [[1 - len(text) / 100, len(text) / 100] for text in texts]
+    assert sorted(text for batch in model.batches for text in batch) == sorted(texts)
+    assert max(len(batch) for batch in model.batches) > 1
+    assert all(len(batch) <= 8 for batch in model.batches)
+
+
+def test_models_are_batched_separately(fake_model):
+    batcher = MicroBatcher(window_ms=50, max_batch_size=8)
+    batcher._last_size = 2  # as if other requests were around
+    english, tamil = fake_model(), fake_model()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda args: batcher.predict_proba(*args),
+                      [(english, 'a'), (tamil, 'b'), (english, 'c'), (tamil, 'd')]))
+
+    assert sorted(t for batch in english.batches for t in batch) == ['a', 'c']
+    assert sorted(t for batch in tamil.batches for t in batch) == ['b', 'd']
+
+
+def test_scoring_error_reaches_every_caller_in_the_batch():
+    class FailingModel:
+        def predict_proba_batch(self, texts):
+            raise RuntimeError('model failed')
+
+    batcher = MicroBatcher(window_ms=50, max_batch_size=2)
+    batcher._last_size = 2
+    model = FailingModel()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(batcher.predict_proba, model, text) for text in ('a', 'b')]
+        for future in futures:
+            with pytest.raises(RuntimeError, match='model failed'):
+                future.result()
+
+
+def test_scoring_time_excludes_the_batch_wait(fake_model):
+    batcher = MicroBatcher(window_ms=300, max_batch_size=8)
+    batcher._last_size = 2  # the lone caller waits out the window
+    model = fake_model(delay=0.02)
+
+    start = time.perf_counter()
+    probabilities, scoring_ms = batcher.predict_proba_timed(model, 'x' * 10)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert probabilities == [0.9, 0.1]
+    assert elapsed_ms >= 300
+    assert 20 <= scoring_ms < 200
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+import pytest
+
+from model_registry import ModelRegistry
+
+
+def test_languages_without_a_model_do_not_fall_back_to_english(make_router, publish_language):
+    router = make_router()
+    publish_language(router, 'ta')
+
+    assert router.route('en')[0].tag == 'en'
+    assert router.route('ta')[0].tag == 'ta'
+    assert router.route('fr') == (None, None)
+
+
+def test_eviction_budgets_estimated_model_sizes(make_router, publish_language):
+    mb = 1024 * 1024
+    router = make_router(max_loaded=10, memory_limit_mb=2.5)
+    for code in ('ta', 'hi', 'te'):
+        publish_language(router, code, size=mb)
+
+    router.route('ta')
+    router.route('hi')
+    router.route('ta')  # hi is now the least recently used
+    router.route('te')
+
+    assert router.status() == {'hi': None, 'ta': 'v1', 'te': 'v1'}
+
+
+def test_max_loaded_evicts_least_recently_used(make_router, publish_language):
+    router = make_router(max_loaded=1)
+    publish_language(router, 'ta')
+    publish_language(router, 'hi')
+
+    router.route('ta')
+    router.route('hi')
+    assert router.status() == {'hi': 'v1', 'ta': None}
+
+
+def test_activate_swaps_in_a_new_version_and_notifies_listeners(tmp_path, fake_model):
+    registry = ModelRegistry(root=str(tmp_path), model_factory=fake_model)
+    registry.publish(fake_model('first'), version='v1')
+    registry.activate()
+    before = registry.snapshot()
+    swapped = []
+    registry.on_swap(swapped.append)
+
+    registry.publish(fake_model('second'), version='v2')
+    result = registry.activate()
+
+    assert result['version'] == 'v2' and result['previous_version'] == 'v1'
+    assert registry.snapshot()[0].tag == 'second'
+    assert before[0].tag == 'first'  # requests holding the old snapshot keep a consistent model
+    assert swapped == ['v2']
+
+
+def test_failed_load_keeps_the_serving_model(tmp_path, fake_model):
+    registry = ModelRegistry(root=str(tmp_path), model_factory=fake_model)
+    registry.publish(fake_model('first'), version='v1')
+    registry.activate()
+    os.remove(os.path.join(registry.version_dir('v1'), 'ml_model.pkl'))
+
+    with pytest.raises(ValueError):
+        registry.activate('v1')
+    assert registry.snapshot()[0].tag == 'first'
+
+
+def test_replace_refuses_when_another_version_started_serving(tmp_path, fake_model):
+    registry = ModelRegistry(root=str(tmp_path), model_factory=fake_model)
+    registry.publish(fake_model('first'), version='v1')
+    registry.activate()
+
+    assert not registry.replace(fake_model('stale'), 'v0+online1', expected_version='v0')
+    assert registry.replace(fake_model('updated'), 'v1+online1', expected_version='v1')
+    assert registry.active_version == 'v1+online1'
+
+
+def test_router_reports_loaded_and_evicted_languages(make_router, publish_language):
+    router = make_router(max_loaded=1)
+    publish_language(router, 'ta')
+    publish_language(router, 'hi')
+    changed = []
+    router.on_swap(changed.append)
+
+    router.route('ta')
+    router.route('hi')
+    assert changed == ['ta', 'hi', 'ta']
+
+
+def test_versions_published_within_a_second_get_distinct_names(tmp_path, fake_model):
+    registry = ModelRegistry(root=str(tmp_path), model_factory=fake_model)
+    versions = [registry.publish(fake_model(tag), activate=False) for tag in ('a', 'b', 'c')]
+    assert len(set(versions)) == 3
+
+
+def test_cold_load_does_not_block_other_languages(fake_model, make_router, publish_language):
+    router = make_router()
+    publish_language(router, 'ta')
+    publish_language(router, 'hi')
+    router.route('hi')
+    started, release = threading.Event(), threading.Event()
+
+    class SlowModel(fake_model):
+        def load_model(self, vectorizer_path, model_path):
+            started.set()
+            release.wait(2)
+            return super().load_model(vectorizer_path, model_path)
+
+    router.language_registry = lambda code: ModelRegistry(root=os.path.join(router.root, code),
+                                                          model_factory=SlowModel)
+    loader = threading.Thread(target=router.route, args=('ta',))
+    loader.start()
+    assert started.wait(2)
+    try:
+        start = time.monotonic()
+        assert router.route('hi')[0].tag == 'hi'
+        assert router.route('fr') == (None, None)
+        assert time.monotonic() - start < 0.5
+    finally:
+        release.set()
+        loader.join(2)
+    assert router.route('ta')[0].tag == 'ta'
+
+
+def test_refresh_picks_up_new_language_versions(fake_model, make_router, publish_language):
+    router = make_router()
+    publish_language(router, 'ta')
+    router.route('ta')
+    changed = []
+    router.on_swap(changed.append)
+
+    router.language_registry('ta').publish(fake_model('ta-v2'), version='v2')
+    assert router.refresh() == ['ta']
+    assert router.route('ta')[1] == 'v2' and router.route('ta')[0].tag == 'ta-v2'
+    assert changed == ['ta']
+    assert router.refresh() == []
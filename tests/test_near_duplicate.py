@@ -0,0 +1,69 @@
+import random
+
+import near_duplicate
+from near_duplicate import NearDuplicateIndex
+
+
+def make_doc(rng, vocabulary, length=200):
+    return [rng.choice(vocabulary) for _ in range(length)]
+
+
+def perturb(rng, tokens, changes=3):
+    tokens = list(tokens)
+    for _ in range(changes):
+        tokens[rng.randrange(len(tokens))] = 'edited'
+    return tokens
+
+
+def test_near_copy_matches_cluster_and_unrelated_does_not():
+    rng = random.Random(0)
+    vocabulary = [f'tok{i}' for i in range(5000)]
+    index = NearDuplicateIndex()
+    original = make_doc(rng, vocabulary)
+    cluster_id = index.add(index.signature(original), ('Fake', 90.0, 'v1'))
+
+    match = index.query(index.signature(perturb(rng, original)))
+    assert match['cluster_id'] == cluster_id
+    assert match['verdict'] == ('Fake', 90.0, 'v1')
+    assert match['similarity'] >= index.threshold
+
+    assert index.query(index.signature(make_doc(rng, vocabulary))) is None
+
+
+def test_short_documents_are_not_indexed():
+    index = NearDuplicateIndex(min_tokens=10)
+    assert index.signature(['a'] * 5) is None
+    assert index.add(None, ('Real', 60.0, None)) is None
+    assert index.query(None) is None
+    assert len(index) == 0
+
+
+def test_candidate_scan_is_capped(monkeypatch):
+    rng = random.Random(1)
+    vocabulary = [f'tok{i}' for i in range(5000)]
+    index = NearDuplicateIndex(max_candidates=4)
+    original = make_doc(rng, vocabulary)
+    for _ in range(50):
+        # Separate clusters, so every copy stays in the same buckets
+        index.add(index.signature(perturb(rng, original)), ('Fake', 90.0, 'v1'))
+
+    compared = []
+    stack = near_duplicate.np.stack
+    monkeypatch.setattr(near_duplicate.np, 'stack', lambda arrays: compared.append(len(arrays)) or stack(arrays))
+    assert index.query(index.signature(original)) is not None
+    assert compared == [index.max_candidates]
+
+
+def test_capacity_evicts_least_recently_matched():
+    rng = random.Random(2)
+    vocabulary = [f'tok{i}' for i in range(5000)]
+    index = NearDuplicateIndex(capacity=2)
+    first, second, third = (make_doc(rng, vocabulary) for _ in range(3))
+    index.add(index.signature(first), 'first')
+    index.add(index.signature(second), 'second')
+    assert index.query(index.signature(first))['verdict'] == 'first'  # refreshes first
+
+    index.add(index.signature(third), 'third')
+    assert len(index) == 2
+    assert index.query(index.signature(second)) is None
+    assert index.query(index.signature(first))['verdict'] == 'first'
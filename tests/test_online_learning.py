@@ -0,0 +1,57 @@
+from online_learning import OnlineLearner
+
+
+def test_feedback_is_applied_to_a_copy_and_swapped_in(make_fake_registry, wait_for):
+    registry = make_fake_registry()
+    original = registry.active[0]
+    learner = OnlineLearner(registry, batch_size=2, flush_interval=0.05, snapshot_interval=60)
+    learner.start()
+    assert learner.submit('some text', 1) and learner.submit('other text', 0)
+
+    assert wait_for(lambda: registry.active_version == 'v1+online1')
+    assert registry.active[0].seen == [('some text', 1), ('other text', 0)]
+    assert original.seen == []
+
+
+def test_update_before_an_idle_period_is_snapshotted(make_fake_registry, wait_for):
+    registry = make_fake_registry()
+    learner = OnlineLearner(registry, batch_size=1, flush_interval=0.01, snapshot_interval=0.2)
+    learner.start()
+    learner.submit('some text', 1)
+
+    # No further feedback arrives; the idle wait must still publish the update
+    assert wait_for(lambda: registry.published, timeout=2.0)
+    assert registry.active_version == 'v2'
+    assert learner.metrics()['snapshots'] == 1
+
+
+def test_full_buffer_drops_instead_of_blocking(make_fake_registry):
+    learner = OnlineLearner(make_fake_registry(), max_pending=1)
+    assert learner.submit('a text', 0)
+    assert not learner.submit('b text', 1)
+    assert learner.metrics()['dropped'] == 1
+
+
+def test_only_one_learner_per_registry_runs(make_fake_registry):
+    writer = OnlineLearner(make_fake_registry(), snapshot_interval=60)
+    other = OnlineLearner(make_fake_registry(), snapshot_interval=60)
+
+    assert writer.start()
+    assert not other.start()
+    assert not other.running and other.metrics()['running'] is False
+
+
+def test_calibrated_models_do_not_accept_online_updates():
+    from sklearn.linear_model import SGDClassifier
+
+    from calibration import PlattCalibrator
+    from ml_model import FakeNewsMLModel, HashingTfidfVectorizer
+
+    model = FakeNewsMLModel(vectorizer_type='hashing', classifier_type='sgd')
+    model.is_trained = True
+    model.vectorizer = HashingTfidfVectorizer(n_features=2 ** 10)
+    model.model = SGDClassifier(loss='log_loss')
+    assert model.supports_online_updates
+
+    model.calibrator = PlattCalibrator()
+    assert not model.supports_online_updates
@@ -0,0 +1,59 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_execute_once(wait_for):
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def analyze(text):
+        calls.append(text)
+        started.set()
+        release.wait(2)
+        return text.upper()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flight.do, 'key', analyze, 'story')
+        started.wait(2)
+        followers = [pool.submit(flight.do, 'key', analyze, 'story') for _ in range(3)]
+        assert wait_for(lambda: flight.metrics()['coalesced'] == 3)
+        release.set()
+
+        assert leader.result() == ('STORY', False)
+        assert [f.result() for f in followers] == [('STORY', True)] * 3
+    assert calls == ['story']
+    assert flight.metrics() == {'executed': 1, 'coalesced': 3, 'in_flight': 0}
+
+
+def test_waiters_receive_the_leaders_exception(wait_for):
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(2)
+        raise RuntimeError('fetch failed')
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, 'key', fail)
+        started.wait(2)
+        follower = pool.submit(flight.do, 'key', fail)
+        assert wait_for(lambda: flight.metrics()['coalesced'] == 1)
+        release.set()
+
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match='fetch failed'):
+                future.result()
+
+
+def test_completed_calls_are_not_cached():
+    flight = SingleFlight()
+    assert flight.do('key', lambda: 1) == (1, False)
+    assert flight.do('key', lambda: 2) == (2, False)
@@ -0,0 +1,26 @@
+import csv
+
+import train_model
+
+
+def test_tune_cross_validates_pipelines_for_the_requested_language(tmp_path, monkeypatch):
+    languages = []
+
+    def preprocess_corpus(texts, use_cache=True, language='en'):
+        languages.append(language)
+        return list(texts)
+
+    monkeypatch.setattr(train_model, 'preprocess_corpus', preprocess_corpus)
+    monkeypatch.setattr(train_model, 'TUNING_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(train_model, 'TUNING_REPORT_PATH', str(tmp_path / 'report.csv'))
+    texts = [f'செய்தி உண்மை {i}' for i in range(10)] + [f'அதிர்ச்சி வதந்தி {i}' for i in range(10)]
+    labels = [0] * 10 + [1] * 10
+
+    results = train_model.tune(texts, labels, folds=2, search='random', n_iter=3, n_jobs=1,
+                               language='ta')
+
+    assert languages == ['ta']
+    assert len(results) == 3
+    assert all(row['n_features'] > 0 and row['cv_accuracy'] == 1.0 for row in results)
+    with open(tmp_path / 'report.csv', newline='') as f:
+        assert len(list(csv.DictReader(f))) == 3
@@ -0,0 +1,23 @@
+import pytest
+
+from url_utils import canonicalize_url, platform_for_url
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://example.com/a?123', 'https://example.com/a?123'),
+    ('https://example.com/a?flag&b=', 'https://example.com/a?b=&flag'),
+    ('https://example.com/a?q=a%20b&q2=a+b', 'https://example.com/a?q=a%20b&q2=a+b'),
+    ('HTTPS://WWW.Example.com:443/a?b=2&utm_source=x&a=1&fbclid=y#top', 'https://www.example.com/a?a=1&b=2'),
+    ('https://m.example.com/news/story?amp=1', 'https://example.com/news/story'),
+    ('https://example.com/news/story/amp/', 'https://example.com/news/story'),
+    ('https://example.com/news/story.amp.html', 'https://example.com/news/story.html'),
+    ('https://example-com.cdn.ampproject.org/c/s/example.com/news/story/amp', 'https://example.com/news/story'),
+    ('example.com/a?b', 'example.com/a?b'),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_platform_lookup_matches_whole_domain_labels():
+    assert platform_for_url('https://mobile.x.com/user/status/1') == 'Twitter'
+    assert platform_for_url('https://www.netflix.com/title/1') is None
@@ -5,8 +5,35 @@ Run this script to train a model on your dataset
 
 import pandas as pd
 import numpy as np
-from ml_model import FakeNewsMLModel
+from ml_model import FakeNewsMLModel, PREPROCESS_VERSION, DEFAULT_LANGUAGE, NON_ENGLISH_TOKEN_PATTERN
+from corpus_cache import PreprocessedCorpusCache
+from calibration import sweep_thresholds
+from model_registry import ModelRegistry, LanguageModelRouter
+import argparse
+import csv
+import itertools
 import os
+import random
+import tempfile
+import time
+from joblib import Memory
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+from sklearn.pipeline import Pipeline
+
+# Search space for --tune
+VECTORIZER_GRID = {
+    'max_features': [2000, 5000, 20000],
+    'ngram_range': [(1, 1), (1, 2)],
+    'min_df': [1, 2]
+}
+CLASSIFIER_GRID = {
+    'C': [0.1, 1.0, 10.0]
+}
+TUNING_CACHE_DIR = os.path.join('cache', 'tuning')
+TUNING_REPORT_PATH = os.path.join('models', 'tuning_report.csv')
+THRESHOLD_REPORT_PATH = os.path.join('models', 'threshold_report.csv')
 
 def create_sample_data():
     """
@@ -85,18 +112,19 @@ def load_dataset(file_path):
         return None, None
 
 
-def main():
-    """Main training function"""
-    print("=" * 60)
-    print("Fake News Detection ML Model Training")
-    print("=" * 60)
-    
+def load_training_data(language=DEFAULT_LANGUAGE):
+    """
+    Load the first dataset found, falling back to the built-in sample data
+    Other languages read <name>_<code>.csv and have no sample data.
+    """
     # Try to load dataset from file
     dataset_paths = [
         'dataset/fake_news_dataset.csv',
         'data/train.csv',
         'dataset.csv'
     ]
+    if language != DEFAULT_LANGUAGE:
+        dataset_paths = [path.replace('.csv', f'_{language}.csv') for path in dataset_paths]
     
     texts, labels = None, None
     
@@ -108,27 +136,280 @@ def main():
                 print(f"Loaded {len(texts)} samples")
                 break
     
+    if (not texts or not labels) and language != DEFAULT_LANGUAGE:
+        print(f"\nNo {language} dataset found. Expected one of: {', '.join(dataset_paths)}")
+        return None, None
+    
     # If no dataset found, use sample data
     if not texts or not labels:
         print("\nNo dataset file found. Using sample data for demonstration.")
         print("To train on your own data, place a CSV file with 'text' and 'label' columns.")
         texts, labels = create_sample_data()
     
+    return texts, labels
+
+
+def measure_artifacts(model):
+    """Save a model to a scratch directory and measure artifact size, load time and accuracy"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vectorizer_path = os.path.join(tmp_dir, 'tfidf_vectorizer.pkl')
+        model_path = os.path.join(tmp_dir, 'ml_model.pkl')
+        model.save_model(vectorizer_path, model_path)
+        size = sum(os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir))
+        
+        loaded = FakeNewsMLModel()
+        start = time.perf_counter()
+        loaded.load_model(vectorizer_path, model_path)
+        load_ms = (time.perf_counter() - start) * 1000
+        
+        accuracy = loaded.evaluate_processed(model.holdout_texts, model.holdout_labels, model.holdout_raw_texts)
+    return size, load_ms, accuracy
+
+
+def compact_model(model, prune_ratio, weight_dtype):
+    """Compact a trained model in place and report size, load time and accuracy changes"""
+    print("\nCompacting model...")
+    before = measure_artifacts(model)
+    n_features = len(model.model.coef_[0])
+    kept = model.compact(prune_ratio=prune_ratio, weight_dtype=weight_dtype)
+    after = measure_artifacts(model)
+    
+    print(f"\n{'':<16} {'before':>12} {'after':>12}")
+    print(f"{'features':<16} {n_features:>12,} {kept:>12,}")
+    print(f"{'artifact size':<16} {before[0]:>11,}B {after[0]:>11,}B")
+    print(f"{'load time':<16} {before[1]:>10.1f}ms {after[1]:>10.1f}ms")
+    print(f"{'accuracy':<16} {before[2]:>12.4f} {after[2]:>12.4f}")
+    print(f"Accuracy delta: {after[2] - before[2]:+.4f}")
+
+
+def preprocess_corpus(texts, use_cache=True, language=DEFAULT_LANGUAGE):
+    """Preprocess every text, reusing rows from the on-disk corpus cache"""
+    model = FakeNewsMLModel(language=language)
+    if not use_cache:
+        print("Preprocessing texts...")
+        return [model.preprocess_text(text) for text in texts]
+    
+    # Each language preprocesses differently, so each gets its own cache directory
+    version = PREPROCESS_VERSION if language == DEFAULT_LANGUAGE else f'{PREPROCESS_VERSION}-{language}'
+    cache = PreprocessedCorpusCache(version=version)
+    try:
+        return cache.preprocess(texts, model.preprocess_text)
+    finally:
+        cache.close()
+
+
+def vectorize_corpus(processed_texts, vectorizer_params):
+    """Fit a TF-IDF vectorizer on the whole corpus (tune() caches the result on disk)"""
+    vectorizer = TfidfVectorizer(max_df=0.95, **vectorizer_params)
+    X = vectorizer.fit_transform(processed_texts)
+    return vectorizer, X
+
+
+def measure_inference_ms(vectorizer, classifier, processed_texts, runs=200):
+    """Mean single-document transform + predict_proba latency in milliseconds"""
+    sample = itertools.cycle(processed_texts[:50])
+    start = time.perf_counter()
+    for _ in range(runs):
+        classifier.predict_proba(vectorizer.transform([next(sample)]))
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def tune(texts, labels, folds=5, search='grid', n_iter=10, n_jobs=-1, random_state=42, use_cache=True,
+         language=DEFAULT_LANGUAGE):
+    """
+    Cross-validated search over vectorizer and classifier parameters
+    
+    Each candidate is a vectorizer + classifier pipeline, so the vectorizer is
+    fitted inside every fold and never sees that fold's held-out texts. The
+    preprocessed corpus comes from the corpus cache, and fitted fold
+    vectorizers are cached under cache/tuning, so candidates that differ only
+    in C (and repeated runs) skip vectorization.
+    """
+    memory = Memory(TUNING_CACHE_DIR, verbose=0)
+    y = np.array(labels)
+    
+    processed_texts = preprocess_corpus(texts, use_cache=use_cache, language=language)
+    token_pattern = TfidfVectorizer().token_pattern if language == DEFAULT_LANGUAGE else NON_ENGLISH_TOKEN_PATTERN
+    
+    candidates = [dict(zip(VECTORIZER_GRID, values), C=C)
+                  for values in itertools.product(*VECTORIZER_GRID.values())
+                  for C in CLASSIFIER_GRID['C']]
+    if search == 'random':
+        candidates = random.Random(random_state).sample(candidates, min(n_iter, len(candidates)))
+    param_grid = [
+        {(f'classifier__{name}' if name == 'C' else f'vectorizer__{name}'): [value]
+         for name, value in candidate.items()}
+        for candidate in candidates
+    ]
+    
+    pipeline = Pipeline([
+        ('vectorizer', TfidfVectorizer(max_df=0.95, token_pattern=token_pattern)),
+        ('classifier', LogisticRegression(max_iter=1000, random_state=random_state, class_weight='balanced'))
+    ], memory=memory)
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=random_state)
+    print(f"Evaluating {len(candidates)} configurations with {folds}-fold cross-validation...")
+    grid = GridSearchCV(pipeline, param_grid, cv=cv, scoring='accuracy', n_jobs=n_jobs)
+    grid.fit(processed_texts, y)
+    
+    results = []
+    for i, params in enumerate(grid.cv_results_['params']):
+        vectorizer_params = {name: params[f'vectorizer__{name}'] for name in VECTORIZER_GRID}
+        C = params['classifier__C']
+        vectorizer, X = memory.cache(vectorize_corpus)(processed_texts,
+                                                       dict(vectorizer_params, token_pattern=token_pattern))
+        classifier = LogisticRegression(
+            C=C, max_iter=1000, random_state=random_state, class_weight='balanced'
+        ).fit(X, y)
+        results.append({
+            **vectorizer_params,
+            'ngram_range': '-'.join(map(str, vectorizer_params['ngram_range'])),
+            'C': C,
+            'n_features': X.shape[1],
+            'cv_accuracy': round(grid.cv_results_['mean_test_score'][i], 4),
+            'cv_std': round(grid.cv_results_['std_test_score'][i], 4),
+            'inference_ms': round(measure_inference_ms(vectorizer, classifier, processed_texts), 3)
+        })
+    
+    results.sort(key=lambda row: (-row['cv_accuracy'], row['inference_ms']))
+    
+    os.makedirs(os.path.dirname(TUNING_REPORT_PATH), exist_ok=True)
+    with open(TUNING_REPORT_PATH, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+    
+    print(f"\n{'max_features':>12} {'ngrams':>6} {'min_df':>6} {'C':>6} {'features':>9} {'accuracy':>9} {'std':>7} {'infer (ms)':>10}")
+    for row in results:
+        print(f"{row['max_features']:>12} {row['ngram_range']:>6} {row['min_df']:>6} {row['C']:>6} "
+              f"{row['n_features']:>9,} {row['cv_accuracy']:>9.4f} {row['cv_std']:>7.4f} {row['inference_ms']:>10.3f}")
+    print(f"\nReport saved to {TUNING_REPORT_PATH}")
+    return results
+
+
+def report_thresholds(model, steps=19):
+    """Sweep decision thresholds over the held-out split and save the report"""
+    probabilities = model.predict_proba_processed(model.holdout_texts, model.holdout_raw_texts)[:, 1]
+    thresholds = np.linspace(0, 1, steps + 2)[1:-1]
+    rows = sweep_thresholds(probabilities, model.holdout_labels, thresholds)
+    
+    os.makedirs(os.path.dirname(THRESHOLD_REPORT_PATH), exist_ok=True)
+    with open(THRESHOLD_REPORT_PATH, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    
+    print(f"\n{'threshold':>9} {'accuracy':>9} {'precision':>9} {'recall':>9} {'f1':>9} {'fake rate':>9}")
+    for row in rows:
+        marker = ' *' if abs(row['threshold'] - model.decision_threshold) < 1e-9 else ''
+        print(f"{row['threshold']:>9.3f} {row['accuracy']:>9.4f} {row['precision']:>9.4f} "
+              f"{row['recall']:>9.4f} {row['f1']:>9.4f} {row['fake_rate']:>9.4f}{marker}")
+    best = max(rows, key=lambda row: row['f1'])
+    print(f"\nBest F1 {best['f1']:.4f} at threshold {best['threshold']:.3f} "
+          f"(current {model.decision_threshold:.3f}; set with --threshold)")
+    print(f"Report saved to {THRESHOLD_REPORT_PATH}")
+
+
+def parse_args():
+    """Command line options"""
+    parser = argparse.ArgumentParser(description='Train the fake news detection model')
+    parser.add_argument('--language', default=DEFAULT_LANGUAGE,
+                        help='Train a model for this language code (e.g. ta) from <dataset>_<code>.csv '
+                             'and publish it under models/registry/lang/<code>')
+    parser.add_argument('--vectorizer', choices=['tfidf', 'hashing'], default=None,
+                        help='Feature extraction (default: VECTORIZER_TYPE env var or tfidf)')
+    parser.add_argument('--classifier', choices=['logistic', 'sgd'], default=None,
+                        help='Classifier (default: CLASSIFIER_TYPE env var or logistic); '
+                             'uncalibrated hashing + sgd models accept online /feedback updates')
+    parser.add_argument('--heuristic-features', action='store_true', default=None,
+                        help='Stack the NLP heuristic features with the text features '
+                             '(default: HEURISTIC_FEATURES env var)')
+    parser.add_argument('--calibration', choices=['platt', 'isotonic', 'none'], default=None,
+                        help='Probability calibration (default: CALIBRATION_METHOD env var or platt)')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help='Decision threshold on calibrated P(fake) stored with the model')
+    parser.add_argument('--sweep-thresholds', action='store_true',
+                        help='Report accuracy/precision/recall/F1 per decision threshold on the held-out split')
+    parser.add_argument('--compact', action='store_true',
+                        help='Prune near-zero features and store smaller weights after training')
+    parser.add_argument('--prune-ratio', type=float, default=0.01,
+                        help='Drop features with |coef| below this fraction of the largest |coef|')
+    parser.add_argument('--weight-dtype', choices=['float32', 'int8'], default='float32',
+                        help='Storage type for compacted model weights')
+    parser.add_argument('--tune', action='store_true',
+                        help='Run a cross-validated parameter search and report accuracy vs. inference cost')
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid',
+                        help='Search strategy for --tune')
+    parser.add_argument('--n-iter', type=int, default=10,
+                        help='Parameter combinations sampled by --search random')
+    parser.add_argument('--folds', type=int, default=5, help='Cross-validation folds for --tune')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Parallel workers for --tune')
+    parser.add_argument('--no-corpus-cache', action='store_true',
+                        help='Preprocess every row instead of reusing cache/corpus')
+    return parser.parse_args()
+
+
+def main():
+    """Main training function"""
+    args = parse_args()
+    
+    print("=" * 60)
+    print("Fake News Detection ML Model Training")
+    print("=" * 60)
+    
+    texts, labels = load_training_data(args.language)
+    if not texts:
+        return
+    
+    if args.tune:
+        tune(texts, labels, folds=args.folds, search=args.search, n_iter=args.n_iter, n_jobs=args.n_jobs,
+             use_cache=not args.no_corpus_cache, language=args.language)
+        return
+    
     # Initialize and train model
-    model = FakeNewsMLModel()
+    model = FakeNewsMLModel(vectorizer_type=args.vectorizer, classifier_type=args.classifier,
+                            heuristic_features=args.heuristic_features, language=args.language)
+    
+    processed_texts = preprocess_corpus(texts, use_cache=not args.no_corpus_cache, language=args.language)
     
     print(f"\nTraining on {len(texts)} samples...")
-    accuracy = model.train(texts, labels)
+    accuracy = model.train(texts, labels, processed_texts=processed_texts, calibration=args.calibration)
+    
+    if args.threshold is not None:
+        if model.calibrator is None:
+            print("\n--threshold needs a calibrated model; keeping the default 0.5")
+        else:
+            model.calibrator.threshold = args.threshold
+            print(f"\nDecision threshold set to {args.threshold}")
+    
+    if args.compact:
+        compact_model(model, args.prune_ratio, args.weight_dtype)
+    
+    if args.sweep_thresholds:
+        report_thresholds(model)
+    
+    if args.language != DEFAULT_LANGUAGE:
+        # Language models only live in the registry; servers load them on first use
+        registry = LanguageModelRouter(ModelRegistry()).language_registry(args.language)
+        version = registry.publish(model)
+        print("\n" + "=" * 60)
+        print("Training Complete!")
+        print("=" * 60)
+        print(f"\n{args.language} model version {version} is now CURRENT in {registry.root}")
+        return
     
     # Save model
     print("\nSaving model...")
     model.save_model()
     
+    # Publish a new registry version - running servers hot-swap to it
+    version = ModelRegistry().publish(model)
+    
     print("\n" + "=" * 60)
     print("Training Complete!")
     print("=" * 60)
     print("\nThe model is now ready to use in app.py")
     print("Model files saved in 'models/' directory")
+    print(f"Registry version {version} is now CURRENT")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,255 @@
+"""
+URL Canonicalization, Redirect Cache and Platform Lookup
+Reduces the many spellings of one article URL to a single canonical form,
+so fetching, request coalescing and platform detection all see the same
+identity
+
+- Tracking parameters (utm_*, fbclid, gclid, ...) and fragments are dropped,
+  remaining query parameters are sorted
+- AMP variants (amp./m./mobile. hosts, /amp paths, ?amp=1, Google AMP cache
+  URLs) map back to the regular article
+- Link shorteners are resolved hop by hop and cached, as are redirects
+  observed by page fetches
+- Social media platforms are looked up by host suffix, one dict probe per
+  domain label, so netflix.com no longer matches x.com
+"""
+
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'twclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref_src', 'ref_url', 'cmpid', 'ncid', 'ocid', 'smid',
+    'mkt_tok', 'spm'
+})
+TRACKING_PREFIXES = ('utm_', 'hsa_', 'pk_', 'mtm_')
+
+# Leading host labels of mobile and AMP editions of a site
+MOBILE_LABELS = frozenset({'m', 'mobile', 'amp'})
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+SHORTENER_HOSTS = frozenset({
+    'bit.ly', 'bitly.com', 't.co', 'tinyurl.com', 'goo.gl', 'ow.ly', 'buff.ly', 'is.gd',
+    'fb.me', 'lnkd.in', 'dlvr.it', 'trib.al', 'rebrand.ly', 'cutt.ly', 't.ly', 'shorturl.at',
+    'youtu.be', 'amzn.to', 'tiny.cc', 'rb.gy'
+})
+
+SOCIAL_PLATFORMS = {
+    'twitter.com': 'Twitter',
+    'x.com': 'Twitter',
+    't.co': 'Twitter',
+    'facebook.com': 'Facebook',
+    'fb.com': 'Facebook',
+    'fb.me': 'Facebook',
+    'fb.watch': 'Facebook',
+    'instagram.com': 'Instagram',
+    'linkedin.com': 'LinkedIn',
+    'lnkd.in': 'LinkedIn',
+    'reddit.com': 'Reddit',
+    'redd.it': 'Reddit',
+    'youtube.com': 'YouTube',
+    'youtu.be': 'YouTube',
+    'tiktok.com': 'TikTok',
+    'whatsapp.com': 'WhatsApp',
+    'wa.me': 'WhatsApp',
+    'telegram.org': 'Telegram',
+    't.me': 'Telegram',
+    'snapchat.com': 'Snapchat'
+}
+
+
+def _is_noise_param(key, value):
+    """Tracking or AMP-switch query parameter (key and value lowercased)"""
+    return (key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES) or key == 'amp'
+            or (key == 'outputtype' and value == 'amp'))
+
+
+def _normalize_host(host):
+    host = host.lower().rstrip('.')
+    labels = host.split('.')
+    # m.example.com, amp.example.com, en.m.wikipedia.org -> the desktop host
+    if len(labels) > 2 and labels[0] in MOBILE_LABELS:
+        labels = labels[1:]
+    elif len(labels) > 3 and labels[1] in MOBILE_LABELS:
+        labels = labels[:1] + labels[2:]
+    return '.'.join(labels)
+
+
+def _strip_amp_path(path):
+    if path.endswith('/amp') or path.endswith('/amp/'):
+        path = path[:path.rstrip('/').rfind('/')] or '/'
+    elif path.endswith('.amp'):
+        path = path[:-4]
+    elif path.endswith('.amp.html'):
+        path = path[:-9] + '.html'
+    return path
+
+
+def _unwrap_amp_cache(parsed):
+    """Publisher URL inside a Google AMP cache/viewer URL, or None"""
+    host = parsed.hostname or ''
+    if host.endswith('.cdn.ampproject.org'):
+        # /c/s/example.com/path (s = https), /v/..., /i/...
+        parts = parsed.path.split('/', 4)
+        if len(parts) >= 4 and parts[1] in ('c', 'v', 'i'):
+            secure = parts[2] == 's'
+            rest = '/'.join(parts[3:] if secure else parts[2:])
+            return f"{'https' if secure else 'http'}://{rest}"
+    if host in ('www.google.com', 'google.com') and parsed.path.startswith('/amp/'):
+        rest = parsed.path[len('/amp/'):]
+        if rest.startswith('s/'):
+            return f'https://{rest[2:]}'
+        return f'http://{rest}'
+    return None
+
+
+def canonicalize_url(url):
+    """
+    Canonical form of an http(s) URL
+    The scheme and host are lowercased, mobile/AMP hosts map to the desktop
+    host, and the default port and fragment are dropped. Tracking and AMP
+    query parameters are removed and the rest sorted, each kept exactly as
+    written (?123 stays ?123). A trailing /amp, .amp or .amp.html is cut from
+    the path too, so a page whose real path ends in /amp maps to its parent.
+    Other URLs (no scheme or host) are returned stripped but otherwise unchanged.
+    """
+    url = url.strip()
+    parsed = urllib.parse.urlsplit(url)
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parsed.hostname:
+        return url
+
+    unwrapped = _unwrap_amp_cache(parsed)
+    if unwrapped:
+        return canonicalize_url(unwrapped)
+
+    host = _normalize_host(parsed.hostname)
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f'{host}:{port}'
+
+    params = []
+    for param in parsed.query.split('&'):
+        if not param:
+            continue
+        key, _, value = param.partition('=')
+        key, value = urllib.parse.unquote_plus(key), urllib.parse.unquote_plus(value)
+        if not _is_noise_param(key.lower(), value.lower()):
+            params.append((key, value, param))
+    query = '&'.join(param for _, _, param in sorted(params))
+    path = _strip_amp_path(parsed.path or '/')
+    return urllib.parse.urlunsplit((scheme, netloc, path, query, ''))
+
+
+def platform_for_host(host):
+    """Social media platform of a host (matching the host or any parent domain), or None"""
+    labels = host.lower().rstrip('.').split('.')
+    for i in range(len(labels) - 1):
+        platform = SOCIAL_PLATFORMS.get('.'.join(labels[i:]))
+        if platform:
+            return platform
+    return None
+
+
+def platform_for_url(url):
+    """Social media platform of a URL, or None"""
+    return platform_for_host(urllib.parse.urlsplit(url.strip()).hostname or '')
+
+
+class RedirectCache:
+    """Canonical redirect targets of URLs: resolved shortener links and redirects seen by fetches"""
+
+    def __init__(self, headers=None, max_entries=100000, ttl=86400.0, max_hops=5, timeout=5):
+        self.headers = headers or {}
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_hops = max_hops
+        self.timeout = timeout
+        self._targets = OrderedDict()  # canonical url -> (expires, canonical target)
+        self._lock = threading.Lock()
+        self._metrics = {'hits': 0, 'lookups': 0, 'resolved': 0}
+
+    def record(self, url, target):
+        """Remember that canonical url redirects to canonical target"""
+        if url == target:
+            return
+        with self._lock:
+            self._targets[url] = (time.monotonic() + self.ttl, target)
+            self._targets.move_to_end(url)
+            while len(self._targets) > self.max_entries:
+                self._targets.popitem(last=False)
+
+    def _cached(self, url):
+        with self._lock:
+            entry = self._targets.get(url)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._targets[url]
+                return None
+            self._targets.move_to_end(url)
+            return entry[1]
+
+    def _location(self, url):
+        """Redirect target of one request to url, or None"""
+        try:
+            response = requests.head(url, headers=self.headers, timeout=self.timeout, allow_redirects=False)
+            if response.status_code == 405:
+                response = requests.get(url, headers=self.headers, timeout=self.timeout,
+                                        allow_redirects=False, stream=True)
+                response.close()
+        except requests.exceptions.RequestException:
+            return None
+        if response.is_redirect or response.is_permanent_redirect:
+            return urllib.parse.urljoin(url, response.headers['Location'])
+        return None
+
+    def resolve(self, url):
+        """
+        Canonical URL after cached redirects and shortener hops
+        Unresolvable links are returned canonicalized but unresolved.
+        """
+        url = canonicalize_url(url)
+        with self._lock:
+            self._metrics['lookups'] += 1
+        chain = []
+        for _ in range(self.max_hops):
+            target = self._cached(url)
+            if target is not None:
+                with self._lock:
+                    self._metrics['hits'] += 1
+            elif REQUESTS_AVAILABLE and urllib.parse.urlsplit(url).hostname in SHORTENER_HOSTS:
+                location = self._location(url)
+                if location is None:
+                    break
+                target = canonicalize_url(location)
+                with self._lock:
+                    self._metrics['resolved'] += 1
+            else:
+                break
+            if target == url or target in chain:
+                break
+            chain.append(url)
+            url = target
+
+        # Later lookups of any link in the chain go straight to the end
+        for link in chain:
+            self.record(link, url)
+        return url
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['entries'] = len(self._targets)
+        return metrics